@@ -21,6 +21,20 @@ class Settings(BaseSettings):
     azure_openai_deployment: str = "gpt-4o-realtime-preview"
     azure_openai_api_version: str = "2025-04-01-preview"
 
+    # LLM judge (OpenAI-compatible base URL; empty uses the Azure OpenAI resource above)
+    judge_endpoint: str = ""
+    judge_api_key: str = ""
+    judge_deployment: str = "gpt-4o"
+    judge_max_concurrency: int = 8
+    judge_requests_per_minute: float = 300.0
+    judge_tokens_per_minute: float = 150000.0
+    judge_batch_size: int = 4
+    judge_max_retries: int = 3
+    judge_timeout_seconds: float = 30.0
+    judge_cache_path: str = "./judge_cache.sqlite"  # empty keeps the cache in memory only
+    judge_cache_entries: int = 4096
+    judge_cache_ttl_hours: float = 24.0 * 30
+
     # Azure Document Intelligence
     azure_doc_intel_endpoint: str = ""
     azure_doc_intel_key: str = ""
@@ -29,6 +43,19 @@ class Settings(BaseSettings):
     max_session_duration_minutes: int = 60
     silence_detection_ms: int = 3500
 
+    # Verbal cue lexicons (JSON {"filler"|"hedge"|"confidence": [phrases]}; empty uses built-ins)
+    verbal_cue_lexicon_path: str = ""
+
+    # Question bank (seconds between checks for edited question files; 0 disables)
+    question_bank_reload_seconds: float = 30.0
+    question_bank_backend: str = "memory"  # "memory" or "sqlite"
+
+    # End-of-session evaluation and report jobs (worker processes)
+    report_workers: int = 2
+
+    # Shutdown drain
+    shutdown_grace_seconds: float = 15.0
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.orm import sessionmaker, declarative_base
 from contextlib import contextmanager
 
@@ -37,5 +38,10 @@ def get_db_context():
 
 def init_db():
     """Initialize database tables."""
-    from app.models import user, session, skill  # noqa: F401
+    from app.models import user, session, skill, checkpoint, question_history, report_job  # noqa: F401
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that exist; indexes added later are created here.
+    # Expression indexes are not reflected, so checkfirst would not see them
+    with engine.begin() as conn:
+        for index in skill.UserSkill.__table__.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
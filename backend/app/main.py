@@ -1,3 +1,6 @@
+import asyncio
+import threading
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -5,6 +8,12 @@ from app.config import get_settings
 from app.database import init_db
 from app.routers import auth_router, users_router, sessions_router, resume_router
 from app.routers.websocket import router as websocket_router
+from app.services.question_bank import question_bank
+from app.services.judge_cache import judge_cache
+from app.services.near_duplicates import near_duplicates
+from app.services.skill_coverage import skill_coverage
+from app.services.shutdown import shutdown_coordinator
+from app.services.report_jobs import report_jobs
 
 settings = get_settings()
 
@@ -31,10 +40,38 @@ app.include_router(resume_router)
 app.include_router(websocket_router)
 
 
+_background_tasks = []
+
+
+def _warm_question_indexes():
+    # Loads the persisted near-duplicate clusters (built only if missing or
+    # stale) and builds skill coverage, off the startup path; a first use
+    # before they are ready waits
+    near_duplicates.get()
+    skill_coverage.get()
+
+
 @app.on_event("startup")
 async def startup():
-    """Initialize database on startup."""
+    """Initialize database and question bank on startup."""
     init_db()
+    await asyncio.to_thread(question_bank.load)
+    threading.Thread(target=_warm_question_indexes, name="question-index-warmup", daemon=True).start()
+    if settings.question_bank_reload_seconds > 0:
+        _background_tasks.append(asyncio.create_task(
+            question_bank.watch(settings.question_bank_reload_seconds)
+        ))
+    report_jobs.start()
+    shutdown_coordinator.install_signal_handler()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Drain live sessions before the process exits."""
+    await shutdown_coordinator.drain()
+    await report_jobs.stop()
+    for task in _background_tasks:
+        task.cancel()
 
 
 @app.get("/")
@@ -54,5 +91,7 @@ async def health_check():
         "status": "healthy",
         "database": "connected",
         "azure_realtime": bool(settings.azure_openai_endpoint),
-        "azure_doc_intel": bool(settings.azure_doc_intel_endpoint)
+        "azure_doc_intel": bool(settings.azure_doc_intel_endpoint),
+        "question_bank_version": question_bank.version,
+        "judge_cache": judge_cache.stats()
     }
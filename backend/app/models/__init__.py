@@ -1,5 +1,9 @@
 from app.models.user import User
 from app.models.session import InterviewSession
 from app.models.skill import UserSkill
+from app.models.checkpoint import SessionCheckpoint
+from app.models.question_history import QuestionOrdinal, QuestionHistory
+from app.models.report_job import ReportJob
 
-__all__ = ["User", "InterviewSession", "UserSkill"]
+__all__ = ["User", "InterviewSession", "UserSkill", "SessionCheckpoint", "QuestionOrdinal", "QuestionHistory",
+           "ReportJob"]
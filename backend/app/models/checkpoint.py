@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, LargeBinary
+from datetime import datetime
+
+from app.database import Base
+
+
+class SessionCheckpoint(Base):
+    __tablename__ = "session_checkpoints"
+
+    session_id = Column(Integer, ForeignKey("sessions.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # Serialized in-memory SessionState, written on shutdown drain
+    payload = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SessionCheckpoint(session_id={self.session_id}, user_id={self.user_id})>"
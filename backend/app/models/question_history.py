@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, LargeBinary
+from datetime import datetime
+
+from app.database import Base
+
+
+class QuestionOrdinal(Base):
+    __tablename__ = "question_ordinals"
+
+    # Stable bit position for a question ID, assigned once and never reused
+    question_id = Column(String, primary_key=True)
+    ordinal = Column(Integer, unique=True, nullable=False)
+
+    def __repr__(self):
+        return f"<QuestionOrdinal(question_id={self.question_id}, ordinal={self.ordinal})>"
+
+
+class QuestionHistory(Base):
+    __tablename__ = "question_history"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+
+    # Bitmap over question ordinals: bit n set = question with ordinal n was asked
+    bitmap = Column(LargeBinary, nullable=False)
+    questions_seen = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<QuestionHistory(user_id={self.user_id}, questions_seen={self.questions_seen})>"
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, LargeBinary, Text, JSON
+from datetime import datetime
+
+from app.database import Base
+
+
+class ReportJob(Base):
+    __tablename__ = "report_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("sessions.id"), nullable=False, unique=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    status = Column(String, default="pending", index=True)  # pending, running, done, failed
+    attempts = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+
+    # Worker process running the job, and until when its claim holds unless renewed
+    owner = Column(String, nullable=True)
+    lease_until = Column(DateTime, nullable=True)
+
+    # Inputs, cleared once the report is written: the serialized SessionState
+    # at session end, and the judged topic scores once answers are settled
+    state = Column(LargeBinary, nullable=True)
+    topic_scores = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ReportJob(id={self.id}, session_id={self.session_id}, status={self.status})>"
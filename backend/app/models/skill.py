@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, func, literal_column
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 from app.database import Base
+from app.skill_trees import get_skill_id
 
 
 class UserSkill(Base):
@@ -30,5 +31,20 @@ class UserSkill(Base):
     # Relationship
     user = relationship("User", back_populates="skills")
 
+    @property
+    def skill_id(self):
+        """Stable integer id of this skill's node in the skill-tree index, if it exists."""
+        return get_skill_id(self.domain, self.topic, self.subtopic)
+
     def __repr__(self):
         return f"<UserSkill(user_id={self.user_id}, domain={self.domain}, topic={self.topic}, status={self.status})>"
+
+
+# One row per skill, for per-user lookups and the skill model's upserts; NULLs
+# never collide in a unique index, so a missing subtopic is indexed as ''.
+# Upserts name these same expressions as their conflict target
+SKILL_KEY = (
+    UserSkill.user_id, UserSkill.domain, UserSkill.topic,
+    func.coalesce(UserSkill.subtopic, literal_column("''"))
+)
+Index("uq_user_skills_user_skill", *SKILL_KEY, unique=True)
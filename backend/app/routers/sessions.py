@@ -1,17 +1,37 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
+import asyncio
 
 from app.database import get_db
 from app.dependencies import get_current_user
-from app.schemas import SessionCreate, SessionResponse, SessionDetailResponse
+from app.schemas import (
+    SessionCreate,
+    SessionResponse,
+    SessionDetailResponse,
+    SessionReportResponse,
+    ReportStatusResponse,
+)
 from app.models.user import User
 from app.models.session import InterviewSession
+from app.models.report_job import ReportJob
 from app.services.session_manager import session_manager
+from app.services.session_store import restore_session
+from app.services.question_history import question_history
+from app.services.adaptive_selector import adaptive_selector
+from app.services.session_planner import session_planner
+from app.services.live_evaluation import incremental_evaluator
+from app.services.report_jobs import FAILED, PENDING, RUNNING, report_jobs
+from app.services.speech_analytics import speech_analytics
+from app.services.verbal_cues import verbal_cue_analyzer
 
 router = APIRouter(prefix="/v1/sessions", tags=["sessions"])
 
+# Polling interval suggested to clients while a report is being generated
+REPORT_RETRY_AFTER_SECONDS = 2
+
 
 @router.post("", response_model=SessionResponse, status_code=status.HTTP_201_CREATED)
 async def create_session(
@@ -76,8 +96,23 @@ async def create_session(
     db.commit()
     db.refresh(interview_session)
 
+    # Plan the questions up front, skipping past sessions' questions and using the
+    # user's skill priors; off the event loop, since the first plan may build the
+    # bank's coverage index
+    question_history.load_user(db, current_user.id)
+    adaptive_selector.start_session(db, interview_session.id, current_user.id)
+    plan = await asyncio.to_thread(
+        session_planner.plan,
+        interview_session.id,
+        current_user.id,
+        interview_session.domains,
+        interview_session.duration_minutes,
+        interview_session.depth_mode,
+        interview_session.declared_weak_areas or []
+    )
+
     # Initialize in-memory session state
-    session_manager.create_session(interview_session.id, current_user.id)
+    session_manager.create_session(interview_session.id, current_user.id, plan)
 
     return interview_session
 
@@ -139,66 +174,84 @@ async def end_session(
             detail="Session is not active"
         )
 
-    # Save transcript before cleaning up in-memory state
+    # Pick up state handed off by a worker that drained mid-session
+    if not session_manager.get_session(session_id):
+        restore_session(db, session_manager, session_id)
+
+    # Save the transcript; evaluation and the report run as a background job
+    state = session_manager.get_session(session_id)
     transcript_summary = session_manager.get_transcript_summary(session_id)
+    job = None
     if transcript_summary:
         session.transcript_summary = transcript_summary
-        # Generate a basic report for terminated sessions
-        session.feedback_report = generate_terminated_session_report(session, transcript_summary)
+        job = report_jobs.enqueue(db, session, state)
 
     # Update session status
     session.status = "terminated"
     session.ended_at = datetime.utcnow()
     db.commit()
 
-    # Clean up in-memory state
+    # Remember which planned questions were asked, then clean up in-memory state
+    if state and state.plan:
+        question_history.record_asked(db, current_user.id, state.plan.asked_ids())
     session_manager.end_session(session_id)
+    if job:
+        # The job settles the last judged answers before discarding them
+        report_jobs.submit(job.id)
+    else:
+        incremental_evaluator.discard(session_id)
+    verbal_cue_analyzer.discard(session_id)
+    speech_analytics.discard(session_id)
+    question_history.unload_user(current_user.id)
+    adaptive_selector.end_session(session_id)
 
     return None
 
 
-def generate_terminated_session_report(session: InterviewSession, transcript: str) -> str:
-    """Generate a basic report for a terminated session."""
-    duration = ""
-    if session.started_at:
-        elapsed = datetime.utcnow() - session.started_at
-        minutes = int(elapsed.total_seconds() // 60)
-        seconds = int(elapsed.total_seconds() % 60)
-        duration = f"{minutes}m {seconds}s"
-
-    return f"""# Interview Practice Session Report
-
-**Status:** Session Ended Early
-
----
-
-## Session Summary
-
-| Metric | Value |
-|--------|-------|
-| **Persona** | {session.persona.title()} |
-| **Depth Mode** | {session.depth_mode.replace('_', ' ').title()} |
-| **Domains** | {', '.join(d.replace('_', ' ').title() for d in session.domains)} |
-| **Duration** | {duration} |
-| **Status** | Terminated |
-
-{f'''## Declared Weak Areas
-{chr(10).join('- ' + area for area in session.declared_weak_areas)}
-''' if session.declared_weak_areas else ''}
-
-## Conversation Transcript
-
-{transcript if transcript else '*No conversation recorded*'}
-
----
-
-## Notes
+@router.get(
+    "/{session_id}/report",
+    response_model=SessionReportResponse,
+    responses={status.HTTP_202_ACCEPTED: {"model": ReportStatusResponse}}
+)
+async def get_session_report(
+    session_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the feedback report of an ended session; 202 while it is being generated."""
+    session = db.query(InterviewSession).filter(
+        InterviewSession.id == session_id,
+        InterviewSession.user_id == current_user.id
+    ).first()
 
-This session was ended before completion. For a full evaluation and detailed feedback:
-- Try to complete the full session
-- Practice more sessions to track improvement
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
 
----
+    job = db.query(ReportJob).filter(ReportJob.session_id == session_id).first()
+    if job and job.status in (PENDING, RUNNING):
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"session_id": session_id, "status": job.status},
+            headers={"Retry-After": str(REPORT_RETRY_AFTER_SECONDS)}
+        )
+    if job and job.status == FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Report generation failed"
+        )
+    if not session.feedback_report:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No report for this session"
+        )
 
-*Report generated on {datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}*
-"""
+    return SessionReportResponse(
+        session_id=session.id,
+        status="ready",
+        feedback_report=session.feedback_report,
+        scores=session.scores,
+        detected_weak_areas=session.detected_weak_areas
+    )
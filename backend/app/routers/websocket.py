@@ -8,6 +8,12 @@ from app.database import get_db_context
 from app.services.auth import decode_token, get_user_by_id
 from app.services.session_manager import session_manager
 from app.services.azure_realtime import AzureRealtimeClient
+from app.services.session_store import restore_session
+from app.services.question_history import question_history
+from app.services.adaptive_selector import adaptive_selector
+from app.services.session_planner import session_planner
+from app.services.speech_analytics import speech_analytics
+from app.services.shutdown import shutdown_coordinator, SERVICE_RESTART
 from app.models.session import InterviewSession
 
 router = APIRouter(tags=["websocket"])
@@ -40,8 +46,13 @@ async def websocket_session(
     - Client sends: {"type": "control", "action": "mute|unmute|end"}
     - Server sends: {"type": "audio", "data": "<base64 audio>"} for AI audio
     - Server sends: {"type": "transcript", "role": "user|assistant", "text": "..."}
-    - Server sends: {"type": "status", "status": "connected|speaking|processing|error"}
+    - Server sends: {"type": "status", "status": "connected|speaking|processing|draining|error"}
     """
+    # Refuse new sessions while the server drains
+    if shutdown_coordinator.is_draining:
+        await websocket.close(code=SERVICE_RESTART, reason="Server restarting")
+        return
+
     # Authenticate
     try:
         user_id = await authenticate_websocket(token)
@@ -68,6 +79,31 @@ async def websocket_session(
         resume_text = session.resume_text
         duration_minutes = session.duration_minutes or 30
 
+        # Past sessions' questions, so selection avoids repeats
+        question_history.load_user(db, user_id)
+        # Per-skill ability priors for adaptive difficulty
+        adaptive_selector.start_session(db, session_id, user_id)
+
+        # Resume state handed off by a draining worker
+        if not session_manager.get_session(session_id):
+            restore_session(db, session_manager, session_id)
+
+    # POST /v1/sessions planned the session on the worker that handled it; a session
+    # opened elsewhere, or restored without a plan, is planned here, off the event loop
+    state = session_manager.get_session(session_id)
+    if state is None or state.plan is None:
+        plan = await asyncio.to_thread(
+            session_planner.plan,
+            session_id, user_id, domains, duration_minutes, depth_mode, declared_weak_areas or []
+        )
+        if state is None:
+            state = session_manager.create_session(session_id, user_id, plan)
+        else:
+            with state.lock:
+                if state.plan is None:
+                    state.plan = plan
+    plan = state.plan
+
     # Accept WebSocket connection
     await websocket.accept()
 
@@ -89,9 +125,12 @@ async def websocket_session(
         domains=domains,
         declared_weak_areas=declared_weak_areas or [],
         resume_text=resume_text,
-        duration_minutes=duration_minutes
+        duration_minutes=duration_minutes,
+        plan=plan
     )
 
+    shutdown_coordinator.register(session_id, websocket, azure_client)
+
     try:
         # Connect to Azure Realtime
         await azure_client.connect()
@@ -144,6 +183,7 @@ async def websocket_session(
             pass  # Client already disconnected
     finally:
         # Cleanup
+        shutdown_coordinator.unregister(session_id)
         session_manager.set_connection_state(session_id, False)
         await azure_client.disconnect()
 
@@ -163,6 +203,7 @@ async def handle_client_messages(
                 # Forward audio to Azure
                 audio_data = base64.b64decode(data.get("data", ""))
                 await azure_client.send_audio(audio_data)
+                speech_analytics.on_input_audio(session_id, audio_data)
 
             elif msg_type == "control":
                 action = data.get("action")
@@ -193,6 +234,7 @@ async def handle_azure_messages(
                     "type": "audio",
                     "data": event.get("data")
                 })
+                speech_analytics.on_output_audio(session_id, event.get("data"))
 
             elif event_type == "transcript":
                 # Forward transcript and store it
@@ -200,6 +242,11 @@ async def handle_azure_messages(
                 text = event.get("text")
 
                 session_manager.add_transcript_entry(session_id, role, text)
+                if role == "assistant":
+                    session_manager.set_turn_state(session_id, False)
+                    session_planner.track_progress(session_manager, session_id, text)
+                    # Pass on upcoming questions re-ranked after the last judged answer
+                    await azure_client.refresh_plan()
 
                 await websocket.send_json({
                     "type": "transcript",
@@ -211,6 +258,11 @@ async def handle_azure_messages(
                 # User speech state changed
                 is_speaking = event.get("is_speaking", False)
                 session_manager.update_speaking_state(session_id, is_speaking)
+                if is_speaking:
+                    session_manager.set_turn_state(session_id, True)
+                    speech_analytics.on_speech_started(session_id, event.get("audio_ms"))
+                else:
+                    speech_analytics.on_speech_stopped(session_id, event.get("audio_ms"))
 
                 await websocket.send_json({
                     "type": "status",
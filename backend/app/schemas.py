@@ -63,6 +63,19 @@ class SessionDetailResponse(SessionResponse):
     scores: Optional[dict]
 
 
+class SessionReportResponse(BaseModel):
+    session_id: int
+    status: str
+    feedback_report: str
+    scores: Optional[dict]
+    detected_weak_areas: Optional[List[str]]
+
+
+class ReportStatusResponse(BaseModel):
+    session_id: int
+    status: str  # pending, running
+
+
 # Resume Schemas
 class ResumeParseResponse(BaseModel):
     text: str
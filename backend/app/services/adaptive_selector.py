@@ -0,0 +1,219 @@
+"""
+Adaptive question difficulty driven by per-skill ability estimates.
+
+Abilities live on the logit scale of a Rasch (1PL IRT) model: a candidate
+with ability theta answers a question of difficulty b well with probability
+sigmoid(theta - b). Each (domain, topic) estimate is a Gaussian seeded from
+the user's UserSkill rows and refined after every scored answer, and the
+next question comes from the difficulty bucket carrying the most expected
+Fisher information about the candidate's ability.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+import threading
+
+from sqlalchemy.orm import Session
+
+from app.models.skill import UserSkill
+from app.services.question_bank import QuestionBank, question_bank
+from app.services.question_history import QuestionHistoryService, question_history
+from app.services.skill_coverage import CoverageCache, skill_coverage
+from app.skill_trees.index import SkillNode
+
+# Item difficulty on the ability scale for each difficulty label
+DIFFICULTY_LOGITS: Dict[str, float] = {"easy": -1.0, "medium": 0.0, "hard": 1.0}
+
+# Prior for skills with no history: average ability, wide uncertainty
+PRIOR_MEAN = 0.0
+PRIOR_VARIANCE = 1.5
+MIN_VARIANCE = 0.05
+
+# Scores are clipped before the logit so 0.0 and 1.0 stay finite
+_SCORE_EPSILON = 0.05
+
+
+def _sigmoid(x: float) -> float:
+    return 1.0 / (1.0 + math.exp(-x))
+
+
+def _logit(p: float) -> float:
+    p = min(max(p, _SCORE_EPSILON), 1 - _SCORE_EPSILON)
+    return math.log(p / (1 - p))
+
+
+@dataclass
+class AbilityEstimate:
+    """Gaussian belief about one skill's ability on the logit scale."""
+    mean: float = PRIOR_MEAN
+    variance: float = PRIOR_VARIANCE
+    observations: int = 0
+
+    def success_probability(self, difficulty: float) -> float:
+        """Expected score on an item, averaging over ability uncertainty (probit approximation)."""
+        return _sigmoid((self.mean - difficulty) / math.sqrt(1 + math.pi * self.variance / 8))
+
+    def information(self, difficulty: float) -> float:
+        """Expected Fisher information an item of this difficulty carries."""
+        p = self.success_probability(difficulty)
+        return p * (1 - p)
+
+    def update(self, difficulty: float, score: float):
+        """
+        Fold in one scored answer (Laplace-approximate Bayesian update).
+
+        Args:
+            difficulty: Item difficulty on the logit scale
+            score: Answer score from 0.0 to 1.0; partial credit is allowed
+        """
+        p = _sigmoid(self.mean - difficulty)
+        self.variance = max(MIN_VARIANCE, 1.0 / (1.0 / self.variance + p * (1 - p)))
+        self.mean += self.variance * (score - p)
+        self.observations += 1
+
+    @property
+    def standard_error(self) -> float:
+        return math.sqrt(self.variance)
+
+
+def prior_from_skills(skills: Sequence[UserSkill]) -> AbilityEstimate:
+    """
+    Seed an estimate from a user's UserSkill rows for one topic.
+
+    Rows are weighted by their confidence; a confident, repeatedly assessed
+    skill starts with a narrow prior.
+    """
+    scored = [s for s in skills if s.score is not None]
+    if not scored:
+        return AbilityEstimate()
+
+    weights = [max(s.confidence or 0.0, 0.1) for s in scored]
+    score = sum(w * s.score for w, s in zip(weights, scored)) / sum(weights)
+    confidence = min(max(s.confidence or 0.0 for s in scored), 0.95)
+    variance = max(MIN_VARIANCE, PRIOR_VARIANCE * (1 - confidence))
+    return AbilityEstimate(_logit(score), variance, sum(s.times_assessed or 0 for s in scored))
+
+
+def rank_difficulties(
+    estimate: AbilityEstimate,
+    difficulties: Iterable[str] = DIFFICULTY_LOGITS
+) -> List[Tuple[str, float]]:
+    """Difficulty labels ordered by expected information, best first."""
+    ranked = [(label, estimate.information(DIFFICULTY_LOGITS[label])) for label in difficulties]
+    ranked.sort(key=lambda item: -item[1])
+    return ranked
+
+
+class AdaptiveSelector:
+    """
+    Per-session ability tracking and maximum-information question selection.
+
+    Estimates are keyed by (domain, topic) and kept in memory for the life
+    of a session; a worker that picks up a handed-off session re-seeds them
+    from UserSkill.
+    """
+
+    def __init__(
+        self,
+        bank: QuestionBank = question_bank,
+        history: QuestionHistoryService = question_history,
+        coverage: CoverageCache = skill_coverage
+    ):
+        self.bank = bank
+        self.history = history
+        self.coverage = coverage
+        self._sessions: Dict[int, Dict[Tuple[str, str], AbilityEstimate]] = {}
+        self._lock = threading.Lock()
+
+    def start_session(self, db: Session, session_id: int, user_id: int) -> Dict[Tuple[str, str], AbilityEstimate]:
+        """Seed ability estimates for a session from the user's skill history."""
+        with self._lock:
+            estimates = self._sessions.get(session_id)
+            if estimates is not None:
+                return estimates
+
+        by_topic: Dict[Tuple[str, str], List[UserSkill]] = {}
+        for skill in db.query(UserSkill).filter(UserSkill.user_id == user_id).all():
+            by_topic.setdefault((skill.domain, skill.topic), []).append(skill)
+        estimates = {key: prior_from_skills(skills) for key, skills in by_topic.items()}
+
+        with self._lock:
+            return self._sessions.setdefault(session_id, estimates)
+
+    def end_session(self, session_id: int):
+        """Drop a finished session's estimates."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def estimate(self, session_id: int, domain: str, topic: str) -> AbilityEstimate:
+        """Current estimate for a skill, created from the default prior if unseen."""
+        with self._lock:
+            estimates = self._sessions.setdefault(session_id, {})
+            return estimates.setdefault((domain, topic), AbilityEstimate())
+
+    def record_outcome(self, session_id: int, domain: str, topic: str, difficulty: Optional[str], score: float):
+        """Update a skill estimate after an answer was scored; unknown difficulty counts as medium."""
+        estimate = self.estimate(session_id, domain, topic)
+        with self._lock:
+            estimate.update(DIFFICULTY_LOGITS.get(difficulty, 0.0), score)
+
+    def next_question(
+        self,
+        session_id: int,
+        user_id: int,
+        domain: str,
+        topic: str,
+        subtopic: Optional[str] = None,
+        exclude_ids: Optional[Iterable[str]] = None
+    ) -> Optional[dict]:
+        """
+        The unseen question whose difficulty is most informative right now.
+
+        Difficulty buckets are the bank's precomputed (domain, topic,
+        subtopic, difficulty) slices, tried in order of expected information,
+        so an exhausted bucket falls through to the next best difficulty.
+
+        Args:
+            session_id: Session whose estimates to use
+            user_id: Candidate, for cross-session repeat avoidance
+            domain, topic, subtopic: Slice to pick from
+            exclude_ids: Questions already asked in this session
+
+        Returns:
+            Question dict or None if every bucket is exhausted
+        """
+        excluded = self.history.seen(user_id).including(exclude_ids or ())
+        for difficulty, _ in rank_difficulties(self.estimate(session_id, domain, topic)):
+            question = self.bank.get_question(domain, topic, subtopic, difficulty, excluded)
+            if question:
+                return question
+        return None
+
+    def next_question_for_skill(
+        self,
+        session_id: int,
+        user_id: int,
+        node: SkillNode,
+        exclude_ids: Optional[Iterable[str]] = None
+    ) -> Optional[dict]:
+        """
+        Like next_question, for any skill-tree node (e.g. a weak skill).
+
+        Candidates come from the skill coverage matrix, so each difficulty
+        bucket is a slice of the node's precomputed question list.
+
+        Returns:
+            Question dict or None if no unseen question covers the node
+        """
+        matrix = self.coverage.get()
+        excluded = self.history.seen(user_id).including(exclude_ids or ())
+        estimate = self.estimate(session_id, node.domain, node.topic) if node.topic else AbilityEstimate()
+        for difficulty, _ in rank_difficulties(estimate):
+            question_id = matrix.pick(node.id, difficulty, excluded)
+            if question_id:
+                return self.bank.get_by_id(question_id)
+        return None
+
+
+# Global adaptive selector
+adaptive_selector = AdaptiveSelector()
@@ -6,6 +6,8 @@ import logging
 
 from app.config import get_settings
 from app.personas import get_persona_prompt
+from app.services.session_manager import SessionPlan
+from app.services.session_planner import format_plan
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -26,7 +28,8 @@ class AzureRealtimeClient:
         domains: List[str],
         declared_weak_areas: List[str],
         resume_text: Optional[str] = None,
-        duration_minutes: int = 30
+        duration_minutes: int = 30,
+        plan: Optional[SessionPlan] = None
     ):
         self.session_id = session_id
         self.persona = persona
@@ -35,9 +38,11 @@ class AzureRealtimeClient:
         self.declared_weak_areas = declared_weak_areas
         self.resume_text = resume_text
         self.duration_minutes = duration_minutes
+        self.plan = plan
 
         self._connection = None
         self._connected = False
+        self._sent_plan: Optional[str] = None  # plan text in the instructions last sent
         self._event_queue: asyncio.Queue = asyncio.Queue()
 
         # Transcript accumulation
@@ -73,6 +78,7 @@ class AzureRealtimeClient:
 
             # Configure session with new API format
             system_prompt = self._build_system_prompt()
+            self._sent_plan = format_plan(self.plan) if self.plan else None
             await self._connection.session.update(session={
                 "type": "realtime",
                 "instructions": system_prompt,
@@ -125,6 +131,22 @@ class AzureRealtimeClient:
             logger.error(f"Failed to connect to Azure Realtime: {e}")
             raise ConnectionError(f"Failed to connect to Azure Realtime: {e}")
 
+    async def refresh_plan(self):
+        """Resend the instructions if the session plan was re-ranked since they were last sent."""
+        if not self._connection or not self._connected or not self.plan:
+            return
+        plan_text = format_plan(self.plan)
+        if plan_text == self._sent_plan:
+            return
+        try:
+            await self._connection.session.update(session={
+                "type": "realtime",
+                "instructions": self._build_system_prompt()
+            })
+            self._sent_plan = plan_text
+        except Exception as e:
+            logger.warning(f"Failed to update session plan for session {self.session_id}: {e}")
+
     async def disconnect(self):
         """Close the connection."""
         self._connected = False
@@ -242,13 +264,15 @@ class AzureRealtimeClient:
             self._current_assistant_transcript = ""
             return {
                 "type": "turn_detection",
-                "is_speaking": True
+                "is_speaking": True,
+                "audio_ms": getattr(event, "audio_start_ms", None)
             }
 
         elif event_type == "input_audio_buffer.speech_stopped":
             return {
                 "type": "turn_detection",
-                "is_speaking": False
+                "is_speaking": False,
+                "audio_ms": getattr(event, "audio_end_ms", None)
             }
 
         elif event_type == "error":
@@ -278,6 +302,9 @@ class AzureRealtimeClient:
             question_count = "8-10"
             pacing = "Deep dive into topics. Use extensive follow-up questions to fully probe understanding."
 
+        if self.plan and self.plan.items:
+            question_count = str(len(self.plan.items))
+
         # Add context about the session
         context_parts = [
             persona_prompt,
@@ -305,6 +332,15 @@ class AzureRealtimeClient:
             context_parts.append(f"Candidate-declared weak areas: {', '.join(self.declared_weak_areas)}")
             context_parts.append("Prioritize probing these declared weak areas early in the session.")
 
+        if self.plan and self.plan.items:
+            context_parts.append("")
+            context_parts.append("## Question Plan")
+            context_parts.append(
+                "Ask these questions in order, rephrased naturally, using the listed follow-ups "
+                "to probe depth. Skip ahead if time runs short."
+            )
+            context_parts.append(format_plan(self.plan))
+
         if self.resume_text:
             context_parts.append("")
             context_parts.append("## Candidate Resume")
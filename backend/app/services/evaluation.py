@@ -1,7 +1,25 @@
 from typing import Dict, List, Optional
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
 from enum import Enum
 
+import numpy as np
+
+from app.services.llm_judge import LLMJudge  # noqa: F401 - re-exported
+from app.services.semantic_index import match_skills
+from app.services.session_manager import TurnCues, TurnTiming
+from app.services.signal_fusion import (
+    SIGNALS,
+    STRONG,
+    WEAK,
+    FusedSession,
+    SessionSignals,
+    SignalFusion,
+    latency_scores,
+    verbal_cue_scores,
+)
+from app.services.speech_analytics import SpeechSummary, summarize, summarize_by_topic
+from app.services.transcript_segmentation import SegmentedTranscript, transcript_segmenter
+
 
 class SkillStatus(str, Enum):
     WEAK = "weak"
@@ -17,6 +35,9 @@ class TopicScore:
     score: float  # 0.0 to 1.0
     confidence: float  # 0.0 to 1.0
     evidence: List[str]  # Key observations
+    # Fusion inputs behind a fused score, kept so the session can be re-scored later
+    signals: Dict[str, float] = field(default_factory=dict)
+    judged_confidence: Optional[float] = None
 
 
 @dataclass
@@ -26,6 +47,7 @@ class DomainScore:
     topic_scores: List[TopicScore]
     strengths: List[str]
     weaknesses: List[str]
+    signals: Dict[str, float] = field(default_factory=dict)  # domain-wide fusion inputs
 
 
 @dataclass
@@ -36,6 +58,39 @@ class SessionEvaluation:
     declared_vs_actual: Dict[str, str]  # weak_area -> assessment
     depth_achieved: str  # surface, interview_ready, expert
     time_spent_minutes: float
+    speech: Optional[SpeechSummary] = None  # pacing, when the session had live audio
+
+
+def evaluation_scores(evaluation: SessionEvaluation) -> dict:
+    """Domain and topic scores in the shape stored on the session row."""
+    return {
+        "overall": evaluation.overall_score,
+        "domains": {
+            domain_score.domain: {
+                "overall": domain_score.overall_score,
+                "signals": domain_score.signals,
+                "topics": [
+                    {
+                        "topic": t.topic,
+                        "subtopic": t.subtopic,
+                        "score": t.score,
+                        "confidence": t.confidence,
+                        "judged_confidence": t.judged_confidence,
+                        "signals": t.signals
+                    }
+                    for t in domain_score.topic_scores
+                ]
+            }
+            for domain_score in evaluation.domain_scores
+        },
+        "declared_vs_actual": evaluation.declared_vs_actual,
+        "speech": asdict(evaluation.speech) if evaluation.speech else None
+    }
+
+
+def detected_weak_areas(evaluation: SessionEvaluation) -> List[str]:
+    """Weaknesses of every domain, as stored on the session row."""
+    return [weakness for domain_score in evaluation.domain_scores for weakness in domain_score.weaknesses]
 
 
 class EvaluationService:
@@ -47,6 +102,9 @@ class EvaluationService:
     - Follow-up failure rate (high weight)
     - Verbal cues - filler words, tone (medium weight)
     - Response latency (low weight)
+
+    Each judged topic is fused over the signals it has data for; missing
+    signals drop out and the remaining weights are renormalized.
     """
 
     # Signal weights
@@ -57,8 +115,23 @@ class EvaluationService:
         "latency": 0.10
     }
 
+    # Topic scores below this confirm a declared weakness
+    WEAK_THRESHOLD = 0.6
+
+    # Topic scores at or above this are reported as strengths
+    STRONG_THRESHOLD = 0.75
+
+    # Follow-up answers shorter than this count as failed
+    MIN_FOLLOW_UP_ANSWER_WORDS = 5
+
+    # Mean follow-up depth per main question each depth mode calls for
+    FOLLOW_UPS_BY_DEPTH = {"surface": 1, "interview_ready": 2, "expert": 3}
+
+    # Minimum cosine similarity for a weak area to match a skill node
+    MATCH_THRESHOLD = 0.3
+
     def __init__(self):
-        pass
+        self.fusion = SignalFusion(self.WEIGHTS, self.WEAK_THRESHOLD, self.STRONG_THRESHOLD)
 
     def evaluate_session(
         self,
@@ -67,7 +140,12 @@ class EvaluationService:
         declared_weak_areas: List[str],
         domains: List[str],
         depth_mode: str,
-        session_state: dict
+        session_state: dict,
+        topic_scores: Optional[Dict[str, List[TopicScore]]] = None,
+        segments: Optional[SegmentedTranscript] = None,
+        speech: Optional[List[TurnTiming]] = None,
+        cue_turns: Optional[List[TurnCues]] = None,
+        latency_ms: Optional[Dict[Optional[str], float]] = None
     ) -> SessionEvaluation:
         """
         Evaluate the complete session and generate scores.
@@ -79,87 +157,233 @@ class EvaluationService:
             domains: Domains covered
             depth_mode: Requested depth level
             session_state: In-memory session state data
+            topic_scores: Judged answer scores per domain, already aggregated
+                by the incremental evaluator during the session
+            segments: The transcript already segmented into exchanges
+            speech: Per-utterance timings measured by the relay
+            cue_turns: Verbal cue counts per candidate turn
+            latency_ms: Time to first word per topic (None for the whole
+                session) recorded earlier; replaces what speech would give
 
         Returns:
             SessionEvaluation with comprehensive scoring
         """
-        domain_scores = []
+        return self.evaluate_sessions([{
+            "session_id": session_id,
+            "transcript": transcript,
+            "declared_weak_areas": declared_weak_areas,
+            "domains": domains,
+            "depth_mode": depth_mode,
+            "session_state": session_state,
+            "topic_scores": topic_scores,
+            "segments": segments,
+            "speech": speech,
+            "cue_turns": cue_turns,
+            "latency_ms": latency_ms
+        }])[0]
+
+    def evaluate_sessions(self, sessions: List[dict]) -> List[SessionEvaluation]:
+        """
+        Evaluate many sessions, fusing all their signals in one vectorized pass.
 
-        for domain in domains:
-            domain_score = self._evaluate_domain(
-                domain, transcript, session_state
-            )
-            domain_scores.append(domain_score)
+        Args:
+            sessions: evaluate_session keyword arguments, one dict per session
 
-        # Calculate overall score
-        if domain_scores:
-            overall_score = sum(d.overall_score for d in domain_scores) / len(domain_scores)
-        else:
-            overall_score = 0.0
+        Returns:
+            SessionEvaluation per session, in order
+        """
+        prepared = []
+        for inputs in sessions:
+            segments = inputs.get("segments")
+            if segments is None:
+                segments = transcript_segmenter.segment(inputs["transcript"], domains=inputs["domains"])
+            signals, judged, follow_up_rates, recorded = self._signals(
+                inputs["domains"],
+                segments,
+                inputs.get("session_state") or {},
+                inputs.get("topic_scores") or {},
+                inputs.get("cue_turns") or [],
+                inputs.get("speech") or [],
+                inputs.get("latency_ms")
+            )
+            prepared.append((inputs, segments, signals, judged, follow_up_rates, recorded))
+
+        fused = self.fusion.fuse([signals for _, _, signals, _, _, _ in prepared])
+
+        evaluations = []
+        for (inputs, segments, signals, judged, follow_up_rates, recorded), result in zip(prepared, fused):
+            domain_scores = self._domain_scores(signals, result, judged, follow_up_rates, recorded)
+            evaluations.append(SessionEvaluation(
+                session_id=inputs["session_id"],
+                domain_scores=domain_scores,
+                overall_score=result.overall,
+                declared_vs_actual=self._compare_declared_actual(inputs["declared_weak_areas"], domain_scores),
+                depth_achieved=self._assess_depth(segments, inputs["depth_mode"]),
+                time_spent_minutes=self._calculate_time(segments),
+                speech=summarize(inputs.get("speech") or [])
+            ))
+        return evaluations
+
+    def _signals(
+        self,
+        domains: List[str],
+        segments: SegmentedTranscript,
+        session_state: dict,
+        topic_scores: Dict[str, List[TopicScore]],
+        cue_turns: List[TurnCues],
+        speech: List[TurnTiming],
+        recorded_latency_ms: Optional[Dict[Optional[str], float]] = None
+    ):
+        """
+        Signal rows for one session: one per judged topic, plus domain-wide fallbacks.
 
-        # Compare declared vs actual weak areas
-        declared_vs_actual = self._compare_declared_actual(
-            declared_weak_areas, domain_scores
+        Returns:
+            (SessionSignals, judged TopicScore per row, follow-up success rate per
+            domain, (raw inputs per row, raw inputs per domain) for storage)
+        """
+        # Follow-up success: recorded live when available, else from the segmented transcript
+        live_total = session_state.get("total_follow_ups", 0)
+        live_rate = 1 - session_state.get("follow_up_failures", 0) / live_total if live_total else None
+        follow_ups: Dict[tuple, List[int]] = {}
+        for exchange in segments.exchanges:
+            if exchange.is_follow_up and exchange.domain:
+                failed = len(exchange.answer.split()) < self.MIN_FOLLOW_UP_ANSWER_WORDS
+                for key in ((exchange.domain,), (exchange.domain, exchange.topic)):
+                    counts = follow_ups.setdefault(key, [0, 0])
+                    counts[0] += 1
+                    counts[1] += failed
+
+        def follow_up_rate(key: tuple) -> float:
+            if live_rate is not None:
+                return live_rate
+            total, failures = follow_ups.get(key, (0, 0))
+            return 1 - failures / total if total else np.nan
+
+        # Verbal cues and time to first word per topic, and over the whole session
+        cue_totals: Dict[Optional[str], np.ndarray] = {}
+        for turn in cue_turns:
+            counts = np.array([turn.counts.words, turn.counts.filler, turn.counts.hedge, turn.counts.confidence])
+            for key in (turn.topic, None):
+                cue_totals[key] = cue_totals.get(key, 0) + counts
+        cue_scores: Dict[Optional[str], float] = {}
+        if cue_totals:
+            counts = np.array(list(cue_totals.values())).T
+            cue_scores = dict(zip(cue_totals, verbal_cue_scores(*counts)))
+
+        pacing = summarize_by_topic(speech)
+        pacing[None] = summarize(speech)
+
+        def latency_ms(topic: Optional[str]) -> float:
+            if recorded_latency_ms is not None:
+                return recorded_latency_ms.get(topic, -1.0)
+            summary = pacing.get(topic)
+            if not summary:
+                return -1.0
+            for value in (summary.median_first_word_ms, summary.median_latency_ms):
+                if value is not None:
+                    return value
+            return -1.0
+
+        keys, domain_of, values, evidence, judged = [], [], [], [], []
+        for index, domain in enumerate(domains):
+            for topic_score in topic_scores.get(domain, []):
+                keys.append((domain, topic_score.topic, topic_score.subtopic))
+                domain_of.append(index)
+                rate = follow_up_rate((domain, topic_score.topic))
+                values.append([
+                    topic_score.score,
+                    follow_up_rate((domain,)) if np.isnan(rate) else rate,
+                    cue_scores.get(topic_score.topic, np.nan),
+                    latency_ms(topic_score.topic)
+                ])
+                evidence.append(topic_score.confidence)
+                judged.append(topic_score)
+
+        follow_up_rates = [follow_up_rate((domain,)) for domain in domains]
+        fallback = np.array(
+            [[np.nan, rate, cue_scores.get(None, np.nan), latency_ms(None)] for rate in follow_up_rates],
+            dtype=np.float64
+        ).reshape(len(domains), len(SIGNALS))
+
+        values = np.array(values, dtype=np.float64).reshape(len(keys), len(SIGNALS))
+        # Stored inputs keep latency in ms so a re-score can apply a new scoring range
+        recorded = (
+            [self._recorded(row) for row in values],
+            [self._recorded(row) for row in fallback]
         )
-
-        # Determine depth achieved
-        depth_achieved = self._assess_depth(transcript, depth_mode)
-
-        # Calculate time spent
-        time_spent = self._calculate_time(transcript)
-
-        return SessionEvaluation(
-            session_id=session_id,
-            domain_scores=domain_scores,
-            overall_score=overall_score,
-            declared_vs_actual=declared_vs_actual,
-            depth_achieved=depth_achieved,
-            time_spent_minutes=time_spent
+        fallback[:, 3] = latency_scores(fallback[:, 3])
+        values[:, 3] = latency_scores(values[:, 3])
+
+        signals = SessionSignals(
+            domains=list(domains),
+            keys=keys,
+            domain_of=np.array(domain_of, dtype=np.int64),
+            values=values,
+            evidence=np.array(evidence, dtype=np.float64),
+            fallback=fallback
         )
+        return signals, judged, follow_up_rates, recorded
+
+    @staticmethod
+    def _recorded(row: np.ndarray) -> Dict[str, float]:
+        """Present signals of one row before latency scoring, by name."""
+        names = SIGNALS[:3] + ("latency_ms",)
+        return {
+            name: float(value) for name, value in zip(names, row)
+            if not np.isnan(value) and (name != "latency_ms" or value >= 0)
+        }
 
-    def _evaluate_domain(
+    def _domain_scores(
         self,
-        domain: str,
-        transcript: List[dict],
-        session_state: dict
-    ) -> DomainScore:
-        """Evaluate performance for a specific domain."""
-        # Extract relevant exchanges for this domain
-        # In production, this would use LLM-as-judge
-
-        # Mock evaluation for development
-        topic_scores = []
-        strengths = []
-        weaknesses = []
-
-        # Calculate follow-up failure rate
-        total_follow_ups = session_state.get("total_follow_ups", 0)
-        follow_up_failures = session_state.get("follow_up_failures", 0)
-
-        if total_follow_ups > 0:
-            follow_up_success_rate = 1 - (follow_up_failures / total_follow_ups)
-        else:
-            follow_up_success_rate = 0.5  # Neutral if no follow-ups
-
-        # Mock scores based on signals
-        overall_score = (
-            0.6 * follow_up_success_rate +  # Base on follow-up performance
-            0.4 * 0.7  # Placeholder for semantic analysis
-        )
+        signals: SessionSignals,
+        fused: FusedSession,
+        judged: List[TopicScore],
+        follow_up_rates: List[float],
+        recorded: tuple
+    ) -> List[DomainScore]:
+        """DomainScores from fused topic and domain scores."""
+        by_domain: Dict[int, List[int]] = {}
+        for row, index in enumerate(signals.domain_of):
+            by_domain.setdefault(int(index), []).append(row)
 
-        # Determine strengths and weaknesses
-        if follow_up_success_rate > 0.7:
-            strengths.append(f"Strong follow-up handling in {domain}")
-        else:
-            weaknesses.append(f"Struggled with follow-up questions in {domain}")
-
-        return DomainScore(
-            domain=domain,
-            overall_score=overall_score,
-            topic_scores=topic_scores,
-            strengths=strengths,
-            weaknesses=weaknesses
-        )
+        domain_scores = []
+        for index, domain in enumerate(signals.domains):
+            topic_scores = []
+            strengths = []
+            weaknesses = []
+            for row in by_domain.get(index, []):
+                source = judged[row]
+                topic_scores.append(TopicScore(
+                    topic=source.topic,
+                    subtopic=source.subtopic,
+                    score=float(fused.topic_scores[row]),
+                    confidence=float(fused.topic_confidence[row]),
+                    evidence=source.evidence,
+                    signals=recorded[0][row],
+                    judged_confidence=source.confidence
+                ))
+                name = (source.subtopic or source.topic).replace("_", " ")
+                if fused.topic_status[row] == STRONG:
+                    strengths.append(f"Solid answers on {name}")
+                elif fused.topic_status[row] == WEAK:
+                    weaknesses.append(f"Gaps in {name}")
+
+            # Neutral if no follow-ups
+            follow_up_success_rate = 0.5 if np.isnan(follow_up_rates[index]) else follow_up_rates[index]
+            if follow_up_success_rate > 0.7:
+                strengths.append(f"Strong follow-up handling in {domain}")
+            else:
+                weaknesses.append(f"Struggled with follow-up questions in {domain}")
+
+            domain_scores.append(DomainScore(
+                domain=domain,
+                overall_score=float(fused.domain_scores[index]),
+                topic_scores=topic_scores,
+                strengths=strengths,
+                weaknesses=weaknesses,
+                signals=recorded[1][index]
+            ))
+        return domain_scores
 
     def _compare_declared_actual(
         self,
@@ -175,88 +399,65 @@ class EvaluationService:
         - unknown: Not enough data
         """
         results = {}
-
-        for weak_area in declared_weak_areas:
-            # In production, this would use semantic matching
-            # to find relevant topic scores and assess
-            results[weak_area] = "confirmed"  # Placeholder
+        if not declared_weak_areas:
+            return results
+
+        topic_scores = {}
+        for domain_score in domain_scores:
+            for topic_score in domain_score.topic_scores:
+                topic_scores.setdefault((domain_score.domain, topic_score.topic), []).append(topic_score)
+
+        domains = [d.domain for d in domain_scores] or None
+        matches = match_skills(declared_weak_areas, domains=domains, k=3)
+
+        for weak_area, candidates in zip(declared_weak_areas, matches):
+            # Use the closest matched skill node that has scored evidence
+            evidence = []
+            for item, similarity in candidates:
+                if similarity < self.MATCH_THRESHOLD:
+                    break
+                evidence = [
+                    t for t in topic_scores.get((item.domain, item.topic), [])
+                    if item.subtopic is None or t.subtopic in (None, item.subtopic)
+                ]
+                if evidence:
+                    break
+
+            if not evidence:
+                results[weak_area] = "unknown"
+                continue
+
+            score = sum(t.score for t in evidence) / len(evidence)
+            results[weak_area] = "confirmed" if score < self.WEAK_THRESHOLD else "overestimated"
 
         return results
 
-    def _assess_depth(self, transcript: List[dict], requested_depth: str) -> str:
-        """Assess the depth level achieved in the session."""
-        # Count follow-up depth (how many levels of drilling)
-        # In production, analyze conversation structure
+    def _assess_depth(self, segments: SegmentedTranscript, requested_depth: str) -> str:
+        """Assess the depth level achieved from how far follow-ups drilled per question."""
+        if not segments.exchanges:
+            return requested_depth
 
-        # Mock: return requested depth for now
-        return requested_depth
+        # Deepest mode whose planned follow-ups per question were reached on average
+        mean_depth = segments.mean_depth()
+        achieved = "surface"
+        for mode, follow_ups in self.FOLLOW_UPS_BY_DEPTH.items():
+            if mean_depth >= follow_ups:
+                achieved = mode
+        return achieved
 
-    def _calculate_time(self, transcript: List[dict]) -> float:
+    def _calculate_time(self, segments: SegmentedTranscript) -> float:
         """Calculate session duration in minutes."""
-        if not transcript:
+        turns = segments.turns
+        if not turns:
             return 0.0
 
-        # In production, use actual timestamps
-        # Mock: estimate based on transcript length
-        return len(transcript) * 0.5  # Assume 30 seconds per exchange
-
-
-class LLMJudge:
-    """
-    LLM-based evaluation of answers.
-
-    Uses GPT to assess answer quality against rubrics.
-    """
-
-    EVALUATION_PROMPT = """You are an expert technical interviewer evaluating a candidate's answer.
+        started = next((t.started_at for t in turns if t.started_at), None)
+        ended = next((t.ended_at for t in reversed(turns) if t.ended_at), None)
+        if started and ended and ended > started:
+            return (ended - started).total_seconds() / 60
 
-Question: {question}
-Candidate's Answer: {answer}
-
-Rubric:
-{rubric}
-
-Evaluate the answer on each rubric dimension on a scale of 1-5.
-Provide specific evidence for your scores.
-
-Output format:
-{{
-  "scores": {{
-    "dimension1": {{"score": X, "evidence": "..."}},
-    ...
-  }},
-  "overall_score": X.X,
-  "strengths": ["...", "..."],
-  "areas_for_improvement": ["...", "..."]
-}}
-"""
-
-    def __init__(self):
-        pass
-
-    async def evaluate_answer(
-        self,
-        question: str,
-        answer: str,
-        rubric: Dict[str, str]
-    ) -> dict:
-        """
-        Evaluate a single answer using LLM.
-
-        In production, this calls Azure OpenAI GPT-4.
-        """
-        # Placeholder for LLM call
-        # In production:
-        # 1. Format prompt with question, answer, rubric
-        # 2. Call GPT-4 for evaluation
-        # 3. Parse structured response
-
-        return {
-            "scores": {},
-            "overall_score": 0.7,
-            "strengths": [],
-            "areas_for_improvement": []
-        }
+        # No timestamps: estimate from the number of turns
+        return len(turns) * 0.5  # Assume 30 seconds per turn
 
 
 # Global evaluation service instance
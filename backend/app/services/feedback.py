@@ -37,13 +37,69 @@ class FeedbackReportGenerator:
             self._narrative_analysis(evaluation),
             self._weak_area_assessment(evaluation, declared_weak_areas),
             self._depth_assessment(evaluation, depth_mode),
+            self._delivery(evaluation),
             self._persona_impact(persona, evaluation),
             self._key_moments(transcript_summary),
             self._next_steps(evaluation, declared_weak_areas),
             self._footer()
         ]
 
-        return "\n\n".join(sections)
+        return "\n\n".join(section for section in sections if section)
+
+    def generate_terminated_report(
+        self,
+        persona: str,
+        depth_mode: str,
+        domains: List[str],
+        declared_weak_areas: List[str],
+        transcript: str,
+        started_at: Optional[datetime],
+        ended_at: Optional[datetime] = None
+    ) -> str:
+        """Generate a basic report for a session ended before it could be evaluated."""
+        duration = ""
+        if started_at:
+            elapsed = (ended_at or datetime.utcnow()) - started_at
+            minutes = int(elapsed.total_seconds() // 60)
+            seconds = int(elapsed.total_seconds() % 60)
+            duration = f"{minutes}m {seconds}s"
+
+        return f"""# Interview Practice Session Report
+
+**Status:** Session Ended Early
+
+---
+
+## Session Summary
+
+| Metric | Value |
+|--------|-------|
+| **Persona** | {persona.title()} |
+| **Depth Mode** | {depth_mode.replace('_', ' ').title()} |
+| **Domains** | {', '.join(d.replace('_', ' ').title() for d in domains)} |
+| **Duration** | {duration} |
+| **Status** | Terminated |
+
+{f'''## Declared Weak Areas
+{chr(10).join('- ' + area for area in declared_weak_areas)}
+''' if declared_weak_areas else ''}
+
+## Conversation Transcript
+
+{transcript if transcript else '*No conversation recorded*'}
+
+---
+
+## Notes
+
+This session was ended before completion. For a full evaluation and detailed feedback:
+- Try to complete the full session
+- Practice more sessions to track improvement
+
+---
+
+*Report generated on {datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}*
+"""
 
     def _header(self) -> str:
         """Generate report header."""
@@ -194,6 +250,42 @@ Generated: {datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}
 
 {explanation}"""
 
+    def _delivery(self, evaluation: SessionEvaluation) -> str:
+        """Pacing and pauses; empty when the session had no live audio."""
+        speech = evaluation.speech
+        if not speech:
+            return ""
+
+        def value(number: Optional[float], fmt: str) -> str:
+            return fmt.format(number) if number is not None else "n/a"
+
+        lines = [
+            "## Delivery",
+            "",
+            "| Metric | Value |",
+            "|--------|-------|",
+            f"| **Speaking Rate** | {value(speech.words_per_minute, '{:.0f} words/min')} |",
+            f"| **Time to First Word** | {value(speech.median_first_word_ms and speech.median_first_word_ms / 1000, '{:.1f} s (median)')} |",
+            f"| **Pauses** | {value(speech.pauses_per_minute, '{:.1f} per minute')} |",
+            f"| **Longest Pause** | {speech.longest_pause_ms / 1000:.1f} s |",
+            f"| **Your Share of Talk Time** | {value(speech.talk_ratio and speech.talk_ratio * 100, '{:.0f}%')} |"
+        ]
+
+        notes = []
+        if speech.words_per_minute and speech.words_per_minute > 180:
+            notes.append("You spoke quickly; slowing down gives the interviewer time to follow your reasoning.")
+        elif speech.words_per_minute and speech.words_per_minute < 100:
+            notes.append("Your pace was slow; practice stating the core idea first, then the details.")
+        if speech.median_first_word_ms and speech.median_first_word_ms > 5000:
+            notes.append("Long silences before answering read as uncertainty; think out loud while you plan.")
+        if speech.talk_ratio is not None and speech.talk_ratio < 0.4:
+            notes.append("The interviewer did most of the talking; expand your answers with reasoning and examples.")
+        if notes:
+            lines.append("")
+            lines.extend(f"- {note}" for note in notes)
+
+        return "\n".join(lines)
+
     def _persona_impact(self, persona: str, evaluation: SessionEvaluation) -> str:
         """Analyze how the persona affected performance."""
         persona_insights = {
@@ -0,0 +1,190 @@
+"""
+Content-addressed cache of LLM judge results.
+
+A result is keyed by a hash of the normalized question, answer and rubric
+plus the judge version (model and prompt revision), so the same canned
+answer, a re-run after a crash or a re-scoring campaign reuses the earlier
+verdict instead of calling the model again. Lookups go through a bounded
+in-process LRU first, then a persistent SQLite file whose entries expire
+after a TTL.
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS judge_results (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Expired rows are purged at most this often
+_PURGE_INTERVAL_SECONDS = 3600.0
+
+
+def normalize(text: str) -> str:
+    """Unicode-, case- and whitespace-insensitive form of a text."""
+    return " ".join(unicodedata.normalize("NFKC", text or "").casefold().split())
+
+
+def cache_key(question: str, answer: str, rubric: Optional[Dict[str, str]], judge_version: str) -> str:
+    """Hex digest identifying one (question, answer, rubric, judge version) evaluation."""
+    payload = json.dumps(
+        [
+            judge_version,
+            normalize(question),
+            normalize(answer),
+            sorted((normalize(dim), normalize(desc)) for dim, desc in (rubric or {}).items())
+        ],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=20).hexdigest()
+
+
+class JudgeCache:
+    """
+    Two-tier cache: bounded LRU in memory, TTL-expiring SQLite on disk.
+
+    Values are JSON-serializable dicts (AnswerScore.as_dict without its id).
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None, ttl_hours: Optional[float] = None):
+        self.path = settings.judge_cache_path if path is None else path
+        self.max_entries = max_entries or settings.judge_cache_entries
+        self.ttl_seconds = (settings.judge_cache_ttl_hours if ttl_hours is None else ttl_hours) * 3600
+        self._memory: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._last_purge = 0.0
+        self.metrics = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "expired": 0
+        }
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, dict]:
+        """Cached results for the keys that have one."""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, dict] = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                value = self._memory.get(key)
+                if value is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = value
+                    self.metrics["memory_hits"] += 1
+                else:
+                    missing.append(key)
+
+            conn = self._connection() if missing else None
+            if conn is not None:
+                oldest = time.time() - self.ttl_seconds
+                placeholders = ",".join("?" * len(missing))
+                rows = conn.execute(
+                    f"SELECT key, result, created_at FROM judge_results WHERE key IN ({placeholders})", missing
+                ).fetchall()
+                for key, result, created_at in rows:
+                    if created_at < oldest:
+                        self.metrics["expired"] += 1
+                        continue
+                    value = json.loads(result)
+                    found[key] = value
+                    self._remember(key, value)
+                    self.metrics["disk_hits"] += 1
+
+            self.metrics["misses"] += sum(1 for key in missing if key not in found)
+        return found
+
+    def get(self, key: str) -> Optional[dict]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, entries: Dict[str, dict]):
+        """Store results in both tiers."""
+        if not entries:
+            return
+        with self._lock:
+            for key, value in entries.items():
+                self._remember(key, value)
+            conn = self._connection()
+            if conn is not None:
+                now = time.time()
+                with conn:
+                    conn.execute("BEGIN")
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO judge_results (key, result, created_at) VALUES (?, ?, ?)",
+                        [(key, json.dumps(value), now) for key, value in entries.items()]
+                    )
+                self._purge_expired(conn, now)
+            self.metrics["writes"] += len(entries)
+
+    def put(self, key: str, value: dict):
+        self.put_many({key: value})
+
+    def _remember(self, key: str, value: dict):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.metrics["evictions"] += 1
+
+    def _purge_expired(self, conn: sqlite3.Connection, now: float):
+        if now - self._last_purge < _PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = now
+        deleted = conn.execute("DELETE FROM judge_results WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+        if deleted:
+            logger.info(f"Purged {deleted} expired judge cache entries")
+
+    def clear(self):
+        """Drop every cached result (e.g. after changing the rubric format)."""
+        with self._lock:
+            self._memory.clear()
+            conn = self._connection()
+            if conn is not None:
+                conn.execute("DELETE FROM judge_results")
+
+    def stats(self) -> dict:
+        """Hit/miss counters and tier sizes."""
+        with self._lock:
+            lookups = self.metrics["memory_hits"] + self.metrics["disk_hits"] + self.metrics["misses"]
+            hits = lookups - self.metrics["misses"]
+            return {
+                **self.metrics,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory)
+            }
+
+
+# Global judge cache
+judge_cache = JudgeCache()
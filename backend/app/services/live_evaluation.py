@@ -0,0 +1,388 @@
+"""
+Incremental answer evaluation while the interview is running.
+
+The evaluator listens to transcript entries as the session manager records
+them. An interviewer turn opens a question, candidate turns accumulate the
+answer, and the next interviewer turn closes the Q/A pair, which is scored
+by the LLM judge in the background and folded into running per-topic
+aggregates. Each judged answer also updates the adaptive selector's ability
+estimate for its topic, and the rest of the session plan is re-ranked from
+it. When the session ends only the last answer is still outstanding, so the
+final SessionEvaluation is a merge of the aggregates.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import threading
+
+from app.services.adaptive_selector import AdaptiveSelector, adaptive_selector
+from app.services.evaluation import EvaluationService, SessionEvaluation, TopicScore, evaluation_service
+from app.services.llm_judge import JudgeItem, LLMJudge, llm_judge
+from app.services.question_bank import QuestionBank, question_bank
+from app.services.session_manager import SessionManager, SessionState, TranscriptEntry, session_manager
+from app.services.session_planner import SessionPlanner, asked_offset, session_planner
+from app.services.transcript_segmentation import TranscriptSegmenter, transcript_segmenter
+
+logger = logging.getLogger(__name__)
+
+# Candidate turns shorter than this (in words) are not judged on their own
+MIN_ANSWER_WORDS = 3
+
+# Evidence lines kept per topic
+_MAX_EVIDENCE = 3
+
+TopicKey = Tuple[str, str, Optional[str]]  # (domain, topic, subtopic)
+
+
+@dataclass
+class QAPair:
+    index: int
+    question: str
+    answer: str
+    domain: Optional[str]
+    topic: Optional[str]
+    subtopic: Optional[str]
+    question_id: Optional[str]  # bank question the exchange belongs to, for its rubric
+
+
+@dataclass
+class TopicAggregate:
+    score_sum: float = 0.0
+    answers: int = 0
+    evidence: List[str] = field(default_factory=list)
+
+    def add(self, score: float, evidence: List[str]):
+        self.score_sum += score
+        self.answers += 1
+        for line in evidence:
+            if len(self.evidence) < _MAX_EVIDENCE:
+                self.evidence.append(line)
+
+    def to_topic_score(self, key: TopicKey) -> TopicScore:
+        return TopicScore(
+            topic=key[1],
+            subtopic=key[2],
+            score=self.score_sum / self.answers,
+            # More judged answers, more confidence: 0.5, 0.67, 0.75, ...
+            confidence=self.answers / (self.answers + 1),
+            evidence=list(self.evidence)
+        )
+
+
+@dataclass
+class _LiveSession:
+    cursor: int = 0  # plan position, following the same matching as the planner
+    question: Optional[str] = None
+    # (domain, topic, subtopic, question_id) of the open question; follow-ups inherit it
+    alignment: Tuple[Optional[str], ...] = (None, None, None, None)
+    answer: List[str] = field(default_factory=list)
+    pairs: int = 0
+    aggregates: Dict[TopicKey, TopicAggregate] = field(default_factory=dict)
+    pending: Set[asyncio.Task] = field(default_factory=set)
+    unscored: List[QAPair] = field(default_factory=list)  # closed without an event loop to score on
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class IncrementalEvaluator:
+    """Scores each answer as soon as it is complete and keeps per-topic running scores."""
+
+    def __init__(
+        self,
+        manager: SessionManager = session_manager,
+        judge: LLMJudge = llm_judge,
+        bank: QuestionBank = question_bank,
+        evaluator: EvaluationService = evaluation_service,
+        segmenter: TranscriptSegmenter = transcript_segmenter,
+        selector: AdaptiveSelector = adaptive_selector,
+        planner: SessionPlanner = session_planner
+    ):
+        self.manager = manager
+        self.judge = judge
+        self.bank = bank
+        self.evaluator = evaluator
+        self.segmenter = segmenter
+        self.selector = selector
+        self.planner = planner
+        self._sessions: Dict[int, _LiveSession] = {}
+        self._lock = threading.Lock()
+        manager.add_transcript_listener(self.on_transcript_entry)
+
+    def _live(self, session_id: int) -> _LiveSession:
+        with self._lock:
+            return self._sessions.setdefault(session_id, _LiveSession())
+
+    def _start(self, state: SessionState, until: Optional[TranscriptEntry] = None) -> _LiveSession:
+        """
+        Running state for a session, replaying its transcript the first time it is seen here.
+
+        A session restored from another worker's snapshot already has answers
+        that were never judged on this worker; the replay segments them and
+        leaves their Q/A pairs in `unscored`.
+
+        Args:
+            state: Session state
+            until: Transcript entry to stop the replay at (the one being recorded)
+
+        Returns:
+            The session's running state
+        """
+        with self._lock:
+            live = self._sessions.get(state.session_id)
+        if live is not None:
+            return live
+
+        replayed = _LiveSession()
+        with state.lock:
+            transcript = list(state.transcript)
+        for entry in transcript:
+            if entry is until:
+                break
+            pair = self._segment(replayed, state, entry)
+            if pair:
+                replayed.unscored.append(pair)
+        with self._lock:
+            return self._sessions.setdefault(state.session_id, replayed)
+
+    def on_transcript_entry(self, state: SessionState, entry: TranscriptEntry):
+        """Transcript listener: segment Q/A pairs and score completed answers."""
+        try:
+            live = self._start(state, entry)
+            pair = self._segment(live, state, entry)
+            # Answers replayed from a restored transcript are judged along with this one
+            with live.lock:
+                pairs, live.unscored = live.unscored, []
+            if pair:
+                pairs.append(pair)
+            if pairs:
+                self._submit(state.session_id, pairs)
+        except Exception:
+            # Never let evaluation break the live session
+            logger.exception(f"Incremental evaluation failed for session {state.session_id}")
+
+    def _segment(self, live: _LiveSession, state: SessionState, entry: TranscriptEntry) -> Optional[QAPair]:
+        """Advance the segmenter by one entry; returns the Q/A pair it closed, if any."""
+        with live.lock:
+            if entry.role == "user":
+                if live.question is not None:
+                    live.answer.append(entry.content)
+                return None
+
+            closed = self._close(live)
+
+            # The interviewer turn is the next question: a planned one (matched like
+            # track_progress does), else a bank question, else a follow-up in the same thread
+            alignment = None
+            if state.plan:
+                offset = asked_offset(state.plan, entry.content, live.cursor)
+                if offset is not None:
+                    live.cursor += offset + 1
+                    item = state.plan.items[live.cursor - 1]
+                    alignment = (item.domain, item.topic, item.subtopic, item.question_id)
+            if alignment is None:
+                alignment = self.segmenter.match_bank(entry.content, None)
+            if alignment is None and live.alignment[0] is None:
+                with state.lock:
+                    alignment = (state.current_domain, state.current_topic, None, None)
+            live.question = entry.content
+            if alignment is not None:
+                live.alignment = alignment
+            return closed
+
+    def _close(self, live: _LiveSession) -> Optional[QAPair]:
+        """Close the open question, if it has an answer worth judging."""
+        answer = " ".join(live.answer).strip()
+        pair = None
+        if live.question is not None and len(answer.split()) >= MIN_ANSWER_WORDS:
+            pair = QAPair(
+                index=live.pairs,
+                question=live.question,
+                answer=answer,
+                domain=live.alignment[0],
+                topic=live.alignment[1],
+                subtopic=live.alignment[2],
+                question_id=live.alignment[3]
+            )
+            live.pairs += 1
+        live.question = None
+        live.answer = []
+        return pair
+
+    def _submit(self, session_id: int, pairs: List[QAPair]):
+        live = self._live(session_id)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            with live.lock:
+                live.unscored.extend(pairs)
+            return
+        task = loop.create_task(self._score(session_id, pairs))
+        with live.lock:
+            live.pending.add(task)
+        task.add_done_callback(lambda done: live.pending.discard(done))
+
+    async def _score(self, session_id: int, pairs: List[QAPair]):
+        items = []
+        for pair in pairs:
+            rubric = self.bank.rubric(pair.question_id) if pair.question_id else None
+            items.append(JudgeItem(f"{session_id}:{pair.index}", pair.question, pair.answer, rubric or {}))
+        scores = await self.judge.evaluate_answers(items)
+
+        live = self._live(session_id)
+        outcomes = []
+        with live.lock:
+            for pair, score in zip(pairs, scores):
+                if score.error or not pair.domain or not pair.topic:
+                    continue
+                key = (pair.domain, pair.topic, pair.subtopic)
+                evidence = [
+                    f"{dim}: {s['evidence']}" for dim, s in score.scores.items() if s.get("evidence")
+                ][:1] + score.areas_for_improvement[:1]
+                live.aggregates.setdefault(key, TopicAggregate()).add(score.overall_score, evidence)
+                outcomes.append((pair, score.overall_score))
+
+        # While the interview is still running, adapt what comes next to the answer
+        if outcomes and self.manager.get_session(session_id):
+            for pair, overall in outcomes:
+                question = self.bank.get_by_id(pair.question_id) if pair.question_id else None
+                difficulty = question.get("difficulty") if question else None
+                self.selector.record_outcome(session_id, pair.domain, pair.topic, difficulty, overall)
+            for domain, topic in dict.fromkeys((pair.domain, pair.topic) for pair, _ in outcomes):
+                self.planner.rerank(self.manager, session_id, domain, topic)
+
+    def topic_scores(self, session_id: int) -> Dict[str, List[TopicScore]]:
+        """Running per-domain topic scores for a session."""
+        live = self._live(session_id)
+        with live.lock:
+            aggregates = list(live.aggregates.items())
+        by_domain: Dict[str, List[TopicScore]] = {}
+        for key, aggregate in aggregates:
+            by_domain.setdefault(key[0], []).append(aggregate.to_topic_score(key))
+        return by_domain
+
+    async def finish(
+        self,
+        session_id: int,
+        declared_weak_areas: List[str],
+        domains: List[str],
+        depth_mode: str,
+        wait_seconds: Optional[float] = None
+    ) -> Optional[SessionEvaluation]:
+        """
+        Close the last answer and merge the running scores into a SessionEvaluation.
+
+        Args:
+            session_id: Session being ended
+            declared_weak_areas: Candidate-declared weak areas
+            domains: Session domains
+            depth_mode: Requested depth level
+            wait_seconds: Ceiling for answers still being judged (defaults to the judge's
+                worst case with retries)
+
+        Returns:
+            SessionEvaluation, or None if the session is not live
+        """
+        state = self.manager.get_session(session_id)
+        if not state:
+            return None
+        topic_scores = await self.settle(state, wait_seconds)
+        return self.evaluator.evaluate_session(
+            **self.evaluation_inputs(state, topic_scores, declared_weak_areas, domains, depth_mode)
+        )
+
+    async def settle(
+        self,
+        state: SessionState,
+        wait_seconds: Optional[float] = None,
+        require_all: bool = False
+    ) -> Dict[str, List[TopicScore]]:
+        """
+        Close the last answer and wait for every answer to be judged; the session's final topic scores.
+
+        A session restored on this worker from another worker's snapshot and
+        ended before any new transcript entry has no running scores yet, so
+        its transcript is replayed and every answer judged here. Each judge call is bounded by its own timeout and retries;
+        the ceiling only guards against a judge that never returns.
+
+        Args:
+            state: Session being ended (it may already be gone from the manager)
+            wait_seconds: Ceiling for answers still being judged (defaults to the
+                judge's worst case with retries for that many answers)
+            require_all: Raise TimeoutError instead of leaving out answers the
+                judge did not return within the ceiling
+
+        Returns:
+            Judged topic scores per domain
+        """
+        session_id = state.session_id
+        live = self._start(state)
+        with live.lock:
+            final = self._close(live)
+            leftovers = live.unscored + ([final] if final else [])
+            live.unscored = []
+        if leftovers:
+            task = asyncio.get_running_loop().create_task(self._score(session_id, leftovers))
+            with live.lock:
+                live.pending.add(task)
+            task.add_done_callback(lambda done: live.pending.discard(done))
+
+        with live.lock:
+            pending = set(live.pending)
+        if pending:
+            if wait_seconds is None:
+                # One answer per live task, plus the leftovers sharing a single task
+                answers = len(pending) + max(len(leftovers) - 1, 0)
+                wait_seconds = self.judge.wait_budget(answers)
+            done, late = await asyncio.wait(pending, timeout=wait_seconds)
+            for task in late:
+                task.cancel()
+            if late:
+                message = f"Session {session_id}: {len(late)} answers not judged within {wait_seconds}s"
+                if require_all:
+                    raise TimeoutError(message)
+                logger.warning(message)
+
+        return self.topic_scores(session_id)
+
+    def evaluation_inputs(
+        self,
+        state: SessionState,
+        topic_scores: Dict[str, List[TopicScore]],
+        declared_weak_areas: List[str],
+        domains: List[str],
+        depth_mode: str
+    ) -> dict:
+        """evaluate_session keyword arguments for an ended session, with its transcript segmented."""
+        with state.lock:
+            transcript = list(state.transcript)
+            signals = {
+                "total_follow_ups": state.total_follow_ups,
+                "follow_up_failures": state.follow_up_failures,
+                "response_latencies": list(state.response_latencies)
+            }
+            speech = list(state.turn_timings)
+            cue_turns = list(state.cue_turns)
+        return {
+            "session_id": state.session_id,
+            "transcript": [{"role": e.role, "content": e.content} for e in transcript],
+            "declared_weak_areas": declared_weak_areas,
+            "domains": domains,
+            "depth_mode": depth_mode,
+            "session_state": signals,
+            "topic_scores": topic_scores,
+            "segments": self.segmenter.segment(transcript, state.plan, domains),
+            "speech": speech,
+            "cue_turns": cue_turns
+        }
+
+    def discard(self, session_id: int):
+        """Forget a session's running state, cancelling answers still being judged."""
+        with self._lock:
+            live = self._sessions.pop(session_id, None)
+        if live:
+            for task in list(live.pending):
+                task.cancel()
+
+
+# Global incremental evaluator, subscribed to the global session manager
+incremental_evaluator = IncrementalEvaluator()
@@ -0,0 +1,441 @@
+"""
+LLM-as-judge scoring of interview answers.
+
+All answers of a session are judged concurrently: a semaphore caps the
+calls in flight and token buckets keep requests and prompt tokens under the
+deployment's per-minute quota. Q/A pairs whose rubrics share the same
+dimensions are sent several to a call. Failed calls are retried with
+exponential backoff and full jitter, and the model's JSON is parsed into
+AnswerScores. Verdicts are cached by content (see judge_cache), so
+re-evaluating the same answers costs no model calls.
+
+The judge talks to any OpenAI-compatible chat completions endpoint: Azure
+OpenAI in production, or the stand-in server in scripts/judge_stub_server.py
+for offline runs. With neither configured it returns neutral placeholder
+scores, like the realtime client's mock mode.
+"""
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence
+import asyncio
+import json
+import logging
+import math
+import random
+import re
+import time
+
+from app.config import get_settings
+from app.services.judge_cache import JudgeCache, cache_key, judge_cache
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Bump when the prompts or score parsing change, so cached verdicts are not reused
+PROMPT_VERSION = "1"
+
+# Neutral score carried by answers that were not judged; their error says why
+PLACEHOLDER_SCORE = 0.7
+NOT_CONFIGURED = "judge not configured"
+
+# Rough prompt size estimate for the token bucket
+_CHARS_PER_TOKEN = 4
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+
+class JudgeError(Exception):
+    """A judge call failed or returned output that could not be parsed."""
+
+
+@dataclass
+class JudgeItem:
+    """One Q/A pair to score."""
+    id: str
+    question: str
+    answer: str
+    rubric: Dict[str, str]
+
+
+@dataclass
+class AnswerScore:
+    id: str
+    scores: Dict[str, dict]  # dimension -> {"score": 1-5, "evidence": str}
+    overall_score: float  # 0.0 to 1.0
+    strengths: List[str] = field(default_factory=list)
+    areas_for_improvement: List[str] = field(default_factory=list)
+    error: Optional[str] = None  # set when the answer could not be judged
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at `rate` tokens per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, cost: float = 1.0):
+        """Wait until `cost` tokens are available and take them."""
+        cost = min(cost, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    return
+                await asyncio.sleep((cost - self._tokens) / self.rate)
+
+
+def parse_scores(content: str, items: Sequence[JudgeItem]) -> List[AnswerScore]:
+    """
+    Parse a judge response into one AnswerScore per item.
+
+    Accepts a bare object for a single item or {"results": [...]} with an
+    "id" per entry for a batch, tolerating code fences and surrounding prose.
+
+    Raises:
+        JudgeError: If the output is not JSON or an item is missing
+    """
+    match = _JSON_OBJECT.search(content or "")
+    if not match:
+        raise JudgeError("Judge response contains no JSON object")
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        raise JudgeError(f"Judge response is not valid JSON: {e}") from e
+
+    entries = data.get("results") if isinstance(data, dict) and "results" in data else [data]
+    if not isinstance(entries, list):
+        raise JudgeError("Judge results are not a list")
+    by_id = {str(entry.get("id")): entry for entry in entries if isinstance(entry, dict)}
+    if len(items) == 1 and items[0].id not in by_id and len(entries) == 1 and isinstance(entries[0], dict):
+        by_id[items[0].id] = entries[0]
+
+    results = []
+    for item in items:
+        entry = by_id.get(item.id)
+        if entry is None:
+            raise JudgeError(f"Judge response has no result for {item.id}")
+        results.append(_to_score(item, entry))
+    return results
+
+
+def _to_score(item: JudgeItem, entry: dict) -> AnswerScore:
+    scores = {}
+    for dimension, value in (entry.get("scores") or {}).items():
+        if isinstance(value, dict):
+            score, evidence = value.get("score"), value.get("evidence", "")
+        else:
+            score, evidence = value, ""
+        try:
+            scores[dimension] = {"score": min(max(float(score), 1.0), 5.0), "evidence": str(evidence)}
+        except (TypeError, ValueError):
+            continue
+
+    overall = entry.get("overall_score")
+    try:
+        overall = float(overall)
+        # Some models answer on the rubric's 1-5 scale
+        if overall > 1.0:
+            overall = (min(overall, 5.0) - 1.0) / 4.0
+    except (TypeError, ValueError):
+        if not scores:
+            raise JudgeError(f"Judge result for {item.id} has no scores")
+        overall = sum((s["score"] - 1.0) / 4.0 for s in scores.values()) / len(scores)
+
+    return AnswerScore(
+        id=item.id,
+        scores=scores,
+        overall_score=min(max(overall, 0.0), 1.0),
+        strengths=[str(s) for s in entry.get("strengths") or []],
+        areas_for_improvement=[str(s) for s in entry.get("areas_for_improvement") or []]
+    )
+
+
+class LLMJudge:
+    """
+    LLM-based evaluation of answers.
+
+    Uses GPT to assess answer quality against rubrics.
+    """
+
+    SYSTEM_PROMPT = """You are an expert technical interviewer evaluating candidates' answers.
+Evaluate each answer on each of its rubric dimensions on a scale of 1-5 and give specific evidence.
+Respond with JSON only."""
+
+    EVALUATION_PROMPT = """Question: {question}
+Candidate's Answer: {answer}
+
+Rubric:
+{rubric}
+
+Output format:
+{{
+  "scores": {{
+    "dimension1": {{"score": X, "evidence": "..."}},
+    ...
+  }},
+  "overall_score": X.X (0.0 to 1.0),
+  "strengths": ["...", "..."],
+  "areas_for_improvement": ["...", "..."]
+}}
+"""
+
+    BATCH_PROMPT = """Rubric dimensions (the same for every answer below): {dimensions}
+
+ITEMS:
+{items}
+
+Output format:
+{{
+  "results": [
+    {{
+      "id": "<item id>",
+      "scores": {{"dimension1": {{"score": X, "evidence": "..."}}, ...}},
+      "overall_score": X.X (0.0 to 1.0),
+      "strengths": ["..."],
+      "areas_for_improvement": ["..."]
+    }},
+    ...
+  ]
+}}
+"""
+
+    def __init__(
+        self,
+        endpoint: Optional[str] = None,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        cache: Optional[JudgeCache] = judge_cache
+    ):
+        self.endpoint = endpoint if endpoint is not None else settings.judge_endpoint
+        self.api_key = api_key if api_key is not None else settings.judge_api_key
+        self.model = model or settings.judge_deployment
+        self.max_concurrency = max_concurrency or settings.judge_max_concurrency
+        self.requests_per_minute = requests_per_minute or settings.judge_requests_per_minute
+        self.tokens_per_minute = tokens_per_minute or settings.judge_tokens_per_minute
+        self.batch_size = max(1, batch_size or settings.judge_batch_size)
+        self.max_retries = settings.judge_max_retries if max_retries is None else max_retries
+        self.timeout_seconds = timeout_seconds or settings.judge_timeout_seconds
+        self.cache = cache
+        self.backoff_seconds = 0.5
+        self.max_backoff_seconds = 20.0
+
+        # Loop-bound primitives, created on first use
+        self._client = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._requests: Optional[TokenBucket] = None
+        self._tokens: Optional[TokenBucket] = None
+
+    @property
+    def version(self) -> str:
+        """Identifies the judge's behaviour for cache keys."""
+        return f"{self.model}:{PROMPT_VERSION}"
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.endpoint or (settings.azure_openai_endpoint and settings.azure_openai_api_key))
+
+    def wait_budget(self, answers: int) -> float:
+        """
+        Longest that judging this many answers at once can take, retries included.
+
+        Answers go out in waves of `max_concurrency` batches; each call may use
+        every retry with full backoff, and a failed batch is retried one answer
+        at a time, which at most doubles it.
+        """
+        waves = math.ceil(math.ceil(max(answers, 1) / self.batch_size) / self.max_concurrency)
+        per_call = (self.timeout_seconds + self.max_backoff_seconds) * (self.max_retries + 1)
+        return 2 * waves * per_call
+
+    def _get_client(self):
+        if self._client is None:
+            if self.endpoint:
+                from openai import AsyncOpenAI
+
+                self._client = AsyncOpenAI(
+                    base_url=self.endpoint, api_key=self.api_key or "unused", max_retries=0
+                )
+            else:
+                from openai import AsyncAzureOpenAI
+
+                self._client = AsyncAzureOpenAI(
+                    azure_endpoint=settings.azure_openai_endpoint,
+                    api_key=self.api_key or settings.azure_openai_api_key,
+                    api_version=settings.azure_openai_api_version,
+                    max_retries=0
+                )
+        return self._client
+
+    def _limits(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            rps = self.requests_per_minute / 60.0
+            self._requests = TokenBucket(rps, max(1.0, min(self.max_concurrency, self.requests_per_minute)))
+            tps = self.tokens_per_minute / 60.0
+            self._tokens = TokenBucket(tps, self.tokens_per_minute)
+        return self._semaphore, self._requests, self._tokens
+
+    async def evaluate_answer(
+        self,
+        question: str,
+        answer: str,
+        rubric: Dict[str, str]
+    ) -> dict:
+        """
+        Evaluate a single answer using LLM.
+
+        Returns:
+            Dict with scores, overall_score, strengths, areas_for_improvement
+        """
+        [result] = await self.evaluate_answers([JudgeItem("answer", question, answer, rubric)])
+        return result.as_dict()
+
+    async def evaluate_answers(self, items: Sequence[JudgeItem]) -> List[AnswerScore]:
+        """
+        Evaluate many answers concurrently.
+
+        Args:
+            items: Q/A pairs with their rubrics
+
+        Returns:
+            One AnswerScore per item, in input order; answers that could not
+            be judged carry an error and a neutral score
+        """
+        if not items:
+            return []
+        if not self.configured:
+            # Marked as unjudged so the placeholder never reaches topic scores or skills
+            return [AnswerScore(item.id, {}, PLACEHOLDER_SCORE, error=NOT_CONFIGURED) for item in items]
+
+        keys = {item.id: cache_key(item.question, item.answer, item.rubric, self.version) for item in items}
+        cached = await asyncio.to_thread(self.cache.get_many, keys.values()) if self.cache else {}
+
+        # Judge each distinct uncached answer once
+        pending: Dict[str, JudgeItem] = {}
+        for item in items:
+            if keys[item.id] not in cached:
+                pending.setdefault(keys[item.id], item)
+
+        verdicts: Dict[str, dict] = dict(cached)
+        if pending:
+            batches = self._batches(list(pending.values()))
+            results = await asyncio.gather(*(self._judge_batch(batch) for batch in batches))
+            fresh = {}
+            for score in (score for batch_scores in results for score in batch_scores):
+                verdict = score.as_dict()
+                del verdict["id"]
+                verdicts[keys[score.id]] = verdict
+                if not score.error:
+                    fresh[keys[score.id]] = verdict
+            if self.cache and fresh:
+                await asyncio.to_thread(self.cache.put_many, fresh)
+
+        return [AnswerScore(id=item.id, **verdicts[keys[item.id]]) for item in items]
+
+    def _batches(self, items: Sequence[JudgeItem]) -> List[List[JudgeItem]]:
+        """Group items whose rubrics have the same dimensions, up to batch_size per call."""
+        groups: Dict[tuple, List[JudgeItem]] = {}
+        for item in items:
+            groups.setdefault(tuple(sorted(item.rubric or {})), []).append(item)
+        batches = []
+        for group in groups.values():
+            for start in range(0, len(group), self.batch_size):
+                batches.append(group[start:start + self.batch_size])
+        return batches
+
+    def _prompt(self, batch: Sequence[JudgeItem]) -> str:
+        if len(batch) == 1:
+            item = batch[0]
+            rubric = "\n".join(f"- {dim}: {desc}" for dim, desc in (item.rubric or {}).items())
+            return self.EVALUATION_PROMPT.format(
+                question=item.question, answer=item.answer, rubric=rubric or "- overall: Technical quality"
+            )
+        payload = [
+            {"id": item.id, "question": item.question, "answer": item.answer, "rubric": item.rubric}
+            for item in batch
+        ]
+        return self.BATCH_PROMPT.format(
+            dimensions=", ".join(sorted(batch[0].rubric or {})) or "overall",
+            items=json.dumps(payload, indent=1)
+        )
+
+    async def _judge_batch(self, batch: List[JudgeItem]) -> List[AnswerScore]:
+        try:
+            return await self._call_with_retries(batch)
+        except JudgeError as e:
+            if len(batch) > 1:
+                # A batch the model keeps garbling may still work one answer at a time
+                logger.warning(f"Judge batch of {len(batch)} failed ({e}), retrying individually")
+                singles = await asyncio.gather(*(self._judge_batch([item]) for item in batch))
+                return [score for scores in singles for score in scores]
+            logger.error(f"Judge failed for {batch[0].id}: {e}")
+            return [AnswerScore(batch[0].id, {}, PLACEHOLDER_SCORE, error=str(e))]
+
+    async def _call_with_retries(self, batch: List[JudgeItem]) -> List[AnswerScore]:
+        prompt = self._prompt(batch)
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (attempt - 1))
+                await asyncio.sleep(random.uniform(0, delay))
+            try:
+                content = await self._complete(prompt)
+                return parse_scores(content, batch)
+            except JudgeError as e:
+                last_error = e
+            except Exception as e:
+                if not _retryable(e):
+                    raise JudgeError(f"Judge call failed: {e}") from e
+                last_error = e
+            logger.warning(f"Judge attempt {attempt + 1}/{self.max_retries + 1} failed: {last_error}")
+        raise JudgeError(str(last_error))
+
+    async def _complete(self, prompt: str) -> str:
+        semaphore, requests, tokens = self._limits()
+        await requests.acquire()
+        await tokens.acquire((len(self.SYSTEM_PROMPT) + len(prompt)) / _CHARS_PER_TOKEN)
+        async with semaphore:
+            response = await asyncio.wait_for(
+                self._get_client().chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": self.SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0,
+                    response_format={"type": "json_object"}
+                ),
+                timeout=self.timeout_seconds
+            )
+        return response.choices[0].message.content
+
+
+def _retryable(error: Exception) -> bool:
+    """Rate limits, timeouts, connection errors and 5xx responses are worth retrying."""
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    try:
+        import openai
+    except ImportError:
+        return False
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+# Global judge
+llm_judge = LLMJudge()
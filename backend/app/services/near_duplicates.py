@@ -0,0 +1,303 @@
+"""
+Near-duplicate question detection with MinHash signatures and LSH banding.
+
+Each question is reduced to a set of word and word-pair shingles, and a
+MinHash signature estimates the Jaccard similarity of two such sets. LSH
+splits signatures into bands, so only questions that collide in some band
+are compared: cost grows near-linearly with the bank instead of with the
+number of pairs. Matches are merged into clusters, which the selector
+treats as a single question.
+
+Clustering a large bank takes seconds and a lot of memory, so it runs when
+the bank is compiled or its SQLite store is built, and only the resulting
+question ID -> cluster map is persisted next to the bank. Workers load that
+map; one builds it in the background only if it is missing or stale.
+"""
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+import os
+import tempfile
+import threading
+import zipfile
+import zlib
+
+import numpy as np
+
+from app.services.question_bank import QuestionBank, QuestionBankSnapshot, question_bank
+from app.services.text_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Mersenne prime for the universal hash family (a * x + b) mod p
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+
+# Estimated Jaccard similarity at or above which two questions are near-duplicates
+DEFAULT_THRESHOLD = 0.5
+
+# Persisted cluster map, next to the question files
+CLUSTERS_FILE = "near_duplicates.npz"
+
+
+def shingles(text: str) -> List[int]:
+    """Hashed word and word-pair shingles of a question's text."""
+    tokens = tokenize(text)
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return list({zlib.crc32(gram.encode("utf-8")) for gram in grams})
+
+
+class MinHasher:
+    """Fixed family of NUM_PERM universal hash functions."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    def signature(self, shingle_hashes: Sequence[int]) -> np.ndarray:
+        if not shingle_hashes:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        x = np.asarray(shingle_hashes, dtype=np.uint64)
+        # a * x wraps modulo 2^64 before the reduction, which only adds mixing
+        with np.errstate(over="ignore"):
+            hashed = (np.outer(self.a, x) + self.b[:, None]) % _PRIME & _MAX_HASH
+        return hashed.min(axis=1)
+
+    def signatures(self, texts: Iterable[str]) -> np.ndarray:
+        return np.array([self.signature(shingles(text)) for text in texts], dtype=np.uint64)
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = np.arange(size)
+
+    def find(self, i: int) -> int:
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i: int, j: int):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+class ClusterMap:
+    """
+    Near-duplicate clusters of one bank version, numbered from 0.
+
+    Only questions with at least one near-duplicate have a cluster.
+    """
+
+    def __init__(self, clusters: Sequence[Tuple[str, ...]], version: Optional[str] = None):
+        self.clusters = list(clusters)
+        self.version = version
+        self._cluster_of: Dict[str, int] = {
+            question_id: number for number, cluster in enumerate(self.clusters) for question_id in cluster
+        }
+
+    def __len__(self) -> int:
+        return len(self.clusters)
+
+    def get(self, question_id: str) -> Optional[int]:
+        """Cluster number of a question, or None if it has no near-duplicates."""
+        return self._cluster_of.get(question_id)
+
+    def save(self, path: Path):
+        """Persist the map; each writer uses its own temp file before the atomic replace."""
+        path = Path(path)
+        ids = [question_id for cluster in self.clusters for question_id in cluster]
+        sizes = [len(cluster) for cluster in self.clusters]
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    version=np.array(self.version or ""),
+                    ids=np.array(ids, dtype=str),
+                    sizes=np.array(sizes, dtype=np.int64)
+                )
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path: Path, version: str) -> Optional["ClusterMap"]:
+        """Load a persisted map, or None if missing, unreadable or built for another version."""
+        try:
+            with np.load(path) as data:
+                if str(data["version"]) != version:
+                    return None
+                ids, sizes = data["ids"].tolist(), data["sizes"].tolist()
+        except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+        bounds = np.cumsum([0] + sizes).tolist()
+        return cls([tuple(ids[start:end]) for start, end in zip(bounds, bounds[1:])], version)
+
+
+def build_cluster_map(snapshot, path: Optional[Path] = None) -> ClusterMap:
+    """
+    Cluster every question in a bank view and optionally persist the map.
+
+    Args:
+        snapshot: Any bank view with `domains`, `find` and `version`
+            (a snapshot, a compiled bank or an SQLite store)
+        path: Where to save the map
+
+    Returns:
+        The cluster map; the signature index it came from is discarded
+    """
+    cluster_map = DuplicateIndex.build(snapshot).cluster_map()
+    for cluster in cluster_map.clusters:
+        logger.warning(f"Near-duplicate questions in bank {snapshot.version}: {', '.join(cluster)}")
+    if path is not None:
+        cluster_map.save(path)
+    return cluster_map
+
+
+class DuplicateIndex:
+    """
+    LSH index over question signatures, with the near-duplicate clusters it found.
+
+    Attributes:
+        clusters: Groups of two or more near-duplicate question IDs
+        cluster_of: Question ID -> the cluster (tuple of IDs) it belongs to
+    """
+
+    def __init__(
+        self,
+        ids: List[str],
+        texts: List[str],
+        threshold: float = DEFAULT_THRESHOLD,
+        bands: int = BANDS,
+        version: Optional[str] = None
+    ):
+        self.ids = ids
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.version = version
+        self.hasher = MinHasher()
+        self.signatures = self.hasher.signatures(texts)
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+
+        union_find = _UnionFind(len(ids))
+        for band in range(bands):
+            buckets = self._buckets[band]
+            rows = np.ascontiguousarray(self.signatures[:, band * self.rows:(band + 1) * self.rows])
+            for doc, key in enumerate(map(bytes, rows)):
+                members = buckets.setdefault(key, [])
+                # Compare against the bucket's first member only: a star per
+                # bucket keeps the work linear even for large buckets
+                if members and self.similarity(members[0], doc) >= threshold:
+                    union_find.union(members[0], doc)
+                members.append(doc)
+
+        groups: Dict[int, List[str]] = {}
+        for doc, question_id in enumerate(ids):
+            groups.setdefault(union_find.find(doc), []).append(question_id)
+        self.clusters: List[Tuple[str, ...]] = [tuple(g) for g in groups.values() if len(g) > 1]
+        self.cluster_of: Dict[str, Tuple[str, ...]] = {
+            question_id: cluster for cluster in self.clusters for question_id in cluster
+        }
+
+    def cluster_map(self) -> ClusterMap:
+        """The clusters alone, without the signatures and buckets."""
+        return ClusterMap(self.clusters, self.version)
+
+    @classmethod
+    def build(cls, snapshot: QuestionBankSnapshot, threshold: float = DEFAULT_THRESHOLD) -> "DuplicateIndex":
+        """Index every question in a bank snapshot."""
+        ids, texts = [], []
+        for domain in snapshot.domains:
+            for q in snapshot.find(domain):
+                ids.append(q["id"])
+                texts.append(q["question"])
+        return cls(ids, texts, threshold, version=snapshot.version)
+
+    def similarity(self, i: int, j: int) -> float:
+        """Estimated Jaccard similarity of two indexed questions."""
+        return float(np.mean(self.signatures[i] == self.signatures[j]))
+
+    def query(self, text: str) -> List[Tuple[str, float]]:
+        """
+        Indexed questions that are near-duplicates of a new question text.
+
+        Returns:
+            (question_id, estimated similarity) pairs, most similar first
+        """
+        signature = self.hasher.signature(shingles(text))
+        candidates = set()
+        for band in range(self.bands):
+            key = bytes(np.ascontiguousarray(signature[band * self.rows:(band + 1) * self.rows]))
+            candidates.update(self._buckets[band].get(key, ()))
+
+        matches = []
+        for doc in candidates:
+            score = float(np.mean(self.signatures[doc] == signature))
+            if score >= self.threshold:
+                matches.append((self.ids[doc], score))
+        matches.sort(key=lambda match: -match[1])
+        return matches
+
+
+class ClusterCache:
+    """
+    Keeps the near-duplicate cluster map in step with a hot-reloadable question bank.
+
+    The map is loaded from CLUSTERS_FILE next to the bank. If that file is
+    missing or stale it is built and saved once; after a reload the selector
+    keeps using the previous map while the new one is loaded or built in a
+    background thread.
+    """
+
+    def __init__(self, bank: QuestionBank, path: Optional[Path] = None):
+        self.bank = bank
+        self.path = Path(path) if path else Path(bank.questions_dir) / CLUSTERS_FILE
+        self._map: Optional[ClusterMap] = None
+        self._lock = threading.Lock()
+        self._rebuild: Optional[threading.Thread] = None
+
+    def get(self) -> ClusterMap:
+        """The map for the bank's current snapshot, loading or building it if stale."""
+        snapshot = self.bank.snapshot
+        cluster_map = self._map
+        if cluster_map is not None and cluster_map.version == snapshot.version:
+            return cluster_map
+
+        with self._lock:
+            if self._map is None or self._map.version != snapshot.version:
+                cluster_map = ClusterMap.load(self.path, snapshot.version)
+                if cluster_map is None:
+                    logger.info(f"Clustering near-duplicate questions for bank {snapshot.version}")
+                    cluster_map = build_cluster_map(snapshot)
+                    try:
+                        cluster_map.save(self.path)
+                    except OSError as e:
+                        logger.warning(f"Could not persist near-duplicate clusters: {e}")
+                self._map = cluster_map
+            return self._map
+
+    def current(self) -> ClusterMap:
+        """The cluster map, without blocking on a reload."""
+        cluster_map = self._map
+        if cluster_map is None:
+            return self.get()
+        if cluster_map.version != self.bank.version and not (self._rebuild and self._rebuild.is_alive()):
+            self._rebuild = threading.Thread(target=self.get, name="near-duplicate-clusters", daemon=True)
+            self._rebuild.start()
+        return cluster_map
+
+
+# Global near-duplicate clusters for the global question bank
+near_duplicates = ClusterCache(question_bank)
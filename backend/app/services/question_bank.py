@@ -1,17 +1,40 @@
+import asyncio
+import hashlib
 import json
+import logging
 import random
+import threading
+from collections.abc import Set as AbstractSet
+from datetime import datetime
+from itertools import product
 from pathlib import Path
-from typing import List, Optional, Dict
+from types import MappingProxyType
+from typing import List, Optional, Dict, Iterable, Tuple
 
+from app.config import get_settings
 from app.skill_trees import get_skill_tree
+from app.services.text_index import InvertedIndex, tokenize, tokenize_query
+
+logger = logging.getLogger(__name__)
 
 
 QUESTIONS_DIR = Path(__file__).parent.parent.parent / "data" / "questions"
 
+# Binary artifact written by scripts/compile_question_bank.py
+COMPILED_FILE = "questions.iaqb"
+
+# SQLite store built from the JSON sources when the "sqlite" backend is selected
+SQLITE_FILE = "questions.sqlite"
+
+BACKENDS = ("memory", "sqlite")
+
+# Random probes get_question makes before filtering out excluded IDs
+_SAMPLE_ATTEMPTS = 16
+
 
-def load_questions(domain: str) -> List[dict]:
+def load_questions(domain: str, questions_dir: Path = QUESTIONS_DIR) -> List[dict]:
     """Load questions for a domain from JSON file."""
-    file_path = QUESTIONS_DIR / f"{domain}.json"
+    file_path = Path(questions_dir) / f"{domain}.json"
     if not file_path.exists():
         return []
 
@@ -19,6 +42,383 @@ def load_questions(domain: str) -> List[dict]:
         return json.load(f)
 
 
+class QuestionBankError(ValueError):
+    """Raised when question files fail validation."""
+
+
+VALID_DIFFICULTIES = {"easy", "medium", "hard"}
+REQUIRED_FIELDS = ("id", "topic", "difficulty", "question")
+TEXT_FIELDS = ("id", "topic", "subtopic", "difficulty", "question")
+
+
+def source_signature(questions_dir: Path) -> Tuple:
+    """Cheap change detector for the bank: (name, mtime, size) of each file."""
+    signature = []
+    for file_path in sorted(Path(questions_dir).glob("*.json")):
+        stat = file_path.stat()
+        signature.append((file_path.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def read_source(file_path: Path, digest) -> List[dict]:
+    """Parse one domain file, folding its name and bytes into the bank's content digest."""
+    raw = file_path.read_bytes()
+    digest.update(file_path.name.encode("utf-8"))
+    digest.update(raw)
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise QuestionBankError(f"{file_path.name} is not valid JSON: {e}")
+
+
+def content_version(digest) -> str:
+    """Short content version from a digest fed by read_source for every file, in name order."""
+    return digest.hexdigest()[:12]
+
+
+def validate_questions(domain: str, questions: List[dict], seen_ids: set):
+    """Check a domain's questions before they are served."""
+    if not isinstance(questions, list):
+        raise QuestionBankError(f"{domain}.json must contain a list of questions")
+    for index, q in enumerate(questions):
+        if not isinstance(q, dict):
+            raise QuestionBankError(f"Entry {index} in {domain}.json is not an object")
+        missing = [name for name in REQUIRED_FIELDS if not q.get(name)]
+        if missing:
+            raise QuestionBankError(f"Question {q.get('id')!r} in {domain}.json is missing {missing}")
+        wrong_type = [
+            name for name in TEXT_FIELDS
+            if q.get(name) is not None and not isinstance(q[name], str)
+        ]
+        if wrong_type:
+            raise QuestionBankError(f"Question {q['id']!r} in {domain}.json has non-text {wrong_type}")
+        if not isinstance(q.get("follow_ups") or [], list) or not isinstance(q.get("rubric") or {}, dict):
+            raise QuestionBankError(f"Question {q['id']!r} in {domain}.json has malformed follow_ups or rubric")
+        if q["difficulty"] not in VALID_DIFFICULTIES:
+            raise QuestionBankError(f"Question {q['id']!r} has invalid difficulty {q['difficulty']!r}")
+        if q["id"] in seen_ids:
+            raise QuestionBankError(f"Duplicate question ID {q['id']!r}")
+        seen_ids.add(q["id"])
+
+
+def search_tokens(domain: str, q: dict) -> List[str]:
+    """Searchable terms for a question; topic and subtopic names count double."""
+    topic_node = get_skill_tree(domain).get(q.get("topic"), {})
+    subtopic_node = topic_node.get("topics", {}).get(q.get("subtopic"), {})
+    labels = " ".join([
+        q.get("topic") or "",
+        q.get("subtopic") or "",
+        topic_node.get("name", ""),
+        subtopic_node.get("name", "")
+    ])
+    label_tokens = tokenize(labels)
+    return label_tokens + label_tokens + tokenize(q.get("question", ""))
+
+
+class QuestionBankSnapshot:
+    """
+    Immutable, fully indexed view of one version of the question bank.
+
+    Indexes:
+    - by question ID
+    - by (domain, topic, subtopic, difficulty), where any of topic, subtopic
+      and difficulty may be None to act as a wildcard, so every filter
+      combination accepted by get_question is a single dict lookup
+
+    - BM25 inverted index over topic, subtopic and question text, with
+      postings partitioned by domain
+
+    Question dicts are shared with callers and must be treated as read-only.
+    """
+
+    def __init__(self, questions: Dict[str, List[dict]], version: str, signature: Tuple):
+        by_id: Dict[str, dict] = {}
+        by_key: Dict[Tuple, List[dict]] = {}
+        ordered: List[dict] = []
+        documents: List[List[str]] = []
+        groups: List[str] = []
+
+        for domain, domain_questions in questions.items():
+            for q in domain_questions:
+                by_id[q["id"]] = q
+                topic, subtopic, difficulty = q.get("topic"), q.get("subtopic"), q.get("difficulty")
+                for key in product((topic, None), (subtopic, None), (difficulty, None)):
+                    by_key.setdefault((domain,) + key, []).append(q)
+                ordered.append(q)
+                documents.append(search_tokens(domain, q))
+                groups.append(domain)
+
+        self.version = version
+        self.signature = signature
+        self.loaded_at = datetime.utcnow()
+        self.domains = tuple(questions)
+        self._by_id = MappingProxyType(by_id)
+        self._by_key = MappingProxyType({key: tuple(qs) for key, qs in by_key.items()})
+        self._ordered = tuple(ordered)
+        self._search_index = InvertedIndex(documents, groups)
+
+    @classmethod
+    def build(cls, questions_dir: Path) -> "QuestionBankSnapshot":
+        """Parse, validate and index every domain file in a directory."""
+        questions_dir = Path(questions_dir)
+        signature = source_signature(questions_dir)
+        digest = hashlib.sha256()
+        questions: Dict[str, List[dict]] = {}
+        seen_ids: set = set()
+
+        for file_path in sorted(questions_dir.glob("*.json")):
+            domain = file_path.stem
+            domain_questions = read_source(file_path, digest)
+            validate_questions(domain, domain_questions, seen_ids)
+            questions[domain] = domain_questions
+
+        return cls(questions, content_version(digest), signature)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get_by_id(self, question_id: str) -> Optional[dict]:
+        """Look up a question by ID."""
+        return self._by_id.get(question_id)
+
+    def find(
+        self,
+        domain: str,
+        topic: Optional[str] = None,
+        subtopic: Optional[str] = None,
+        difficulty: Optional[str] = None
+    ) -> Tuple[dict, ...]:
+        """All questions matching the filters."""
+        return self._by_key.get((domain, topic, subtopic, difficulty), ())
+
+    def get_question(
+        self,
+        domain: str,
+        topic: Optional[str] = None,
+        subtopic: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        exclude_ids: Optional[Iterable[str]] = None
+    ) -> Optional[dict]:
+        """Pick a random question matching the filters, skipping excluded IDs."""
+        candidates = self.find(domain, topic, subtopic, difficulty)
+        if not candidates:
+            return None
+        if not exclude_ids:
+            return random.choice(candidates)
+
+        # Probe a few random candidates before paying for a full filter
+        excluded = exclude_ids if isinstance(exclude_ids, AbstractSet) else set(exclude_ids)
+        for _ in range(_SAMPLE_ATTEMPTS):
+            question = candidates[random.randrange(len(candidates))]
+            if question["id"] not in excluded:
+                return question
+
+        remaining = [q for q in candidates if q["id"] not in excluded]
+        return random.choice(remaining) if remaining else None
+
+    def search(
+        self,
+        text: str,
+        domains: Optional[Iterable[str]] = None,
+        k: int = 10
+    ) -> List[Tuple[dict, float]]:
+        """Top-k questions for free text by BM25 relevance, best first."""
+        hits = self._search_index.search(tokenize_query(text), k, domains)
+        return [(self._ordered[doc_id], score) for doc_id, score in hits]
+
+    def questions_for_weak_area(self, domain: str, weak_area: str, count: int = 3) -> List[dict]:
+        """The most relevant questions for a weak area, best first."""
+        return [q for q, _ in self.search(weak_area, (domain,), count)]
+
+    def follow_ups(self, question_id: str) -> List[str]:
+        """Follow-up questions for a question ID."""
+        q = self._by_id.get(question_id)
+        return q.get("follow_ups", []) if q else []
+
+    def rubric(self, question_id: str) -> Optional[Dict]:
+        """Evaluation rubric for a question ID."""
+        q = self._by_id.get(question_id)
+        return q.get("rubric") if q else None
+
+
+class QuestionBank:
+    """
+    Hot-reloadable question bank.
+
+    Every lookup is answered from an immutable QuestionBankSnapshot. When the
+    files on disk change, a new snapshot is built and validated off the
+    event loop and swapped in with a single reference assignment, so callers
+    holding the old snapshot keep a consistent view until they are done.
+    A snapshot that fails validation is logged and never served.
+
+    With the "memory" backend, a compiled artifact built from the current
+    JSON files is memory-mapped if one sits next to them, otherwise the JSON
+    is parsed. With the "sqlite" backend, lookups and search are served from
+    an SQLite/FTS5 store that is rebuilt whenever the JSON files change.
+    """
+
+    def __init__(
+        self,
+        questions_dir: Path = QUESTIONS_DIR,
+        compiled_path: Optional[Path] = None,
+        backend: str = "memory",
+        sqlite_path: Optional[Path] = None
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown question bank backend '{backend}', expected one of {BACKENDS}")
+        self.questions_dir = Path(questions_dir)
+        self.compiled_path = Path(compiled_path) if compiled_path else self.questions_dir / COMPILED_FILE
+        self.backend = backend
+        self.sqlite_path = Path(sqlite_path) if sqlite_path else self.questions_dir / SQLITE_FILE
+        self._snapshot: Optional[QuestionBankSnapshot] = None
+        self._rejected_signature: Optional[Tuple] = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> QuestionBankSnapshot:
+        """The current snapshot, loading it on first use."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._load_lock:
+                if self._snapshot is None:
+                    self._snapshot = self._build_snapshot()
+                snapshot = self._snapshot
+        return snapshot
+
+    @property
+    def version(self) -> Optional[str]:
+        """Content version of the loaded snapshot, if any."""
+        snapshot = self._snapshot
+        return snapshot.version if snapshot else None
+
+    def _build_snapshot(self) -> QuestionBankSnapshot:
+        """Open the configured backend for the current JSON sources."""
+        if self.backend == "sqlite":
+            return self._open_sqlite()
+        if self.compiled_path.exists():
+            from app.services.question_bank_compiled import CompiledQuestionBank
+
+            try:
+                compiled = CompiledQuestionBank(self.compiled_path)
+            except (QuestionBankError, OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable compiled question bank: {e}")
+            else:
+                if compiled.signature == source_signature(self.questions_dir):
+                    return compiled
+                logger.warning("Compiled question bank is stale, loading JSON sources")
+        return QuestionBankSnapshot.build(self.questions_dir)
+
+    def _open_sqlite(self) -> QuestionBankSnapshot:
+        """Open the SQLite store, rebuilding it first if the JSON sources changed."""
+        from app.services.near_duplicates import CLUSTERS_FILE, build_cluster_map
+        from app.services.question_bank_sqlite import SQLiteQuestionBank, build_sqlite_bank, read_signature
+
+        if read_signature(self.sqlite_path) == source_signature(self.questions_dir):
+            return SQLiteQuestionBank(self.sqlite_path)
+
+        count = build_sqlite_bank(self.questions_dir, self.sqlite_path)
+        logger.info(f"Built SQLite question store {self.sqlite_path.name} ({count} questions)")
+        store = SQLiteQuestionBank(self.sqlite_path)
+        # Cluster near-duplicates along with the store, so workers only load the map
+        build_cluster_map(store, self.questions_dir / CLUSTERS_FILE)
+        return store
+
+    def load(self) -> QuestionBankSnapshot:
+        """Build a snapshot from disk and swap it in."""
+        snapshot = self._build_snapshot()
+        with self._load_lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    def reload_if_changed(self) -> bool:
+        """
+        Rebuild the snapshot if the files on disk changed.
+
+        Returns:
+            True if the content version changed
+        """
+        current = self._snapshot
+        signature = source_signature(self.questions_dir)
+        if current is not None and signature in (current.signature, self._rejected_signature):
+            return False
+
+        try:
+            snapshot = self._build_snapshot()
+        except (QuestionBankError, OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+            # Anything the validator missed is rejected too, not retried every interval
+            self._rejected_signature = signature
+            logger.error(f"Question bank reload rejected, keeping version {self.version}: {e}")
+            return False
+
+        with self._load_lock:
+            self._snapshot = snapshot
+
+        # Files may be touched without changing content; only report real changes
+        changed = current is None or snapshot.version != current.version
+        if changed:
+            logger.info(f"Question bank loaded version {snapshot.version} ({len(snapshot)} questions)")
+        return changed
+
+    async def watch(self, interval_seconds: float):
+        """Poll the questions directory and reload when it changes."""
+        while True:
+            try:
+                await asyncio.to_thread(self.reload_if_changed)
+            except Exception as e:
+                logger.error(f"Question bank watcher error: {e}")
+            await asyncio.sleep(interval_seconds)
+
+    def get_by_id(self, question_id: str) -> Optional[dict]:
+        """Look up a question by ID."""
+        return self.snapshot.get_by_id(question_id)
+
+    def find(
+        self,
+        domain: str,
+        topic: Optional[str] = None,
+        subtopic: Optional[str] = None,
+        difficulty: Optional[str] = None
+    ) -> Tuple[dict, ...]:
+        """All questions matching the filters."""
+        return self.snapshot.find(domain, topic, subtopic, difficulty)
+
+    def get_question(
+        self,
+        domain: str,
+        topic: Optional[str] = None,
+        subtopic: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        exclude_ids: Optional[Iterable[str]] = None
+    ) -> Optional[dict]:
+        """Pick a random question matching the filters, skipping excluded IDs."""
+        return self.snapshot.get_question(domain, topic, subtopic, difficulty, exclude_ids)
+
+    def search(
+        self,
+        text: str,
+        domains: Optional[Iterable[str]] = None,
+        k: int = 10
+    ) -> List[Tuple[dict, float]]:
+        """Top-k questions for free text by BM25 relevance, best first."""
+        return self.snapshot.search(text, domains, k)
+
+    def questions_for_weak_area(self, domain: str, weak_area: str, count: int = 3) -> List[dict]:
+        """The most relevant questions for a weak area, best first."""
+        return self.snapshot.questions_for_weak_area(domain, weak_area, count)
+
+    def follow_ups(self, question_id: str) -> List[str]:
+        """Follow-up questions for a question ID."""
+        return self.snapshot.follow_ups(question_id)
+
+    def rubric(self, question_id: str) -> Optional[Dict]:
+        """Evaluation rubric for a question ID."""
+        return self.snapshot.rubric(question_id)
+
+
+# Global question bank instance, loaded on first use and kept fresh by watch()
+question_bank = QuestionBank(backend=get_settings().question_bank_backend)
+
+
 def get_question(
     domain: str,
     topic: Optional[str] = None,
@@ -39,26 +439,7 @@ def get_question(
     Returns:
         A question dict or None if no matching question found
     """
-    questions = load_questions(domain)
-    exclude_ids = exclude_ids or []
-
-    # Filter questions
-    candidates = []
-    for q in questions:
-        if q.get("id") in exclude_ids:
-            continue
-        if topic and q.get("topic") != topic:
-            continue
-        if subtopic and q.get("subtopic") != subtopic:
-            continue
-        if difficulty and q.get("difficulty") != difficulty:
-            continue
-        candidates.append(q)
-
-    if not candidates:
-        return None
-
-    return random.choice(candidates)
+    return question_bank.get_question(domain, topic, subtopic, difficulty, exclude_ids)
 
 
 def get_questions_for_weak_area(
@@ -67,7 +448,7 @@ def get_questions_for_weak_area(
     count: int = 3
 ) -> List[dict]:
     """
-    Get questions targeting a declared weak area.
+    Get questions targeting a declared weak area, ranked by relevance.
 
     Args:
         domain: The domain
@@ -77,32 +458,12 @@ def get_questions_for_weak_area(
     Returns:
         List of relevant questions
     """
-    questions = load_questions(domain)
-
-    # Simple keyword matching for now
-    # In production, this would use semantic search
-    weak_area_lower = weak_area.lower()
-    relevant = []
-
-    for q in questions:
-        text = f"{q.get('topic', '')} {q.get('subtopic', '')} {q.get('question', '')}".lower()
-        if any(word in text for word in weak_area_lower.split()):
-            relevant.append(q)
-
-    # Shuffle and return requested count
-    random.shuffle(relevant)
-    return relevant[:count]
+    return question_bank.questions_for_weak_area(domain, weak_area, count)
 
 
 def get_follow_up_questions(question_id: str) -> List[str]:
     """Get follow-up questions for a given question."""
-    # Search all domains for the question
-    for domain in ["coding", "system_design", "ml"]:
-        questions = load_questions(domain)
-        for q in questions:
-            if q.get("id") == question_id:
-                return q.get("follow_ups", [])
-    return []
+    return question_bank.follow_ups(question_id)
 
 
 def generate_follow_up(
@@ -145,9 +506,4 @@ def generate_follow_up(
 
 def get_rubric(question_id: str) -> Optional[Dict]:
     """Get the evaluation rubric for a question."""
-    for domain in ["coding", "system_design", "ml"]:
-        questions = load_questions(domain)
-        for q in questions:
-            if q.get("id") == question_id:
-                return q.get("rubric")
-    return None
+    return question_bank.rubric(question_id)
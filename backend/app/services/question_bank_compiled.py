@@ -0,0 +1,402 @@
+"""
+Compiled, memory-mappable question bank.
+
+`compile_bank` turns data/questions/*.json (still the source format) into a
+single binary artifact; `CompiledQuestionBank` opens it with mmap and answers
+the same queries as QuestionBankSnapshot without parsing anything up front,
+so startup cost does not grow with bank size and forked workers share the
+same page-cache pages.
+
+Layout (little-endian, every section 8-byte aligned):
+
+    header      magic "IAQB" | u16 format | u16 section count | u32 questions |
+                u32 strings | 12s bank version | u32 signature length
+    signature   JSON source signature, to detect a stale artifact
+    sections    (u64 offset, u64 length) per section, then the section data:
+
+    STRINGS_OFFSETS  u32[strings + 1]   offsets into STRINGS_BLOB
+    STRINGS_BLOB     UTF-8 bytes of the deduplicated string table
+    RECORDS          fixed-width RECORD_DTYPE rows, one per question
+    LISTS            u32 string IDs for follow-ups and rubric (key, value) pairs;
+                     a record's rubric offset is NONE when it has no rubric
+    KEY_HASHES       sorted u64 hashes of (domain, topic, subtopic, difficulty)
+                     with '*' wildcards, mirroring QuestionBankSnapshot.find
+    KEY_RANGES       u32 (start, count) into KEY_POSTINGS per key hash
+    KEY_POSTINGS     u32 record ordinals
+    ID_HASHES        sorted u64 hashes of question IDs
+    ID_ORDINALS      u32 record ordinal per ID hash
+    TERM_HASHES      sorted u64 hashes of (domain, search term)
+    TERM_RANGES      u32 (start, count) into TERM_DOCS/TERM_IMPACTS per term hash
+    TERM_DOCS        u32 record ordinals
+    TERM_IMPACTS     f64 BM25 impact per posting, document length folded in
+
+Search reads the BM25 postings straight from the map, so no process builds
+an in-memory text index.
+"""
+from collections.abc import Set as AbstractSet
+from datetime import datetime
+from itertools import product
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import mmap
+import os
+import random
+import struct
+import tempfile
+
+import numpy as np
+
+from app.services.question_bank import (
+    QuestionBankError,
+    content_version,
+    read_source,
+    search_tokens,
+    source_signature,
+    validate_questions,
+)
+from app.services.text_index import InvertedIndex, tokenize_query, top_documents
+
+MAGIC = b"IAQB"
+FORMAT_VERSION = 2
+NONE = 0xFFFFFFFF
+WILDCARD = "*"
+
+_HEADER = struct.Struct("<4sHHII12sI")
+_SECTION = struct.Struct("<QQ")
+
+(STRINGS_OFFSETS, STRINGS_BLOB, RECORDS, LISTS, KEY_HASHES, KEY_RANGES, KEY_POSTINGS,
+ ID_HASHES, ID_ORDINALS, TERM_HASHES, TERM_RANGES, TERM_DOCS, TERM_IMPACTS) = range(13)
+SECTION_COUNT = 13
+
+RECORD_DTYPE = np.dtype([
+    ("id", "<u4"),
+    ("domain", "<u4"),
+    ("topic", "<u4"),
+    ("subtopic", "<u4"),
+    ("difficulty", "<u4"),
+    ("question", "<u4"),
+    ("follow_ups", "<u4"),
+    ("n_follow_ups", "<u4"),
+    ("rubric", "<u4"),
+    ("n_rubric", "<u4"),
+])
+
+# Rejection-sampling attempts before get_question falls back to filtering
+_SAMPLE_ATTEMPTS = 16
+
+
+def _hash(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _key_hash(domain: str, topic: Optional[str], subtopic: Optional[str], difficulty: Optional[str]) -> int:
+    return _hash("\x1f".join([domain, topic or WILDCARD, subtopic or WILDCARD, difficulty or WILDCARD]))
+
+
+def _term_hash(domain: str, term: str) -> int:
+    return _hash(f"{domain}\x1f{term}")
+
+
+def _align(out: bytearray):
+    out += b"\0" * (-len(out) % 8)
+
+
+def compile_bank(questions_dir: Path, out_path: Path) -> int:
+    """
+    Compile a JSON question bank into the binary artifact.
+
+    Returns:
+        Number of questions written
+    """
+    questions_dir = Path(questions_dir)
+    signature = source_signature(questions_dir)
+    digest = hashlib.sha256()
+
+    strings: List[bytes] = []
+    string_ids: Dict[str, int] = {}
+
+    def intern(value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value.encode("utf-8"))
+        return string_ids[value]
+
+    records = []
+    lists: List[int] = []
+    keys: Dict[int, List[int]] = {}
+    ids: List[Tuple[int, int]] = []
+    documents: List[List[str]] = []
+    seen_ids: set = set()
+
+    for file_path in sorted(questions_dir.glob("*.json")):
+        domain = file_path.stem
+        domain_questions = read_source(file_path, digest)
+        validate_questions(domain, domain_questions, seen_ids)
+
+        for q in domain_questions:
+            ordinal = len(records)
+            follow_ups = q.get("follow_ups", [])
+            rubric = q.get("rubric")
+            follow_ups_start = len(lists)
+            lists.extend(intern(text) for text in follow_ups)
+            rubric_start = len(lists) if rubric is not None else NONE
+            for name, description in (rubric or {}).items():
+                lists.extend((intern(name), intern(description)))
+
+            topic, subtopic, difficulty = q.get("topic"), q.get("subtopic"), q.get("difficulty")
+            records.append((
+                intern(q["id"]), intern(domain), intern(topic), intern(subtopic),
+                intern(difficulty), intern(q["question"]),
+                follow_ups_start, len(follow_ups), rubric_start, len(rubric or {})
+            ))
+            for key in product((topic, None), (subtopic, None), (difficulty, None)):
+                keys.setdefault(_key_hash(domain, *key), []).append(ordinal)
+            ids.append((_hash(q["id"]), ordinal))
+            documents.append(search_tokens(domain, q))
+
+    offsets = np.zeros(len(strings) + 1, dtype="<u4")
+    offsets[1:] = np.cumsum([len(s) for s in strings])
+
+    key_hashes = np.array(sorted(keys), dtype="<u8")
+    key_ranges = np.zeros((len(key_hashes), 2), dtype="<u4")
+    postings: List[int] = []
+    for i, key in enumerate(key_hashes.tolist()):
+        key_ranges[i] = (len(postings), len(keys[key]))
+        postings.extend(keys[key])
+
+    # Postings are grouped by domain, as in QuestionBankSnapshot's index
+    text_index = InvertedIndex(documents, [strings[record[1]].decode("utf-8") for record in records])
+    terms = sorted(
+        ((_term_hash(group, term), doc_ids, impacts) for term, group, doc_ids, impacts in text_index.postings()),
+        key=lambda posting: posting[0]
+    )
+    term_ranges = np.zeros((len(terms), 2), dtype="<u4")
+    start = 0
+    for i, (_, doc_ids, _) in enumerate(terms):
+        term_ranges[i] = (start, len(doc_ids))
+        start += len(doc_ids)
+
+    ids.sort()
+    sections = [
+        offsets.tobytes(),
+        b"".join(strings),
+        np.array(records, dtype=RECORD_DTYPE).tobytes(),
+        np.array(lists, dtype="<u4").tobytes(),
+        key_hashes.tobytes(),
+        key_ranges.tobytes(),
+        np.array(postings, dtype="<u4").tobytes(),
+        np.array([h for h, _ in ids], dtype="<u8").tobytes(),
+        np.array([o for _, o in ids], dtype="<u4").tobytes(),
+        np.array([h for h, _, _ in terms], dtype="<u8").tobytes(),
+        term_ranges.tobytes(),
+        b"".join(doc_ids.astype("<u4").tobytes() for _, doc_ids, _ in terms),
+        b"".join(impacts.astype("<f8").tobytes() for _, _, impacts in terms),
+    ]
+
+    signature_bytes = json.dumps(signature).encode("utf-8")
+    out = bytearray(_HEADER.pack(
+        MAGIC, FORMAT_VERSION, SECTION_COUNT, len(records), len(strings),
+        content_version(digest).encode("ascii"), len(signature_bytes)
+    ))
+    out += signature_bytes
+    _align(out)
+
+    table_at = len(out)
+    out += b"\0" * (_SECTION.size * SECTION_COUNT)
+    for i, data in enumerate(sections):
+        _align(out)
+        _SECTION.pack_into(out, table_at + i * _SECTION.size, len(out), len(data))
+        out += data
+
+    out_path = Path(out_path)
+    fd, tmp_name = tempfile.mkstemp(dir=out_path.parent, prefix=out_path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(out)
+        os.replace(tmp_name, out_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return len(records)
+
+
+class CompiledQuestionBank:
+    """
+    Read-only view over a compiled bank artifact.
+
+    Opening maps the file and reads the header only; string decoding and
+    question dicts are produced on demand. Offers the same lookups as
+    QuestionBankSnapshot, so QuestionBank can serve either.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = self._mmap
+
+        try:
+            magic, fmt, section_count, count, string_count, version, sig_len = _HEADER.unpack_from(buf, 0)
+        except struct.error:
+            raise QuestionBankError(f"{self.path.name} is not a compiled question bank")
+        if magic != MAGIC or fmt != FORMAT_VERSION or section_count != SECTION_COUNT:
+            raise QuestionBankError(f"{self.path.name} has an unsupported format")
+
+        signature = json.loads(bytes(buf[_HEADER.size:_HEADER.size + sig_len]))
+        self.signature = tuple(tuple(entry) for entry in signature)
+        self.version = version.decode("ascii")
+        self.loaded_at = datetime.utcnow()
+        self._count = count
+
+        table_at = _HEADER.size + sig_len
+        table_at += -table_at % 8
+
+        def section(index: int, dtype) -> np.ndarray:
+            offset, length = _SECTION.unpack_from(buf, table_at + index * _SECTION.size)
+            return np.frombuffer(buf, dtype=dtype, count=length // np.dtype(dtype).itemsize, offset=offset)
+
+        self._string_offsets = section(STRINGS_OFFSETS, "<u4")
+        blob_offset, _ = _SECTION.unpack_from(buf, table_at + STRINGS_BLOB * _SECTION.size)
+        self._blob = memoryview(buf)[blob_offset:]
+        self._records = section(RECORDS, RECORD_DTYPE)
+        self._lists = section(LISTS, "<u4")
+        self._key_hashes = section(KEY_HASHES, "<u8")
+        self._key_ranges = section(KEY_RANGES, "<u4").reshape(-1, 2)
+        self._key_postings = section(KEY_POSTINGS, "<u4")
+        self._id_hashes = section(ID_HASHES, "<u8")
+        self._id_ordinals = section(ID_ORDINALS, "<u4")
+        self._term_hashes = section(TERM_HASHES, "<u8")
+        self._term_ranges = section(TERM_RANGES, "<u4").reshape(-1, 2)
+        self._term_docs = section(TERM_DOCS, "<u4")
+        self._term_impacts = section(TERM_IMPACTS, "<f8")
+        self._domains: Optional[Tuple[str, ...]] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def domains(self) -> Tuple[str, ...]:
+        """Domains present in the bank, in file order."""
+        if self._domains is None:
+            domain_ids, first = np.unique(self._records["domain"], return_index=True)
+            self._domains = tuple(self._string(int(i)) for i in domain_ids[np.argsort(first)])
+        return self._domains
+
+    def _string(self, string_id: int) -> Optional[str]:
+        if string_id == NONE:
+            return None
+        start, end = self._string_offsets[string_id], self._string_offsets[string_id + 1]
+        return str(self._blob[start:end], "utf-8")
+
+    def _question(self, ordinal: int) -> dict:
+        record = self._records[ordinal]
+        follow_ups = self._lists[record["follow_ups"]:record["follow_ups"] + record["n_follow_ups"]]
+        rubric = None
+        if record["rubric"] != NONE:
+            pairs = self._lists[record["rubric"]:record["rubric"] + 2 * record["n_rubric"]].tolist()
+            rubric = {self._string(pairs[i]): self._string(pairs[i + 1]) for i in range(0, len(pairs), 2)}
+        return {
+            "id": self._string(record["id"]),
+            "domain": self._string(record["domain"]),
+            "topic": self._string(record["topic"]),
+            "subtopic": self._string(record["subtopic"]),
+            "difficulty": self._string(record["difficulty"]),
+            "question": self._string(record["question"]),
+            "follow_ups": [self._string(i) for i in follow_ups.tolist()],
+            "rubric": rubric,
+        }
+
+    def _ordinals(
+        self,
+        domain: str,
+        topic: Optional[str],
+        subtopic: Optional[str],
+        difficulty: Optional[str]
+    ) -> np.ndarray:
+        key = np.uint64(_key_hash(domain, topic, subtopic, difficulty))
+        i = int(np.searchsorted(self._key_hashes, key))
+        if i >= len(self._key_hashes) or self._key_hashes[i] != key:
+            return self._key_postings[:0]
+        start, count = self._key_ranges[i]
+        return self._key_postings[start:start + count]
+
+    def get_by_id(self, question_id: str) -> Optional[dict]:
+        """Look up a question by ID."""
+        key = np.uint64(_hash(question_id))
+        i = int(np.searchsorted(self._id_hashes, key))
+        while i < len(self._id_hashes) and self._id_hashes[i] == key:
+            ordinal = int(self._id_ordinals[i])
+            if self._string(self._records[ordinal]["id"]) == question_id:
+                return self._question(ordinal)
+            i += 1
+        return None
+
+    def find(
+        self,
+        domain: str,
+        topic: Optional[str] = None,
+        subtopic: Optional[str] = None,
+        difficulty: Optional[str] = None
+    ) -> Tuple[dict, ...]:
+        """All questions matching the filters."""
+        return tuple(self._question(o) for o in self._ordinals(domain, topic, subtopic, difficulty).tolist())
+
+    def get_question(
+        self,
+        domain: str,
+        topic: Optional[str] = None,
+        subtopic: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        exclude_ids: Optional[Iterable[str]] = None
+    ) -> Optional[dict]:
+        """Pick a random question matching the filters, skipping excluded IDs."""
+        ordinals = self._ordinals(domain, topic, subtopic, difficulty)
+        if not len(ordinals):
+            return None
+
+        excluded = exclude_ids if isinstance(exclude_ids, AbstractSet) else set(exclude_ids or ())
+        for _ in range(_SAMPLE_ATTEMPTS):
+            ordinal = int(ordinals[random.randrange(len(ordinals))])
+            if self._string(self._records[ordinal]["id"]) not in excluded:
+                return self._question(ordinal)
+
+        remaining = [o for o in ordinals.tolist() if self._string(self._records[o]["id"]) not in excluded]
+        return self._question(random.choice(remaining)) if remaining else None
+
+    def search(
+        self,
+        text: str,
+        domains: Optional[Iterable[str]] = None,
+        k: int = 10
+    ) -> List[Tuple[dict, float]]:
+        """Top-k questions for free text by BM25 relevance, best first."""
+        wanted = self.domains if domains is None else tuple(domains)
+        doc_ids, impacts = [], []
+        for term in dict.fromkeys(tokenize_query(text)):
+            for domain in wanted:
+                key = np.uint64(_term_hash(domain, term))
+                i = int(np.searchsorted(self._term_hashes, key))
+                if i < len(self._term_hashes) and self._term_hashes[i] == key:
+                    start, count = self._term_ranges[i]
+                    doc_ids.append(self._term_docs[start:start + count])
+                    impacts.append(self._term_impacts[start:start + count])
+        hits = top_documents(doc_ids, impacts, self._count, k)
+        return [(self._question(ordinal), score) for ordinal, score in hits]
+
+    def questions_for_weak_area(self, domain: str, weak_area: str, count: int = 3) -> List[dict]:
+        """The most relevant questions for a weak area, best first."""
+        return [q for q, _ in self.search(weak_area, (domain,), count)]
+
+    def follow_ups(self, question_id: str) -> List[str]:
+        """Follow-up questions for a question ID."""
+        q = self.get_by_id(question_id)
+        return q["follow_ups"] if q else []
+
+    def rubric(self, question_id: str) -> Optional[Dict]:
+        """Evaluation rubric for a question ID."""
+        q = self.get_by_id(question_id)
+        return q["rubric"] if q else None
@@ -0,0 +1,356 @@
+"""
+SQLite-backed question bank with an FTS5 full-text index.
+
+For banks too large to hold per worker in Python dicts. Filtering by
+domain, topic, subtopic and difficulty and keyword search run as indexed
+SQL; only the rows a query returns are turned into dicts, and already-asked
+questions are skipped by testing those rows against the exclusion set. The database is built from the JSON sources and rebuilt
+whenever they change.
+"""
+from collections.abc import Set as AbstractSet
+from datetime import datetime
+from itertools import product
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+
+from app.services.question_bank import (
+    QuestionBankError,
+    content_version,
+    read_source,
+    source_signature,
+    validate_questions,
+)
+from app.services.text_index import tokenize_query
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE questions (
+    ordinal INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    domain TEXT NOT NULL,
+    topic TEXT,
+    subtopic TEXT,
+    difficulty TEXT,
+    question TEXT NOT NULL,
+    follow_ups TEXT NOT NULL,
+    rubric TEXT
+);
+CREATE TABLE selection (
+    domain TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    subtopic TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    ordinal INTEGER NOT NULL,
+    PRIMARY KEY (domain, topic, subtopic, difficulty, rank)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE questions_fts USING fts5(
+    labels, question,
+    content='questions', content_rowid='ordinal',
+    tokenize='porter unicode61'
+);
+"""
+
+# FTS5 column weights for bm25(): topic/subtopic labels count double
+_LABEL_WEIGHT = 2.0
+_QUESTION_WEIGHT = 1.0
+
+_COLUMNS = "id, domain, topic, subtopic, difficulty, question, follow_ups, rubric"
+_Q_COLUMNS = ", ".join(f"q.{column}" for column in _COLUMNS.split(", "))
+
+# Filter value stored in the selection table for "any"
+WILDCARD = ""
+
+# Random probes before get_question lets SQL enumerate the non-excluded rows
+_SAMPLE_ATTEMPTS = 16
+
+
+def build_sqlite_bank(questions_dir: Path, db_path: Path) -> int:
+    """
+    Build the SQLite question store from the JSON sources.
+
+    Returns:
+        Number of questions written
+    """
+    questions_dir = Path(questions_dir)
+    signature = source_signature(questions_dir)
+    digest = hashlib.sha256()
+
+    # A private temp file per build, so workers rebuilding at once never share one
+    db_path = Path(db_path)
+    fd, tmp_name = tempfile.mkstemp(dir=db_path.parent, prefix=db_path.name + ".", suffix=".tmp")
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        seen_ids: set = set()
+        rows: List[tuple] = []
+        selection: Dict[Tuple[str, str, str, str], List[int]] = {}
+        for file_path in sorted(questions_dir.glob("*.json")):
+            domain = file_path.stem
+            domain_questions = read_source(file_path, digest)
+            validate_questions(domain, domain_questions, seen_ids)
+            for q in domain_questions:
+                ordinal = len(rows)
+                topic, subtopic, difficulty = q.get("topic"), q.get("subtopic"), q.get("difficulty")
+                rows.append((
+                    ordinal, q["id"], domain, topic, subtopic, difficulty, q["question"],
+                    json.dumps(q.get("follow_ups", [])),
+                    json.dumps(q["rubric"]) if q.get("rubric") is not None else None
+                ))
+                # One selection row per wildcard combination, like QuestionBankSnapshot.find
+                keys = {
+                    (domain,) + key
+                    for key in product(
+                        (topic or WILDCARD, WILDCARD),
+                        (subtopic or WILDCARD, WILDCARD),
+                        (difficulty or WILDCARD, WILDCARD)
+                    )
+                }
+                for key in keys:
+                    selection.setdefault(key, []).append(ordinal)
+
+        conn.executemany(
+            f"INSERT INTO questions (ordinal, {_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+        conn.executemany(
+            "INSERT INTO selection (domain, topic, subtopic, difficulty, rank, ordinal) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key + (rank, ordinal) for key, ordinals in selection.items() for rank, ordinal in enumerate(ordinals))
+        )
+        conn.execute(
+            "INSERT INTO questions_fts (rowid, labels, question) "
+            "SELECT ordinal, replace(coalesce(topic, '') || ' ' || coalesce(subtopic, ''), '_', ' '), question "
+            "FROM questions"
+        )
+        conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+            ("schema_version", str(SCHEMA_VERSION)),
+            ("version", content_version(digest)),
+            ("signature", json.dumps(signature)),
+        ])
+        conn.commit()
+        conn.execute("VACUUM")
+    except BaseException:
+        conn.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    conn.close()
+
+    os.replace(tmp_path, db_path)
+    return len(rows)
+
+
+def read_signature(db_path: Path) -> Optional[Tuple]:
+    """Source signature a store was built from, or None if unreadable."""
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            rows = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    if rows.get("schema_version") != str(SCHEMA_VERSION):
+        return None
+    return tuple(tuple(entry) for entry in json.loads(rows["signature"]))
+
+
+def _fts_query(text: str) -> Optional[str]:
+    """OR together the quoted query terms so any match contributes to bm25."""
+    terms = dict.fromkeys(tokenize_query(text))
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+class SQLiteQuestionBank:
+    """
+    Read-only question bank served from SQLite.
+
+    Offers the same lookups as QuestionBankSnapshot. Each thread gets its
+    own read-only connection.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        meta = dict(self._conn().execute("SELECT key, value FROM meta").fetchall())
+        if meta.get("schema_version") != str(SCHEMA_VERSION):
+            raise QuestionBankError(f"{self.db_path.name} has an unsupported schema")
+        self.version = meta["version"]
+        self.signature = tuple(tuple(entry) for entry in json.loads(meta["signature"]))
+        self.loaded_at = datetime.utcnow()
+        self.domains = tuple(
+            row[0] for row in self._conn().execute(
+                "SELECT domain FROM questions GROUP BY domain ORDER BY min(ordinal)"
+            )
+        )
+        self._count = self._conn().execute("SELECT count(*) FROM questions").fetchone()[0]
+        self._counts: Dict[Tuple[str, str, str, str], int] = {}
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(row: tuple) -> dict:
+        return {
+            "id": row[0],
+            "domain": row[1],
+            "topic": row[2],
+            "subtopic": row[3],
+            "difficulty": row[4],
+            "question": row[5],
+            "follow_ups": json.loads(row[6]),
+            "rubric": json.loads(row[7]) if row[7] is not None else None,
+        }
+
+    @staticmethod
+    def _key(
+        domain: str,
+        topic: Optional[str],
+        subtopic: Optional[str],
+        difficulty: Optional[str]
+    ) -> Tuple[str, str, str, str]:
+        return (domain, topic or WILDCARD, subtopic or WILDCARD, difficulty or WILDCARD)
+
+    def _match_count(self, key: Tuple[str, str, str, str]) -> int:
+        """Number of questions for a filter key; the store is immutable, so counts are cached."""
+        count = self._counts.get(key)
+        if count is None:
+            row = self._conn().execute(
+                "SELECT rank FROM selection WHERE domain = ? AND topic = ? AND subtopic = ? AND difficulty = ? "
+                "ORDER BY rank DESC LIMIT 1", key
+            ).fetchone()
+            count = row[0] + 1 if row else 0
+            self._counts[key] = count
+        return count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get_by_id(self, question_id: str) -> Optional[dict]:
+        """Look up a question by ID."""
+        row = self._conn().execute(
+            f"SELECT {_COLUMNS} FROM questions WHERE id = ?", (question_id,)
+        ).fetchone()
+        return self._row(row) if row else None
+
+    def find(
+        self,
+        domain: str,
+        topic: Optional[str] = None,
+        subtopic: Optional[str] = None,
+        difficulty: Optional[str] = None
+    ) -> Tuple[dict, ...]:
+        """All questions matching the filters."""
+        rows = self._conn().execute(
+            f"SELECT {_Q_COLUMNS} FROM selection s JOIN questions q ON q.ordinal = s.ordinal "
+            "WHERE s.domain = ? AND s.topic = ? AND s.subtopic = ? AND s.difficulty = ? ORDER BY s.rank",
+            self._key(domain, topic, subtopic, difficulty)
+        )
+        return tuple(self._row(row) for row in rows)
+
+    def get_question(
+        self,
+        domain: str,
+        topic: Optional[str] = None,
+        subtopic: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        exclude_ids: Optional[Iterable[str]] = None
+    ) -> Optional[dict]:
+        """Pick a random question matching the filters, skipping excluded IDs."""
+        key = self._key(domain, topic, subtopic, difficulty)
+        count = self._match_count(key)
+        if not count:
+            return None
+
+        conn = self._conn()
+        sql = f"SELECT {_Q_COLUMNS} FROM selection s JOIN questions q ON q.ordinal = s.ordinal " \
+            "WHERE s.domain = ? AND s.topic = ? AND s.subtopic = ? AND s.difficulty = ?"
+        if not exclude_ids:
+            row = conn.execute(f"{sql} AND s.rank = ?", key + (random.randrange(count),)).fetchone()
+            return self._row(row)
+
+        # Exclusion is tested in Python, one O(1) membership check per candidate,
+        # so a SeenQuestions history (and its near-duplicate clusters) applies as
+        # it does for the in-memory bank without being walked or sent to SQL
+        excluded = exclude_ids if isinstance(exclude_ids, AbstractSet) else set(exclude_ids)
+
+        # Each probe is a primary-key seek on (filter, rank)
+        for _ in range(_SAMPLE_ATTEMPTS):
+            row = conn.execute(f"{sql} AND s.rank = ?", key + (random.randrange(count),)).fetchone()
+            if row[0] not in excluded:
+                return self._row(row)
+
+        # Nearly everything is excluded: scan the slice's IDs for what is left
+        remaining = [ordinal for ordinal, question_id in conn.execute(
+            "SELECT s.ordinal, q.id FROM selection s JOIN questions q ON q.ordinal = s.ordinal "
+            "WHERE s.domain = ? AND s.topic = ? AND s.subtopic = ? AND s.difficulty = ?", key
+        ) if question_id not in excluded]
+        if not remaining:
+            return None
+        row = conn.execute(
+            f"SELECT {_COLUMNS} FROM questions WHERE ordinal = ?", (random.choice(remaining),)
+        ).fetchone()
+        return self._row(row)
+
+    def search(
+        self,
+        text: str,
+        domains: Optional[Iterable[str]] = None,
+        k: int = 10
+    ) -> List[Tuple[dict, float]]:
+        """Top-k questions for free text by FTS5 bm25 relevance, best first."""
+        query = _fts_query(text)
+        if query is None or k <= 0:
+            return []
+
+        sql = (
+            f"SELECT {_Q_COLUMNS}, "
+            f"bm25(questions_fts, {_LABEL_WEIGHT}, {_QUESTION_WEIGHT}) AS score "
+            "FROM questions_fts JOIN questions q ON q.ordinal = questions_fts.rowid "
+            "WHERE questions_fts MATCH ?"
+        )
+        params: list = [query]
+        if domains is not None:
+            domains = list(domains)
+            sql += f" AND q.domain IN ({', '.join('?' * len(domains))})"
+            params.extend(domains)
+        sql += " ORDER BY score, q.ordinal LIMIT ?"
+        params.append(k)
+
+        # SQLite's bm25() is negative, lower is better
+        return [(self._row(row[:-1]), -row[-1]) for row in self._conn().execute(sql, params)]
+
+    def questions_for_weak_area(self, domain: str, weak_area: str, count: int = 3) -> List[dict]:
+        """The most relevant questions for a weak area, best first."""
+        return [q for q, _ in self.search(weak_area, (domain,), count)]
+
+    def follow_ups(self, question_id: str) -> List[str]:
+        """Follow-up questions for a question ID."""
+        row = self._conn().execute(
+            "SELECT follow_ups FROM questions WHERE id = ?", (question_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def rubric(self, question_id: str) -> Optional[Dict]:
+        """Evaluation rubric for a question ID."""
+        row = self._conn().execute(
+            "SELECT rubric FROM questions WHERE id = ?", (question_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else None
@@ -0,0 +1,318 @@
+"""
+Per-user history of asked questions, so regulars are not asked repeats.
+
+Each question ID gets a stable ordinal the first time anyone is asked it,
+and each user's history is a bitmap over those ordinals. The bitmap is
+loaded when the user's session starts, consulted in O(1) per candidate
+during selection and persisted as questions are asked. Alongside it each
+loaded user gets a bitmap over near-duplicate clusters, so excluding a
+whole cluster is one bit test as well.
+"""
+from collections.abc import Set as AbstractSet
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+import threading
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.question_history import QuestionHistory, QuestionOrdinal
+from app.services.near_duplicates import ClusterCache, ClusterMap, near_duplicates
+from app.services.question_bank import QuestionBank, question_bank
+
+logger = logging.getLogger(__name__)
+
+# What select_question does when every matching question was already seen:
+#   relax  - widen the slice (drop difficulty, then subtopic) before repeating
+#   repeat - allow repeats from the same slice, still skipping this session's questions
+#   none   - return None
+FALLBACK_POLICIES = ("relax", "repeat", "none")
+
+
+class QuestionBitmap:
+    """Growable bitset over question ordinals."""
+
+    __slots__ = ("_bits",)
+
+    def __init__(self, data: bytes = b""):
+        # No trailing zero bytes, so the bitmap is non-empty exactly when it has bytes
+        self._bits = bytearray(data.rstrip(b"\0"))
+
+    def __contains__(self, ordinal: int) -> bool:
+        byte = ordinal >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << (ordinal & 7)))
+
+    def __len__(self) -> int:
+        return int.from_bytes(self._bits, "little").bit_count()
+
+    def __bool__(self) -> bool:
+        return bool(self._bits)
+
+    def add(self, ordinal: int) -> bool:
+        """Set a bit. Returns True if it was not already set."""
+        byte, mask = ordinal >> 3, 1 << (ordinal & 7)
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(byte + 1 - len(self._bits)))
+        if self._bits[byte] & mask:
+            return False
+        self._bits[byte] |= mask
+        return True
+
+    def ordinals(self) -> Iterator[int]:
+        """Set ordinals in ascending order."""
+        for byte, value in enumerate(self._bits):
+            while value:
+                low = value & -value
+                yield (byte << 3) + low.bit_length() - 1
+                value ^= low
+
+    def highest(self) -> int:
+        """Largest set ordinal, or -1 if empty."""
+        return int.from_bytes(self._bits, "little").bit_length() - 1
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._bits).rstrip(b"\0")
+
+
+class SeenQuestions(AbstractSet):
+    """
+    Read-only set of question IDs a user has been asked.
+
+    Membership maps the ID to its ordinal and tests one bit. IDs in `extra`
+    (e.g. questions asked earlier in the current session) count as seen too,
+    and a question counts as seen when any near-duplicate of it in
+    `clusters` was: for a clustered question the one bit tested is its
+    cluster's in `cluster_bits`, which has the cluster of every asked
+    question set. Can be passed straight to get_question as exclude_ids.
+    """
+
+    def __init__(
+        self,
+        bitmap: QuestionBitmap,
+        ordinals: Dict[str, int],
+        question_ids: List[str],
+        extra: Iterable[str] = (),
+        clusters: Optional[ClusterMap] = None,
+        cluster_bits: Optional[QuestionBitmap] = None
+    ):
+        self._bitmap = bitmap
+        self._ordinals = ordinals
+        self._question_ids = question_ids
+        self._extra = frozenset(extra)
+        self._clusters = clusters
+        self._cluster_bits = cluster_bits if cluster_bits is not None else QuestionBitmap()
+        self._extra_clusters = frozenset(
+            cluster for cluster in map(self._cluster, self._extra) if cluster is not None
+        )
+
+    def _cluster(self, question_id: str) -> Optional[int]:
+        return self._clusters.get(question_id) if self._clusters is not None else None
+
+    def __contains__(self, question_id) -> bool:
+        if question_id in self._extra:
+            return True
+        cluster = self._cluster(question_id)
+        if cluster is not None:
+            return cluster in self._cluster_bits or cluster in self._extra_clusters
+        ordinal = self._ordinals.get(question_id)
+        return ordinal is not None and ordinal in self._bitmap
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._extra
+        for ordinal in self._bitmap.ordinals():
+            question_id = self._question_ids[ordinal]
+            if question_id is not None and question_id not in self._extra:
+                yield question_id
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        # `if not exclude_ids` must not walk the whole history
+        return bool(self._extra) or bool(self._bitmap)
+
+    def including(self, question_ids: Iterable[str]) -> "SeenQuestions":
+        """A view that also treats the given IDs as seen."""
+        return SeenQuestions(
+            self._bitmap, self._ordinals, self._question_ids, self._extra | set(question_ids),
+            self._clusters, self._cluster_bits
+        )
+
+
+class QuestionHistoryService:
+    """
+    Loads, queries and persists per-user asked-question bitmaps.
+
+    The ordinal registry and loaded bitmaps are cached in memory; every
+    recorded question is written through to the database. Near-duplicate
+    questions share history, so asking one excludes its whole cluster.
+    """
+
+    def __init__(self, bank: QuestionBank = question_bank, duplicates: Optional[ClusterCache] = None):
+        self.bank = bank
+        self.duplicates = duplicates or ClusterCache(bank)
+        self._ordinals: Dict[str, int] = {}
+        self._question_ids: List[str] = []
+        self._registry_loaded = False
+        self._histories: Dict[int, QuestionBitmap] = {}
+        # Per loaded user: the cluster map used and the clusters of every asked question
+        self._cluster_histories: Dict[int, Tuple[ClusterMap, QuestionBitmap]] = {}
+        self._lock = threading.Lock()
+
+    def _load_registry(self, db: Session):
+        rows = db.query(QuestionOrdinal.question_id, QuestionOrdinal.ordinal).all()
+        question_ids: List[Optional[str]] = [None] * (max((o for _, o in rows), default=-1) + 1)
+        for question_id, ordinal in rows:
+            question_ids[ordinal] = question_id
+        self._question_ids = question_ids
+        self._ordinals = {question_id: ordinal for question_id, ordinal in rows}
+        self._registry_loaded = True
+
+    def _assign_ordinals(self, db: Session, question_ids: Iterable[str]) -> List[int]:
+        """Ordinals for question IDs, registering new IDs."""
+        for _ in range(3):
+            if not self._registry_loaded:
+                self._load_registry(db)
+            new_ids = [qid for qid in dict.fromkeys(question_ids) if qid not in self._ordinals]
+            if not new_ids:
+                return [self._ordinals[qid] for qid in question_ids]
+
+            start = len(self._question_ids)
+            db.add_all(QuestionOrdinal(question_id=qid, ordinal=start + i) for i, qid in enumerate(new_ids))
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another worker registered ordinals first; reload and retry
+                db.rollback()
+                self._registry_loaded = False
+                continue
+            for i, qid in enumerate(new_ids):
+                self._ordinals[qid] = start + i
+                self._question_ids.append(qid)
+            return [self._ordinals[qid] for qid in question_ids]
+        raise RuntimeError("Could not register question ordinals")
+
+    def load_user(self, db: Session, user_id: int) -> SeenQuestions:
+        """Load a user's history into memory (at session start)."""
+        with self._lock:
+            row = db.query(QuestionHistory).filter(QuestionHistory.user_id == user_id).first()
+            bitmap = QuestionBitmap(row.bitmap if row else b"")
+            # Other workers may have registered ordinals since the registry was read
+            if not self._registry_loaded or bitmap.highest() >= len(self._question_ids):
+                self._load_registry(db)
+            self._histories[user_id] = bitmap
+        return self.seen(user_id)
+
+    def unload_user(self, user_id: int):
+        """Drop a user's cached history (at session end)."""
+        with self._lock:
+            self._histories.pop(user_id, None)
+            self._cluster_histories.pop(user_id, None)
+
+    def _cluster_bits(self, user_id: int, bitmap: QuestionBitmap, clusters: ClusterMap) -> QuestionBitmap:
+        """A loaded user's cluster bitmap, recomputed when the cluster map changed; caller holds the lock."""
+        cached = self._cluster_histories.get(user_id)
+        if cached is not None and cached[0] is clusters:
+            return cached[1]
+        bits = QuestionBitmap()
+        for ordinal in bitmap.ordinals():
+            cluster = clusters.get(self._question_ids[ordinal]) if ordinal < len(self._question_ids) else None
+            if cluster is not None:
+                bits.add(cluster)
+        self._cluster_histories[user_id] = (clusters, bits)
+        return bits
+
+    def seen(self, user_id: int) -> SeenQuestions:
+        """Questions the user has been asked; empty if their history is not loaded."""
+        clusters = self.duplicates.current()
+        bitmap = self._histories.get(user_id)
+        if bitmap is None:
+            return SeenQuestions(QuestionBitmap(), self._ordinals, self._question_ids, clusters=clusters)
+        with self._lock:
+            cluster_bits = self._cluster_bits(user_id, bitmap, clusters)
+        return SeenQuestions(bitmap, self._ordinals, self._question_ids, (), clusters, cluster_bits)
+
+    def record_asked(self, db: Session, user_id: int, question_ids: Iterable[str]) -> int:
+        """
+        Mark questions as asked and persist the user's bitmap.
+
+        Returns:
+            Number of questions not seen before
+        """
+        question_ids = list(question_ids)
+        if not question_ids:
+            return 0
+
+        with self._lock:
+            bitmap = self._histories.get(user_id)
+            if bitmap is None:
+                row = db.query(QuestionHistory).filter(QuestionHistory.user_id == user_id).first()
+                bitmap = QuestionBitmap(row.bitmap if row else b"")
+                self._histories[user_id] = bitmap
+
+            added = sum(bitmap.add(ordinal) for ordinal in self._assign_ordinals(db, question_ids))
+            cached = self._cluster_histories.get(user_id)
+            if cached is not None:
+                clusters, cluster_bits = cached
+                for question_id in question_ids:
+                    cluster = clusters.get(question_id)
+                    if cluster is not None:
+                        cluster_bits.add(cluster)
+            if added:
+                db.merge(QuestionHistory(
+                    user_id=user_id,
+                    bitmap=bitmap.to_bytes(),
+                    questions_seen=len(bitmap)
+                ))
+                db.commit()
+            return added
+
+    def select_question(
+        self,
+        user_id: int,
+        domain: str,
+        topic: Optional[str] = None,
+        subtopic: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        exclude_ids: Optional[Iterable[str]] = None,
+        fallback: str = "relax"
+    ) -> Optional[dict]:
+        """
+        Pick a question the user has not been asked before.
+
+        Args:
+            user_id: Candidate whose history to consult
+            domain, topic, subtopic, difficulty: Slice to pick from
+            exclude_ids: Questions already asked in the current session
+            fallback: One of FALLBACK_POLICIES, applied when the slice is exhausted
+
+        Returns:
+            Question dict or None
+        """
+        if fallback not in FALLBACK_POLICIES:
+            raise ValueError(f"Unknown fallback policy '{fallback}', expected one of {FALLBACK_POLICIES}")
+
+        session_ids = frozenset(exclude_ids or ())
+        excluded = self.seen(user_id).including(session_ids)
+
+        slices = [(topic, subtopic, difficulty)]
+        if fallback == "relax":
+            if difficulty:
+                slices.append((topic, subtopic, None))
+            if subtopic:
+                slices.append((topic, None, None))
+
+        for slice_topic, slice_subtopic, slice_difficulty in slices:
+            question = self.bank.get_question(domain, slice_topic, slice_subtopic, slice_difficulty, excluded)
+            if question:
+                return question
+
+        if fallback == "none":
+            return None
+
+        logger.info(f"User {user_id} has seen every {domain}/{topic or '*'} question, allowing repeats")
+        return self.bank.get_question(domain, topic, subtopic, difficulty, session_ids)
+
+
+# Global question history service
+question_history = QuestionHistoryService(question_bank, near_duplicates)
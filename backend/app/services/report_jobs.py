@@ -0,0 +1,387 @@
+"""
+Background evaluation and report generation for ended sessions.
+
+Ending a session only records it: the row is marked terminated and a
+ReportJob row is queued holding a snapshot of the session state. The job
+first waits on the event loop, which is only waiting on the judge, until
+every answer is judged, then segments the transcript, fuses the signals and
+renders the report in a worker process, so a burst of sessions ending
+together never holds the loop that relays live audio. The report and the
+user's skills, updated with the session's topic scores, are committed
+together. At most `report_workers` jobs run at once and the rest wait
+their turn.
+
+Several server processes share the table, so a job is claimed with one
+conditional UPDATE that takes it only while it is pending or its previous
+owner's lease has expired. The owner renews the lease while it works and
+writes the result only if it still holds the claim. Jobs whose owner died
+(a restart, a crashed worker) are picked up once their lease runs out, at
+startup or by a periodic sweep, and run again from their stored inputs.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import Optional, Set
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import uuid
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import get_db_context
+from app.models.report_job import ReportJob
+from app.models.session import InterviewSession
+from app.services.evaluation import TopicScore, detected_weak_areas, evaluation_scores, evaluation_service
+from app.services.feedback import feedback_generator
+from app.services.live_evaluation import IncrementalEvaluator, incremental_evaluator
+from app.services.question_bank import question_bank
+from app.services.session_manager import SessionState
+from app.services.session_snapshot import dumps, loads
+from app.services.skill_model import SkillModel, skill_model
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+# Runs of a job before it is marked failed, and the wait before each retry
+MAX_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 5.0
+
+# How long a claim holds without renewal; the owner renews it every third of that
+LEASE_SECONDS = 120.0
+
+# How often each process looks for jobs nobody holds (e.g. their owner died)
+SWEEP_SECONDS = 60.0
+
+
+class LeaseLost(Exception):
+    """Raised when another process has taken over a job this one was running."""
+
+
+def _init_worker():
+    question_bank.load()
+
+
+def build_report(payload: dict) -> dict:
+    """
+    Evaluate an ended session and render its report (runs in a worker process).
+
+    Args:
+        payload: Job inputs: the state snapshot, judged topic scores and the
+            session columns the report needs
+
+    Returns:
+        Session columns to write
+    """
+    state = loads(payload["state"])[0]
+    topic_scores = {
+        domain: [TopicScore(**topic) for topic in topics]
+        for domain, topics in payload["topic_scores"].items()
+    }
+    evaluation = evaluation_service.evaluate_session(**incremental_evaluator.evaluation_inputs(
+        state, topic_scores, payload["declared_weak_areas"], payload["domains"], payload["depth_mode"]
+    ))
+
+    if not any(d.topic_scores for d in evaluation.domain_scores):
+        # Nothing was judged; the candidate gets the transcript and a nudge to finish next time
+        return {
+            "feedback_report": feedback_generator.generate_terminated_report(
+                payload["persona"],
+                payload["depth_mode"],
+                payload["domains"],
+                payload["declared_weak_areas"],
+                payload["transcript_summary"],
+                payload["started_at"],
+                payload["ended_at"]
+            )
+        }
+    return {
+        "feedback_report": feedback_generator.generate_report(
+            evaluation,
+            payload["persona"],
+            payload["depth_mode"],
+            payload["declared_weak_areas"],
+            payload["transcript_summary"],
+            payload["resume_provided"]
+        ),
+        "scores": evaluation_scores(evaluation),
+        "detected_weak_areas": detected_weak_areas(evaluation)
+    }
+
+
+class ReportJobQueue:
+    """Runs report jobs with bounded concurrency, their CPU-bound part on a process pool."""
+
+    def __init__(
+        self,
+        workers: int = settings.report_workers,
+        evaluator: IncrementalEvaluator = incremental_evaluator,
+        skills: SkillModel = skill_model
+    ):
+        self.workers = max(1, workers)
+        self.evaluator = evaluator
+        self.skills = skills
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._scheduled: Set[int] = set()  # job ids with a local task or retry pending
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned, not forked: the server process runs threads, and a fork
+            # could copy a lock one of them holds
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        return self._pool
+
+    def start(self):
+        """Start the workers and pick up jobs nobody holds; call on startup."""
+        self._executor()
+        resumed = self.sweep()
+        if resumed:
+            logger.info(f"Resuming {resumed} unfinished report job(s)")
+        self._sweeper = asyncio.get_running_loop().create_task(self._sweep_loop())
+
+    def sweep(self) -> int:
+        """
+        Schedule pending jobs and running jobs whose lease expired.
+
+        Returns:
+            Number of jobs scheduled
+        """
+        with get_db_context() as db:
+            job_ids = db.execute(
+                select(ReportJob.id).where(self._claimable(datetime.utcnow())).order_by(ReportJob.id)
+            ).scalars().all()
+        job_ids = [job_id for job_id in job_ids if job_id not in self._scheduled]
+        for job_id in job_ids:
+            self.submit(job_id)
+        return len(job_ids)
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(SWEEP_SECONDS)
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("Report job sweep failed")
+
+    async def stop(self):
+        """Stop running jobs and hand them back; any process picks them up again."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def enqueue(self, db: Session, session: InterviewSession, state: SessionState) -> ReportJob:
+        """Add a job for an ended session; it runs once the caller commits and submits it."""
+        job = ReportJob(session_id=session.id, user_id=session.user_id, state=dumps([state]))
+        db.add(job)
+        return job
+
+    def submit(self, job_id: int):
+        """Schedule a committed job on the running event loop."""
+        self._scheduled.add(job_id)
+        task = asyncio.get_running_loop().create_task(self._run(job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def _claimable(now: datetime):
+        return or_(
+            ReportJob.status == PENDING,
+            (ReportJob.status == RUNNING) & (or_(ReportJob.lease_until.is_(None), ReportJob.lease_until < now))
+        )
+
+    def _claim(self, db: Session, job_id: int) -> bool:
+        """Take a job atomically; False if it is finished or another process holds it."""
+        now = datetime.utcnow()
+        claimed = db.execute(
+            update(ReportJob)
+            .where(ReportJob.id == job_id, self._claimable(now))
+            .values(
+                status=RUNNING,
+                owner=self.owner,
+                lease_until=now + timedelta(seconds=LEASE_SECONDS),
+                started_at=now,
+                attempts=ReportJob.attempts + 1
+            )
+        ).rowcount
+        db.commit()
+        return claimed == 1
+
+    def _held(self):
+        """Rows this process still holds the claim on."""
+        return (ReportJob.owner == self.owner) & (ReportJob.status == RUNNING)
+
+    def _renew(self, job_id: int) -> bool:
+        with get_db_context() as db:
+            renewed = db.execute(
+                update(ReportJob)
+                .where(ReportJob.id == job_id, self._held())
+                .values(lease_until=datetime.utcnow() + timedelta(seconds=LEASE_SECONDS))
+            ).rowcount
+            db.commit()
+        return renewed == 1
+
+    def _release(self, job_id: int):
+        """Hand back a job interrupted by shutdown so a restart resumes it at once."""
+        with get_db_context() as db:
+            db.execute(
+                update(ReportJob).where(ReportJob.id == job_id, self._held()).values(
+                    status=PENDING, owner=None, lease_until=None, attempts=ReportJob.attempts - 1
+                )
+            )
+            db.commit()
+
+    async def _keep_lease(self, job_id: int, work: asyncio.Task):
+        """Renew the claim while `work` runs; cancel it if the claim was lost."""
+        while True:
+            await asyncio.sleep(LEASE_SECONDS / 3)
+            if not self._renew(job_id):
+                logger.warning(f"Report job {job_id} was taken over by another process")
+                work.cancel()
+                return
+
+    async def _run(self, job_id: int):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        retrying = False
+        try:
+            async with self._slots:
+                work = asyncio.current_task()
+                lease = None
+                try:
+                    with get_db_context() as db:
+                        if not self._claim(db, job_id):
+                            return
+                    lease = asyncio.get_running_loop().create_task(self._keep_lease(job_id, work))
+                    await self._process(job_id)
+                except asyncio.CancelledError:
+                    if lease is not None and lease.done():
+                        return  # the lease was lost; the new owner finishes the job
+                    if lease is not None:
+                        self._release(job_id)
+                    raise
+                except LeaseLost:
+                    logger.warning(f"Report job {job_id} was taken over by another process")
+                except Exception as e:
+                    logger.exception(f"Report job {job_id} failed")
+                    if isinstance(e, BrokenProcessPool):
+                        self._pool = None
+                    retrying = self._record_failure(job_id, e)
+                finally:
+                    if lease is not None:
+                        lease.cancel()
+        finally:
+            if not retrying:
+                self._scheduled.discard(job_id)
+
+    async def _process(self, job_id: int):
+        with get_db_context() as db:
+            job = db.get(ReportJob, job_id)
+            session = db.get(InterviewSession, job.session_id)
+            session_id = session.id
+            attempts = job.attempts
+            topic_scores = job.topic_scores
+            payload = {
+                "state": job.state,
+                "persona": session.persona,
+                "depth_mode": session.depth_mode,
+                "domains": session.domains,
+                "declared_weak_areas": session.declared_weak_areas or [],
+                "transcript_summary": session.transcript_summary or "",
+                "resume_provided": bool(session.resume_text),
+                "started_at": session.started_at,
+                "ended_at": session.ended_at
+            }
+
+        if topic_scores is None:
+            # Every answer still with the judge is awaited here, off the worker pool; a
+            # job resumed after a restart re-judges the whole transcript. Answers the
+            # judge never returned fail the attempt, so it is retried while retries last
+            try:
+                settled = await self.evaluator.settle(
+                    loads(payload["state"])[0], require_all=attempts < MAX_ATTEMPTS
+                )
+            finally:
+                self.evaluator.discard(session_id)
+            topic_scores = {domain: [asdict(t) for t in topics] for domain, topics in settled.items()}
+            with get_db_context() as db:
+                saved = db.execute(
+                    update(ReportJob).where(ReportJob.id == job_id, self._held()).values(topic_scores=topic_scores)
+                ).rowcount
+                db.commit()
+            if not saved:
+                raise LeaseLost(job_id)
+
+        payload["topic_scores"] = topic_scores
+        result = await asyncio.get_running_loop().run_in_executor(self._executor(), build_report, payload)
+
+        with get_db_context() as db:
+            # Closing the job first locks its row, so only the holder of the claim
+            # writes the report, and does so once
+            finished = db.execute(
+                update(ReportJob).where(ReportJob.id == job_id, self._held()).values(
+                    status=DONE,
+                    error=None,
+                    finished_at=datetime.utcnow(),
+                    owner=None,
+                    lease_until=None,
+                    state=None,
+                    topic_scores=None
+                )
+            ).rowcount
+            if not finished:
+                db.rollback()
+                raise LeaseLost(job_id)
+            session = db.get(InterviewSession, session_id)
+            for column, value in result.items():
+                setattr(session, column, value)
+            # The report and the skills it moved are committed together
+            self.skills.merge_session(db, session.user_id, session_id, result.get("scores"))
+            db.commit()
+
+    def _record_failure(self, job_id: int, error: Exception) -> bool:
+        """Release a failed job; True if a retry was scheduled."""
+        with get_db_context() as db:
+            job = db.get(ReportJob, job_id)
+            if job is None or job.owner != self.owner or job.status != RUNNING:
+                return False
+            retry = (job.attempts or 0) < MAX_ATTEMPTS
+            released = db.execute(
+                update(ReportJob).where(ReportJob.id == job_id, self._held()).values(
+                    error=f"{type(error).__name__}: {error}",
+                    status=PENDING if retry else FAILED,
+                    finished_at=None if retry else datetime.utcnow(),
+                    owner=None,
+                    lease_until=None
+                )
+            ).rowcount
+            db.commit()
+        if not (released and retry):
+            return False
+        asyncio.get_running_loop().call_later(RETRY_DELAY_SECONDS, self.submit, job_id)
+        return True
+
+
+# Global report job queue
+report_jobs = ReportJobQueue()
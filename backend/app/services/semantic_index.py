@@ -0,0 +1,274 @@
+"""
+Offline semantic matching of free text against questions and skill-tree nodes.
+
+Texts are embedded as TF-IDF weighted, signed feature-hashed vectors over
+words and character n-grams, so "graph stuff" lands near "Graph Search" and
+"DP on trees" near "Dynamic Programming" without any model download or
+network access. The matrix is cached next to the question bank and rebuilt
+only when the bank or skill trees change.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import zipfile
+import zlib
+
+import numpy as np
+
+from app.services.question_bank import QUESTIONS_DIR, QuestionBank, QuestionBankSnapshot, question_bank
+from app.services.text_index import tokenize, tokenize_query
+from app.skill_trees import SKILL_INDEX, SKILL_TREES
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "semantic_index.npz"
+FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class SemanticItem:
+    """A question or skill-tree node in the semantic index."""
+    kind: str  # "question" or "skill"
+    domain: str
+    topic: Optional[str]
+    subtopic: Optional[str]
+    key: str  # question ID, or the node path "domain/topic/subtopic/skill"
+    label: str
+
+
+class HashedVectorizer:
+    """Signed feature hashing of words and character n-grams into a fixed width."""
+
+    def __init__(self, dim: int = 512, ngram_range: Tuple[int, int] = (3, 4)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def features(self, tokens: Iterable[str]) -> dict:
+        """Hashed feature counts: bucket -> signed count."""
+        counts: dict = {}
+        low, high = self.ngram_range
+        for token in tokens:
+            grams = [f"w:{token}"]
+            padded = f"<{token}>"
+            for n in range(low, high + 1):
+                grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+            for gram in grams:
+                h = zlib.crc32(gram.encode("utf-8"))
+                bucket = h % self.dim
+                counts[bucket] = counts.get(bucket, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+        return counts
+
+    def transform(self, token_lists: Sequence[Sequence[str]]) -> np.ndarray:
+        """Raw (un-weighted) hashed count matrix, one row per token list."""
+        matrix = np.zeros((len(token_lists), self.dim), dtype=np.float32)
+        for row, tokens in enumerate(token_lists):
+            for bucket, count in self.features(tokens).items():
+                matrix[row, bucket] = count
+        return matrix
+
+
+def _skill_items() -> List[SemanticItem]:
+    """Every topic, subtopic and skill in SKILL_TREES, labelled with its ancestors."""
+    items = []
+    for node in SKILL_INDEX.nodes:
+        if node.kind == "domain":
+            continue
+        names = [a.name for a in reversed(SKILL_INDEX.ancestors(node.id)) if a.kind != "domain"]
+        items.append(SemanticItem(
+            "skill", node.domain, node.topic, node.subtopic, node.path, " ".join(names + [node.name])
+        ))
+    return items
+
+
+def _question_items(snapshot: QuestionBankSnapshot) -> List[SemanticItem]:
+    items = []
+    for domain in snapshot.domains:
+        for q in snapshot.find(domain):
+            label = f"{q.get('topic', '')} {q.get('subtopic', '')} {q['question']}"
+            items.append(SemanticItem("question", domain, q.get("topic"), q.get("subtopic"), q["id"], label))
+    return items
+
+
+def _skill_trees_digest() -> str:
+    return hashlib.sha256(json.dumps(SKILL_TREES, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+class SemanticIndex:
+    """
+    Dense matrix of L2-normalized TF-IDF hashed vectors with batched cosine top-k.
+
+    Rows cover every question in one question bank version plus every
+    skill-tree node.
+    """
+
+    def __init__(
+        self,
+        items: List[SemanticItem],
+        matrix: np.ndarray,
+        idf: np.ndarray,
+        vectorizer: HashedVectorizer,
+        fingerprint: str
+    ):
+        self.items = items
+        self.matrix = matrix
+        self.idf = idf
+        self.vectorizer = vectorizer
+        self.fingerprint = fingerprint
+        self._kinds = np.array([item.kind for item in items])
+        self._domains = np.array([item.domain for item in items])
+
+    @classmethod
+    def build(cls, snapshot: QuestionBankSnapshot, dim: int = 512) -> "SemanticIndex":
+        """Embed every question and skill node."""
+        vectorizer = HashedVectorizer(dim)
+        items = _question_items(snapshot) + _skill_items()
+        counts = vectorizer.transform([tokenize(item.label) for item in items])
+
+        doc_freq = np.count_nonzero(counts, axis=0)
+        idf = (np.log((1 + len(items)) / (1 + doc_freq)) + 1).astype(np.float32)
+        matrix = cls._weight(counts, idf)
+        return cls(items, matrix, idf, vectorizer, cls.fingerprint_for(snapshot, dim))
+
+    @staticmethod
+    def fingerprint_for(snapshot: QuestionBankSnapshot, dim: int = 512) -> str:
+        """Identifies the inputs an index was built from."""
+        return f"{FORMAT_VERSION}:{dim}:{snapshot.version}:{_skill_trees_digest()}"
+
+    @staticmethod
+    def _weight(counts: np.ndarray, idf: np.ndarray) -> np.ndarray:
+        """Sublinear TF, IDF weighting and L2 normalization."""
+        weighted = np.sign(counts) * np.log1p(np.abs(counts)) * idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (weighted / norms).astype(np.float32)
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Vectors for free-text queries."""
+        counts = self.vectorizer.transform([tokenize_query(text) for text in texts])
+        return self._weight(counts, self.idf)
+
+    def query(
+        self,
+        texts: Sequence[str],
+        k: int = 5,
+        kind: Optional[str] = None,
+        domains: Optional[Iterable[str]] = None
+    ) -> List[List[Tuple[SemanticItem, float]]]:
+        """
+        Batched cosine top-k.
+
+        Args:
+            texts: Query texts, scored in one matrix product
+            k: Matches per query
+            kind: Restrict to "question" or "skill" rows
+            domains: Restrict to these domains
+
+        Returns:
+            For each text, (item, similarity) pairs, best first
+        """
+        if not texts or not self.items:
+            return [[] for _ in texts]
+
+        mask = np.ones(len(self.items), dtype=bool)
+        if kind:
+            mask &= self._kinds == kind
+        if domains is not None:
+            mask &= np.isin(self._domains, list(domains))
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return [[] for _ in texts]
+
+        scores = self.embed(texts) @ self.matrix[rows].T
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+        results = []
+        for i, candidates in enumerate(top):
+            ordered = candidates[np.argsort(-scores[i, candidates], kind="stable")]
+            results.append([
+                (self.items[rows[j]], float(scores[i, j]))
+                for j in ordered if scores[i, j] > 0
+            ])
+        return results
+
+    def save(self, path: Path):
+        """Persist the index next to the question bank."""
+        path = Path(path)
+        # A unique temp file per writer: report workers may build the index at once
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    matrix=self.matrix,
+                    idf=self.idf,
+                    items=np.array(json.dumps([item.__dict__ for item in self.items])),
+                    fingerprint=np.array(self.fingerprint)
+                )
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path: Path, expected_fingerprint: str) -> Optional["SemanticIndex"]:
+        """Load a persisted index, or None if missing or built from other inputs."""
+        try:
+            with np.load(path) as data:
+                if str(data["fingerprint"]) != expected_fingerprint:
+                    return None
+                items = [SemanticItem(**item) for item in json.loads(str(data["items"]))]
+                matrix, idf = data["matrix"], data["idf"]
+        except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+        return cls(items, matrix, idf, HashedVectorizer(matrix.shape[1]), expected_fingerprint)
+
+
+class SemanticIndexCache:
+    """Keeps one SemanticIndex in step with a hot-reloadable question bank."""
+
+    def __init__(self, bank: QuestionBank, index_path: Path = QUESTIONS_DIR / INDEX_FILE):
+        self.bank = bank
+        self.index_path = Path(index_path)
+        self._index: Optional[SemanticIndex] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> SemanticIndex:
+        """The index for the bank's current snapshot, loading or building it if stale."""
+        snapshot = self.bank.snapshot
+        fingerprint = SemanticIndex.fingerprint_for(snapshot)
+        index = self._index
+        if index is not None and index.fingerprint == fingerprint:
+            return index
+
+        with self._lock:
+            if self._index is None or self._index.fingerprint != fingerprint:
+                index = SemanticIndex.load(self.index_path, fingerprint)
+                if index is None:
+                    index = SemanticIndex.build(snapshot)
+                    try:
+                        index.save(self.index_path)
+                    except OSError as e:
+                        logger.warning(f"Could not persist semantic index: {e}")
+                self._index = index
+            return self._index
+
+
+# Global semantic index over the global question bank
+semantic_index = SemanticIndexCache(question_bank)
+
+
+def match_skills(
+    texts: Sequence[str],
+    domains: Optional[Iterable[str]] = None,
+    k: int = 3
+) -> List[List[Tuple[SemanticItem, float]]]:
+    """Closest skill-tree nodes for each text."""
+    return semantic_index.get().query(texts, k, kind="skill", domains=domains)
+
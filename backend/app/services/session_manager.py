@@ -1,7 +1,9 @@
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
-import asyncio
+import threading
+
+from app.skill_trees import get_skill_id
 
 
 @dataclass
@@ -12,6 +14,80 @@ class TranscriptEntry:
     audio_duration_ms: Optional[int] = None
 
 
+@dataclass(frozen=True)
+class PlannedQuestion:
+    question_id: str
+    domain: str
+    topic: Optional[str]
+    subtopic: Optional[str]
+    difficulty: Optional[str]
+    question: str
+    follow_ups: Tuple[str, ...] = ()
+    weak_area: Optional[str] = None  # declared weak area this question probes
+
+
+@dataclass
+class SessionPlan:
+    """Ordered questions chosen for a session up front; `cursor` is the next one to ask."""
+    items: List[PlannedQuestion]
+    bank_version: Optional[str] = None
+    cursor: int = 0
+
+    def peek(self, offset: int = 0) -> Optional[PlannedQuestion]:
+        index = self.cursor + offset
+        return self.items[index] if index < len(self.items) else None
+
+    def asked_ids(self) -> List[str]:
+        return [item.question_id for item in self.items[:self.cursor]]
+
+
+@dataclass
+class CueCounts:
+    """Verbal cue counts over a stretch of candidate speech."""
+    words: int = 0
+    filler: int = 0
+    hedge: int = 0
+    confidence: int = 0
+
+    def add(self, other: "CueCounts"):
+        self.words += other.words
+        self.filler += other.filler
+        self.hedge += other.hedge
+        self.confidence += other.confidence
+
+
+@dataclass
+class TurnCues:
+    """Verbal cues in one candidate turn (consecutive user transcript entries)."""
+    first_entry: int  # transcript index the turn starts at
+    topic: Optional[str] = None
+    counts: CueCounts = field(default_factory=CueCounts)
+
+
+@dataclass
+class TurnTiming:
+    """Pacing of one candidate utterance (one server VAD speech segment); times in ms."""
+    topic: Optional[str] = None
+    latency_ms: int = -1  # interviewer audio finished -> speech detected; -1 when no reply preceded it
+    first_word_ms: int = -1  # interviewer audio finished -> first voiced audio frame
+    speech_ms: int = 0  # speech start to end as the server VAD saw it
+    voiced_ms: int = 0  # audio frames above the utterance's noise floor
+    pauses: int = 0  # silent gaps inside the utterance long enough to count as pauses
+    pause_ms: int = 0
+    longest_pause_ms: int = 0
+    words: int = 0  # from the utterance's transcription
+    reply_ms: int = 0  # interviewer audio played since the previous utterance
+
+    @property
+    def words_per_minute(self) -> Optional[float]:
+        return self.words * 60000 / self.speech_ms if self.speech_ms and self.words else None
+
+    @property
+    def talk_ratio(self) -> Optional[float]:
+        total = self.speech_ms + self.reply_ms
+        return self.speech_ms / total if total else None
+
+
 @dataclass
 class SessionState:
     session_id: int
@@ -21,6 +97,7 @@ class SessionState:
     # Real-time state
     is_connected: bool = False
     is_speaking: bool = False
+    turn_in_progress: bool = False  # candidate spoke, interviewer reply pending
     current_topic: Optional[str] = None
     current_domain: Optional[str] = None
 
@@ -32,27 +109,67 @@ class SessionState:
     total_follow_ups: int = 0
     response_latencies: List[int] = field(default_factory=list)  # in ms
     filler_word_count: int = 0
+    cue_turns: List[TurnCues] = field(default_factory=list)
+    topic_cues: Dict[str, CueCounts] = field(default_factory=dict)  # topic -> cue counts
+    turn_timings: List[TurnTiming] = field(default_factory=list)
 
     # Topic tracking
-    topics_covered: List[str] = field(default_factory=list)
+    topics_covered: Set[str] = field(default_factory=set)
+    covered_skill_ids: Set[int] = field(default_factory=set)  # skill-tree node ids
     weak_signals: Dict[str, float] = field(default_factory=dict)  # topic -> weakness score
 
+    # Question plan built when the session starts
+    plan: Optional[SessionPlan] = None
+
+    # Guards every mutation of this session's fields
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
 
 class SessionManager:
-    """In-memory session state manager."""
+    """
+    In-memory session state manager.
+
+    Concurrency model:
+    - The session registry is only mutated under a short registry lock;
+      lookups are plain dict reads and never take a lock.
+    - Each SessionState owns a lock that guards its own fields. Critical
+      sections never await, so the same lock is safe to take from the event
+      loop and from background evaluation threads.
+    - Readers that need a consistent view (e.g. the transcript summary) copy
+      the fields they need under the session lock and work on the copy.
+    - Transcript listeners are called after the entry is recorded, outside
+      the session lock, on the caller's thread.
+    """
 
     def __init__(self):
         self._sessions: Dict[int, SessionState] = {}
         self._user_sessions: Dict[int, int] = {}  # user_id -> session_id
-        self._lock = asyncio.Lock()
+        self._registry_lock = threading.Lock()
+        self._transcript_listeners: List[Callable[[SessionState, TranscriptEntry], None]] = []
+
+    def add_transcript_listener(self, listener: Callable[[SessionState, TranscriptEntry], None]):
+        """Call `listener(state, entry)` for every transcript entry recorded from now on."""
+        self._transcript_listeners.append(listener)
 
-    def create_session(self, session_id: int, user_id: int) -> SessionState:
+    def create_session(self, session_id: int, user_id: int, plan: Optional[SessionPlan] = None) -> SessionState:
         """Create a new session state."""
-        state = SessionState(session_id=session_id, user_id=user_id)
-        self._sessions[session_id] = state
-        self._user_sessions[user_id] = session_id
+        state = SessionState(session_id=session_id, user_id=user_id, plan=plan)
+        with self._registry_lock:
+            self._sessions[session_id] = state
+            self._user_sessions[user_id] = session_id
         return state
 
+    def restore_session(self, state: SessionState) -> SessionState:
+        """Register a previously exported session state."""
+        with self._registry_lock:
+            self._sessions[state.session_id] = state
+            self._user_sessions[state.user_id] = state.session_id
+        return state
+
+    def all_sessions(self) -> List[SessionState]:
+        """Get all live session states."""
+        return list(self._sessions.values())
+
     def get_session(self, session_id: int) -> Optional[SessionState]:
         """Get session state by ID."""
         return self._sessions.get(session_id)
@@ -66,9 +183,10 @@ class SessionManager:
 
     def end_session(self, session_id: int) -> Optional[SessionState]:
         """End and remove a session."""
-        state = self._sessions.pop(session_id, None)
-        if state:
-            self._user_sessions.pop(state.user_id, None)
+        with self._registry_lock:
+            state = self._sessions.pop(session_id, None)
+            if state and self._user_sessions.get(state.user_id) == session_id:
+                del self._user_sessions[state.user_id]
         return state
 
     def add_transcript_entry(
@@ -87,47 +205,86 @@ class SessionManager:
                 timestamp=datetime.utcnow(),
                 audio_duration_ms=audio_duration_ms
             )
-            state.transcript.append(entry)
+            with state.lock:
+                state.transcript.append(entry)
+            for listener in self._transcript_listeners:
+                listener(state, entry)
 
     def update_speaking_state(self, session_id: int, is_speaking: bool):
         """Update whether the user is currently speaking."""
         state = self._sessions.get(session_id)
         if state:
-            state.is_speaking = is_speaking
+            with state.lock:
+                state.is_speaking = is_speaking
+
+    def set_turn_state(self, session_id: int, in_progress: bool):
+        """Update whether a conversational turn is awaiting the interviewer."""
+        state = self._sessions.get(session_id)
+        if state:
+            with state.lock:
+                state.turn_in_progress = in_progress
 
     def set_connection_state(self, session_id: int, is_connected: bool):
         """Update connection state."""
         state = self._sessions.get(session_id)
         if state:
-            state.is_connected = is_connected
+            with state.lock:
+                state.is_connected = is_connected
 
     def record_follow_up_result(self, session_id: int, success: bool):
         """Record whether a follow-up question was answered successfully."""
         state = self._sessions.get(session_id)
         if state:
-            state.total_follow_ups += 1
-            if not success:
-                state.follow_up_failures += 1
+            with state.lock:
+                state.total_follow_ups += 1
+                if not success:
+                    state.follow_up_failures += 1
 
     def record_response_latency(self, session_id: int, latency_ms: int):
         """Record response latency."""
         state = self._sessions.get(session_id)
         if state:
-            state.response_latencies.append(latency_ms)
+            with state.lock:
+                state.response_latencies.append(latency_ms)
 
     def update_weak_signal(self, session_id: int, topic: str, score: float):
         """Update weakness signal for a topic."""
         state = self._sessions.get(session_id)
         if state:
-            # Use exponential moving average
-            current = state.weak_signals.get(topic, 0.5)
-            state.weak_signals[topic] = 0.7 * score + 0.3 * current
+            # Use exponential moving average; read-modify-write must be atomic
+            with state.lock:
+                current = state.weak_signals.get(topic, 0.5)
+                state.weak_signals[topic] = 0.7 * score + 0.3 * current
+
+    def next_planned_question(self, session_id: int) -> Optional[PlannedQuestion]:
+        """Advance the session plan by one question and make its topic current."""
+        state = self._sessions.get(session_id)
+        if not state or not state.plan:
+            return None
+        with state.lock:
+            item = state.plan.peek()
+            if item:
+                state.plan.cursor += 1
+                state.current_domain = item.domain
+                state.current_topic = item.topic
+                node_id = get_skill_id(item.domain, item.topic, item.subtopic) or get_skill_id(item.domain, item.topic)
+                if node_id is not None:
+                    state.covered_skill_ids.add(node_id)
+            return item
 
     def mark_topic_covered(self, session_id: int, topic: str):
         """Mark a topic as covered."""
         state = self._sessions.get(session_id)
-        if state and topic not in state.topics_covered:
-            state.topics_covered.append(topic)
+        if state:
+            with state.lock:
+                state.topics_covered.add(topic)
+
+    def mark_skill_covered(self, session_id: int, skill_id: int):
+        """Mark a skill-tree node (by its integer id) as covered."""
+        state = self._sessions.get(session_id)
+        if state:
+            with state.lock:
+                state.covered_skill_ids.add(skill_id)
 
     def get_transcript_summary(self, session_id: int) -> str:
         """Get a summary of the transcript."""
@@ -135,8 +292,11 @@ class SessionManager:
         if not state:
             return ""
 
+        with state.lock:
+            transcript = list(state.transcript)
+
         lines = []
-        for entry in state.transcript:
+        for entry in transcript:
             prefix = "Candidate" if entry.role == "user" else "Interviewer"
             lines.append(f"{prefix}: {entry.content}")
 
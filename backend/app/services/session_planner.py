@@ -0,0 +1,286 @@
+"""
+Up-front question plan for an interview session.
+
+The plan is built once, when the session starts, from the question bank:
+declared weak areas first (looked up in the skill coverage matrix when
+they name a skill-tree node), then the remaining slots spread across the
+session's domains, weakest topics first. When a regular has already been
+asked every question the topics offer, the remaining slots are topped up
+by the question history's fallback policy. It is cached on the SessionState,
+so moving to the next question is a cursor increment, and it is rendered
+compactly into the realtime model's instructions.
+"""
+from typing import Callable, List, Optional, Set
+import math
+
+from app.services.adaptive_selector import AdaptiveSelector, adaptive_selector, rank_difficulties
+from app.services.question_bank import QuestionBank, question_bank
+from app.services.question_history import FALLBACK_POLICIES, QuestionHistoryService, question_history
+from app.services.session_manager import PlannedQuestion, SessionManager, SessionPlan
+from app.services.text_index import tokenize
+from app.skill_trees import get_skill_tree
+
+# Minutes budgeted per main question (including its follow-ups) by depth mode
+MINUTES_PER_QUESTION = {"surface": 4.0, "interview_ready": 5.0, "expert": 7.0}
+
+# Follow-ups planned per main question by depth mode
+FOLLOW_UPS_PER_QUESTION = {"surface": 1, "interview_ready": 2, "expert": 3}
+
+MIN_QUESTIONS = 2
+MAX_QUESTIONS = 12
+
+# Question text longer than this is shortened in the prompt
+_PROMPT_QUESTION_CHARS = 160
+
+# Share of a planned question's terms an interviewer turn must contain to count as asking it
+ASKED_OVERLAP = 0.5
+# Planned questions checked per turn, in case the interviewer skipped one
+_LOOKAHEAD = 2
+
+
+def question_count(duration_minutes: int, depth_mode: str) -> int:
+    """How many main questions fit in the session."""
+    per_question = MINUTES_PER_QUESTION.get(depth_mode, MINUTES_PER_QUESTION["interview_ready"])
+    # Leave a few minutes for the closing and candidate questions
+    usable = max(duration_minutes - 3, per_question)
+    return max(MIN_QUESTIONS, min(MAX_QUESTIONS, int(usable // per_question)))
+
+
+class SessionPlanner:
+    """Builds SessionPlans from the question bank."""
+
+    def __init__(
+        self,
+        bank: QuestionBank = question_bank,
+        history: QuestionHistoryService = question_history,
+        selector: AdaptiveSelector = adaptive_selector,
+        fallback: str = "relax"
+    ):
+        if fallback not in FALLBACK_POLICIES:
+            raise ValueError(f"Unknown fallback policy '{fallback}', expected one of {FALLBACK_POLICIES}")
+        self.bank = bank
+        self.history = history
+        self.selector = selector
+        self.fallback = fallback
+
+    def plan(
+        self,
+        session_id: int,
+        user_id: int,
+        domains: List[str],
+        duration_minutes: int,
+        depth_mode: str,
+        declared_weak_areas: Optional[List[str]] = None
+    ) -> SessionPlan:
+        """
+        Build the ordered question plan for a session.
+
+        Args:
+            session_id: Session being planned (for its ability estimates)
+            user_id: Candidate, so questions from past sessions are skipped
+            domains: Domains to cover
+            duration_minutes: Session length
+            depth_mode: surface, interview_ready or expert
+            declared_weak_areas: Areas the candidate asked to be probed
+
+        Returns:
+            SessionPlan, weak-area questions first
+        """
+        total = question_count(duration_minutes, depth_mode)
+        follow_up_count = FOLLOW_UPS_PER_QUESTION.get(depth_mode, 2)
+        snapshot = self.bank.snapshot
+        planned: Set[str] = set()
+        items: List[PlannedQuestion] = []
+
+        def add(question: dict, domain: str, weak_area: Optional[str] = None):
+            planned.add(question["id"])
+            items.append(planned_question(question, domain, follow_up_count, weak_area))
+
+        # Weak areas get up to half the slots, asked first
+        seen = self.history.seen(user_id)
+        weak_areas = list(declared_weak_areas or [])[:math.ceil(total / 2)]
+        coverage = self.selector.coverage.get()
+        for weak_area in weak_areas:
+            # A weak area naming a skill-tree node is an index lookup; free text falls back to search
+            node = coverage.resolve(weak_area, domains)
+            question = node and self.selector.next_question_for_skill(session_id, user_id, node, planned)
+            if question:
+                add(question, node.domain, weak_area)
+                continue
+            excluded = seen.including(planned)
+            for question, _ in snapshot.search(weak_area, domains, k=10):
+                if question["id"] not in excluded:
+                    add(question, question.get("domain"), weak_area)
+                    break
+
+        def fill(pick: Callable[[str, str], Optional[dict]]):
+            # Round-robin across domains, weakest topics first
+            topic_queues = {domain: self._topics_by_ability(session_id, domain) for domain in domains}
+            while len(items) < total and any(topic_queues.values()):
+                for domain in domains:
+                    if len(items) >= total:
+                        break
+                    queue = topic_queues[domain]
+                    while queue:
+                        question = pick(domain, queue.pop(0))
+                        if question:
+                            add(question, domain)
+                            break
+
+        # Remaining slots get the most informative unseen question per topic
+        fill(lambda domain, topic: self.selector.next_question(
+            session_id, user_id, domain, topic, exclude_ids=planned
+        ))
+        # Every unseen question is planned; the fallback policy decides the rest
+        if len(items) < total and self.fallback != "none":
+            fill(lambda domain, topic: self.history.select_question(
+                user_id, domain, topic, exclude_ids=planned, fallback=self.fallback
+            ))
+
+        return SessionPlan(items=items, bank_version=snapshot.version)
+
+    def rerank(self, manager: SessionManager, session_id: int, domain: str, topic: str) -> int:
+        """
+        Re-pick the difficulty of upcoming questions on a topic after an answer moved its estimate.
+
+        Questions not yet asked on (domain, topic) are swapped for an unseen
+        question from the bucket that is now most informative, when that is a
+        different difficulty. Weak-area questions the candidate asked for stay.
+
+        Returns:
+            Number of planned questions replaced
+        """
+        state = manager.get_session(session_id)
+        if not state or not state.plan:
+            return 0
+        with state.lock:
+            plan = state.plan
+            upcoming = [
+                (index, item) for index, item in enumerate(plan.items[plan.cursor:], plan.cursor)
+                if item.domain == domain and item.topic == topic and not item.weak_area
+            ]
+            planned = {item.question_id for item in plan.items}
+            # The depth mode's follow-up budget, as the plan was built with
+            follow_up_count = max((len(item.follow_ups) for item in plan.items), default=0)
+        if not upcoming:
+            return 0
+
+        best = rank_difficulties(self.selector.estimate(session_id, domain, topic))[0][0]
+        replacements = {}
+        for index, item in upcoming:
+            if item.difficulty == best:
+                continue
+            question = self.selector.next_question(
+                session_id, state.user_id, domain, topic, item.subtopic, exclude_ids=planned
+            )
+            if question and question.get("difficulty") != item.difficulty:
+                planned.add(question["id"])
+                replacements[index] = planned_question(question, domain, follow_up_count)
+
+        replaced = 0
+        with state.lock:
+            for index, item in replacements.items():
+                # Skip any the interviewer reached while replacements were picked
+                if index >= plan.cursor:
+                    plan.items[index] = item
+                    replaced += 1
+        return replaced
+
+    def track_progress(
+        self,
+        manager: SessionManager,
+        session_id: int,
+        interviewer_text: str
+    ) -> Optional[PlannedQuestion]:
+        """
+        Advance the plan when an interviewer turn asks the next planned question.
+
+        The model paraphrases, so a turn counts as asking a question when it
+        contains most of that question's terms.
+
+        Returns:
+            The planned question that was asked, if any
+        """
+        state = manager.get_session(session_id)
+        if not state or not state.plan:
+            return None
+
+        offset = asked_offset(state.plan, interviewer_text)
+        if offset is None:
+            return None
+        for _ in range(offset + 1):
+            asked = manager.next_planned_question(session_id)
+        return asked
+
+    def _topics_by_ability(self, session_id: int, domain: str) -> List[str]:
+        """Skill-tree topics for a domain, lowest estimated ability first."""
+        topics = list(get_skill_tree(domain))
+        return sorted(topics, key=lambda topic: self.selector.estimate(session_id, domain, topic).mean)
+
+
+def planned_question(
+    question: dict,
+    domain: str,
+    follow_up_count: int,
+    weak_area: Optional[str] = None
+) -> PlannedQuestion:
+    """A bank question as a plan item, with its first `follow_up_count` follow-ups."""
+    return PlannedQuestion(
+        question_id=question["id"],
+        domain=question.get("domain", domain),
+        topic=question.get("topic"),
+        subtopic=question.get("subtopic"),
+        difficulty=question.get("difficulty"),
+        question=question["question"],
+        follow_ups=tuple(question.get("follow_ups", [])[:follow_up_count]),
+        weak_area=weak_area
+    )
+
+
+def asked_offset(plan: SessionPlan, interviewer_text: str, cursor: Optional[int] = None) -> Optional[int]:
+    """
+    Which upcoming planned question an interviewer turn asks.
+
+    Args:
+        plan: Session plan
+        interviewer_text: The interviewer's turn
+        cursor: Position to look from (defaults to the plan's cursor)
+
+    Returns:
+        Offset from the cursor of the question asked, or None
+    """
+    start = plan.cursor if cursor is None else cursor
+    terms = set(tokenize(interviewer_text))
+    for offset in range(_LOOKAHEAD):
+        if start + offset >= len(plan.items):
+            break
+        wanted = set(tokenize(plan.items[start + offset].question))
+        if wanted and len(wanted & terms) / len(wanted) >= ASKED_OVERLAP:
+            return offset
+    return None
+
+
+def format_plan(plan: SessionPlan) -> str:
+    """
+    Compact plan for the realtime model's instructions.
+
+    One line per question: number, domain/topic and difficulty, the
+    question, and its planned follow-ups.
+    """
+    lines = []
+    for number, item in enumerate(plan.items, 1):
+        question = item.question
+        if len(question) > _PROMPT_QUESTION_CHARS:
+            question = question[:_PROMPT_QUESTION_CHARS - 3].rstrip() + "..."
+        label = f"{item.domain}/{item.topic or '-'}, {item.difficulty or 'any'}"
+        if item.weak_area:
+            label += f", weak area: {item.weak_area}"
+        line = f"{number}. [{label}] {question}"
+        if item.follow_ups:
+            line += " | Follow-ups: " + " / ".join(item.follow_ups)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+# Global session planner
+session_planner = SessionPlanner()
@@ -0,0 +1,371 @@
+"""
+Compact binary snapshots of in-memory SessionState.
+
+Layout (little-endian):
+
+    header   magic "IASS" | u16 version | u8 flags | u32 session count
+    body     per session: u32 record length | record bytes
+
+The body is zlib-compressed when FLAG_COMPRESSED is set. Strings are
+u32-length-prefixed UTF-8, with NULL_LENGTH marking None.
+
+Version 2 appends the session question plan to each record, version 3
+the covered skill-tree node ids, version 4 the verbal cue counters and
+version 5 the per-utterance speech timings; older records decode without
+them.
+"""
+from typing import List, Optional, Iterable
+from datetime import datetime
+from array import array
+from pathlib import Path
+import os
+import struct
+import zlib
+
+from app.services.session_manager import (
+    CueCounts,
+    PlannedQuestion,
+    SessionManager,
+    SessionPlan,
+    SessionState,
+    TranscriptEntry,
+    TurnCues,
+    TurnTiming,
+)
+
+
+MAGIC = b"IASS"
+SNAPSHOT_VERSION = 5
+FLAG_COMPRESSED = 0x01
+NULL_LENGTH = 0xFFFFFFFF
+
+_HEADER = struct.Struct("<4sHBI")
+_U32 = struct.Struct("<I")
+_STATE = struct.Struct("<qqdBiii")  # ids, created_at, flags, counters
+_ENTRY = struct.Struct("<di")  # timestamp, audio_duration_ms (-1 = None)
+_WEAK_SIGNAL = struct.Struct("<d")
+_CUES = struct.Struct("<iiii")  # words, filler, hedge, confidence
+_TIMING = struct.Struct("<9i")  # TurnTiming counters, in field order
+
+_CONNECTED = 0x01
+_SPEAKING = 0x02
+_TURN_IN_PROGRESS = 0x04
+
+
+class SnapshotError(ValueError):
+    """Raised when snapshot bytes cannot be decoded."""
+
+
+def _pack_str(out: bytearray, value: Optional[str]):
+    if value is None:
+        out += _U32.pack(NULL_LENGTH)
+        return
+    data = value.encode("utf-8")
+    out += _U32.pack(len(data))
+    out += data
+
+
+class _Reader:
+    """Sequential reader over a bytes buffer."""
+
+    def __init__(self, data: bytes):
+        self._view = memoryview(data)
+        self._pos = 0
+
+    def unpack(self, fmt: struct.Struct) -> tuple:
+        values = fmt.unpack_from(self._view, self._pos)
+        self._pos += fmt.size
+        return values
+
+    def u32(self) -> int:
+        return self.unpack(_U32)[0]
+
+    def raw(self, length: int) -> memoryview:
+        if self._pos + length > len(self._view):
+            raise SnapshotError("Snapshot truncated")
+        chunk = self._view[self._pos:self._pos + length]
+        self._pos += length
+        return chunk
+
+    def text(self) -> Optional[str]:
+        length = self.u32()
+        if length == NULL_LENGTH:
+            return None
+        return str(self.raw(length), "utf-8")
+
+
+def encode_state(state: SessionState) -> bytes:
+    """Encode one session state as a snapshot record."""
+    out = bytearray()
+    with state.lock:
+        flags = (
+            (_CONNECTED if state.is_connected else 0)
+            | (_SPEAKING if state.is_speaking else 0)
+            | (_TURN_IN_PROGRESS if state.turn_in_progress else 0)
+        )
+        out += _STATE.pack(
+            state.session_id,
+            state.user_id,
+            state.created_at.timestamp(),
+            flags,
+            state.follow_up_failures,
+            state.total_follow_ups,
+            state.filler_word_count
+        )
+        _pack_str(out, state.current_topic)
+        _pack_str(out, state.current_domain)
+
+        latencies = array("i", state.response_latencies)
+        out += _U32.pack(len(latencies))
+        out += latencies.tobytes()
+
+        out += _U32.pack(len(state.topics_covered))
+        for topic in sorted(state.topics_covered):
+            _pack_str(out, topic)
+
+        out += _U32.pack(len(state.weak_signals))
+        for topic, score in state.weak_signals.items():
+            _pack_str(out, topic)
+            out += _WEAK_SIGNAL.pack(score)
+
+        out += _U32.pack(len(state.transcript))
+        for entry in state.transcript:
+            duration = entry.audio_duration_ms if entry.audio_duration_ms is not None else -1
+            out += _ENTRY.pack(entry.timestamp.timestamp(), duration)
+            _pack_str(out, entry.role)
+            _pack_str(out, entry.content)
+
+        _pack_plan(out, state.plan)
+
+        skill_ids = array("i", sorted(state.covered_skill_ids))
+        out += _U32.pack(len(skill_ids))
+        out += skill_ids.tobytes()
+
+        out += _U32.pack(len(state.cue_turns))
+        for turn in state.cue_turns:
+            out += _U32.pack(turn.first_entry)
+            _pack_str(out, turn.topic)
+            _pack_cues(out, turn.counts)
+        out += _U32.pack(len(state.topic_cues))
+        for topic, counts in state.topic_cues.items():
+            _pack_str(out, topic)
+            _pack_cues(out, counts)
+
+        out += _U32.pack(len(state.turn_timings))
+        for timing in state.turn_timings:
+            _pack_str(out, timing.topic)
+            out += _TIMING.pack(
+                timing.latency_ms, timing.first_word_ms, timing.speech_ms, timing.voiced_ms,
+                timing.pauses, timing.pause_ms, timing.longest_pause_ms, timing.words, timing.reply_ms
+            )
+    return bytes(out)
+
+
+def _pack_cues(out: bytearray, counts: CueCounts):
+    out += _CUES.pack(counts.words, counts.filler, counts.hedge, counts.confidence)
+
+
+def _read_cues(reader: _Reader) -> CueCounts:
+    return CueCounts(*reader.unpack(_CUES))
+
+
+def _pack_plan(out: bytearray, plan: Optional[SessionPlan]):
+    if plan is None:
+        out += _U32.pack(NULL_LENGTH)
+        return
+    out += _U32.pack(len(plan.items))
+    out += _U32.pack(plan.cursor)
+    _pack_str(out, plan.bank_version)
+    for item in plan.items:
+        for value in (item.question_id, item.domain, item.topic, item.subtopic,
+                      item.difficulty, item.question, item.weak_area):
+            _pack_str(out, value)
+        out += _U32.pack(len(item.follow_ups))
+        for follow_up in item.follow_ups:
+            _pack_str(out, follow_up)
+
+
+def _read_plan(reader: _Reader) -> Optional[SessionPlan]:
+    count = reader.u32()
+    if count == NULL_LENGTH:
+        return None
+    cursor = reader.u32()
+    bank_version = reader.text()
+    items = []
+    for _ in range(count):
+        question_id, domain, topic, subtopic, difficulty, question, weak_area = (
+            reader.text() for _ in range(7)
+        )
+        follow_ups = tuple(reader.text() for _ in range(reader.u32()))
+        items.append(PlannedQuestion(
+            question_id=question_id,
+            domain=domain,
+            topic=topic,
+            subtopic=subtopic,
+            difficulty=difficulty,
+            question=question,
+            follow_ups=follow_ups,
+            weak_area=weak_area
+        ))
+    return SessionPlan(items=items, bank_version=bank_version, cursor=cursor)
+
+
+def decode_state(data: bytes, version: int = SNAPSHOT_VERSION) -> SessionState:
+    """Decode a snapshot record produced by encode_state (or an older version of it)."""
+    reader = _Reader(data)
+    try:
+        (session_id, user_id, created_at, flags,
+         follow_up_failures, total_follow_ups, filler_word_count) = reader.unpack(_STATE)
+        current_topic = reader.text()
+        current_domain = reader.text()
+
+        latencies = array("i")
+        latencies.frombytes(reader.raw(reader.u32() * latencies.itemsize))
+
+        topics_covered = {reader.text() for _ in range(reader.u32())}
+
+        weak_signals = {}
+        for _ in range(reader.u32()):
+            topic = reader.text()
+            weak_signals[topic] = reader.unpack(_WEAK_SIGNAL)[0]
+
+        transcript = []
+        for _ in range(reader.u32()):
+            timestamp, duration = reader.unpack(_ENTRY)
+            role = reader.text()
+            content = reader.text()
+            transcript.append(TranscriptEntry(
+                role=role,
+                content=content,
+                timestamp=datetime.fromtimestamp(timestamp),
+                audio_duration_ms=duration if duration >= 0 else None
+            ))
+
+        plan = _read_plan(reader) if version >= 2 else None
+
+        skill_ids = array("i")
+        if version >= 3:
+            skill_ids.frombytes(reader.raw(reader.u32() * skill_ids.itemsize))
+
+        cue_turns = []
+        topic_cues = {}
+        if version >= 4:
+            for _ in range(reader.u32()):
+                first_entry = reader.u32()
+                topic = reader.text()
+                cue_turns.append(TurnCues(first_entry=first_entry, topic=topic, counts=_read_cues(reader)))
+            for _ in range(reader.u32()):
+                topic = reader.text()
+                topic_cues[topic] = _read_cues(reader)
+
+        turn_timings = []
+        if version >= 5:
+            for _ in range(reader.u32()):
+                topic = reader.text()
+                turn_timings.append(TurnTiming(topic, *reader.unpack(_TIMING)))
+    except struct.error as e:
+        raise SnapshotError(f"Snapshot truncated: {e}")
+
+    return SessionState(
+        session_id=session_id,
+        user_id=user_id,
+        created_at=datetime.fromtimestamp(created_at),
+        is_connected=bool(flags & _CONNECTED),
+        is_speaking=bool(flags & _SPEAKING),
+        turn_in_progress=bool(flags & _TURN_IN_PROGRESS),
+        current_topic=current_topic,
+        current_domain=current_domain,
+        transcript=transcript,
+        follow_up_failures=follow_up_failures,
+        total_follow_ups=total_follow_ups,
+        response_latencies=latencies.tolist(),
+        filler_word_count=filler_word_count,
+        cue_turns=cue_turns,
+        topic_cues=topic_cues,
+        turn_timings=turn_timings,
+        topics_covered=topics_covered,
+        covered_skill_ids=set(skill_ids),
+        weak_signals=weak_signals,
+        plan=plan
+    )
+
+
+def dumps(states: Iterable[SessionState], compress: bool = True) -> bytes:
+    """Serialize any number of session states into one snapshot."""
+    body = bytearray()
+    count = 0
+    for state in states:
+        record = encode_state(state)
+        body += _U32.pack(len(record))
+        body += record
+        count += 1
+
+    flags = 0
+    payload = bytes(body)
+    if compress:
+        flags |= FLAG_COMPRESSED
+        payload = zlib.compress(payload, 6)
+
+    return _HEADER.pack(MAGIC, SNAPSHOT_VERSION, flags, count) + payload
+
+
+def loads(data: bytes) -> List[SessionState]:
+    """Deserialize a snapshot produced by dumps."""
+    if len(data) < _HEADER.size:
+        raise SnapshotError("Snapshot too short")
+
+    magic, version, flags, count = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise SnapshotError("Not a session snapshot")
+    if version > SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+
+    payload = data[_HEADER.size:]
+    if flags & FLAG_COMPRESSED:
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error as e:
+            raise SnapshotError(f"Corrupt snapshot body: {e}")
+
+    reader = _Reader(payload)
+    try:
+        return [decode_state(reader.raw(reader.u32()), version) for _ in range(count)]
+    except struct.error as e:
+        raise SnapshotError(f"Snapshot truncated: {e}")
+
+
+def save_snapshot(path: Path, states: Iterable[SessionState]) -> int:
+    """
+    Atomically write a snapshot file.
+
+    Returns:
+        Number of bytes written
+    """
+    path = Path(path)
+    data = dumps(states)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def load_snapshot(path: Path) -> List[SessionState]:
+    """Read session states from a snapshot file."""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def restore_snapshot(path: Path, manager: SessionManager) -> int:
+    """
+    Register every session from a snapshot file with a session manager.
+
+    Returns:
+        Number of sessions restored
+    """
+    states = load_snapshot(path)
+    for state in states:
+        manager.restore_session(state)
+    return len(states)
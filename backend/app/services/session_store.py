@@ -0,0 +1,136 @@
+from typing import List, Optional
+from dataclasses import asdict
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app.models.checkpoint import SessionCheckpoint
+from app.models.session import InterviewSession
+from app.services.session_manager import SessionManager, SessionState
+from app.services.session_snapshot import dumps, loads
+
+_SUMMARY_ROLES = (("Candidate: ", "user"), ("Interviewer: ", "assistant"))
+
+
+def export_state(state: SessionState) -> dict:
+    """Convert a session state into a JSON-serializable dict for inspection."""
+    with state.lock:
+        return {
+            "session_id": state.session_id,
+            "user_id": state.user_id,
+            "created_at": state.created_at.isoformat(),
+            "current_topic": state.current_topic,
+            "current_domain": state.current_domain,
+            "transcript": [
+                {
+                    "role": entry.role,
+                    "content": entry.content,
+                    "timestamp": entry.timestamp.isoformat(),
+                    "audio_duration_ms": entry.audio_duration_ms
+                }
+                for entry in state.transcript
+            ],
+            "follow_up_failures": state.follow_up_failures,
+            "total_follow_ups": state.total_follow_ups,
+            "response_latencies": list(state.response_latencies),
+            "filler_word_count": state.filler_word_count,
+            "cue_turns": [
+                {"first_entry": turn.first_entry, "topic": turn.topic, **asdict(turn.counts)}
+                for turn in state.cue_turns
+            ],
+            "topic_cues": {topic: asdict(counts) for topic, counts in state.topic_cues.items()},
+            "turn_timings": [asdict(timing) for timing in state.turn_timings],
+            "topics_covered": sorted(state.topics_covered),
+            "covered_skill_ids": sorted(state.covered_skill_ids),
+            "weak_signals": dict(state.weak_signals),
+            "plan": {
+                "bank_version": state.plan.bank_version,
+                "cursor": state.plan.cursor,
+                "items": [
+                    {
+                        "question_id": item.question_id,
+                        "domain": item.domain,
+                        "topic": item.topic,
+                        "subtopic": item.subtopic,
+                        "difficulty": item.difficulty,
+                        "question": item.question,
+                        "follow_ups": list(item.follow_ups),
+                        "weak_area": item.weak_area
+                    }
+                    for item in state.plan.items
+                ]
+            } if state.plan else None
+        }
+
+
+def parse_transcript_summary(summary: str) -> List[dict]:
+    """
+    Transcript entries back from a stored transcript summary.
+
+    Inverse of SessionManager.get_transcript_summary: paragraphs start with
+    "Candidate: " or "Interviewer: "; a paragraph without either prefix is a
+    line break inside the previous entry.
+
+    Returns:
+        {"role", "content"} dicts in order
+    """
+    entries: List[dict] = []
+    for paragraph in summary.split("\n\n"):
+        for prefix, role in _SUMMARY_ROLES:
+            if paragraph.startswith(prefix):
+                entries.append({"role": role, "content": paragraph[len(prefix):]})
+                break
+        else:
+            if entries:
+                entries[-1]["content"] += "\n\n" + paragraph
+    return entries
+
+
+def flush_sessions(db: Session, manager: SessionManager, states: List[SessionState]) -> int:
+    """
+    Persist live session states in a single transaction.
+
+    Each active session gets its transcript summary written and a checkpoint
+    row holding the full state, so another worker can pick the interview up
+    where it stopped. Rows stay 'active' so the candidate can reconnect.
+
+    Returns:
+        Number of sessions flushed
+    """
+    if not states:
+        return 0
+
+    by_id = {state.session_id: state for state in states}
+    sessions = db.query(InterviewSession).filter(
+        InterviewSession.id.in_(list(by_id)),
+        InterviewSession.status == "active"
+    ).all()
+
+    for session in sessions:
+        state = by_id[session.id]
+        summary = manager.get_transcript_summary(session.id)
+        if summary:
+            session.transcript_summary = summary
+        db.merge(SessionCheckpoint(
+            session_id=session.id,
+            user_id=state.user_id,
+            payload=dumps([state]),
+            created_at=datetime.utcnow()
+        ))
+
+    db.commit()
+    return len(sessions)
+
+
+def restore_session(db: Session, manager: SessionManager, session_id: int) -> Optional[SessionState]:
+    """Restore a checkpointed session into the manager, consuming the checkpoint."""
+    checkpoint = db.query(SessionCheckpoint).filter(
+        SessionCheckpoint.session_id == session_id
+    ).first()
+    if not checkpoint:
+        return None
+
+    state = loads(checkpoint.payload)[0]
+    db.delete(checkpoint)
+    db.commit()
+    return manager.restore_session(state)
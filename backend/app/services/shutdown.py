@@ -0,0 +1,139 @@
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+import signal
+
+from fastapi import WebSocket
+
+from app.config import get_settings
+from app.database import get_db_context
+from app.services.azure_realtime import AzureRealtimeClient
+from app.services.session_manager import session_manager
+from app.services.session_store import flush_sessions
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# WebSocket close code for "service restart" (RFC 6455)
+SERVICE_RESTART = 1012
+
+
+class ShutdownCoordinator:
+    """
+    Drains live interview sessions when the server shuts down.
+
+    Drain sequence:
+    1. Stop accepting new WebSocket sessions
+    2. Notify connected clients that the server is restarting
+    3. Give in-flight turns up to the grace period to finish
+    4. Flush every SessionState to the database in one batch
+    5. Close client sockets and upstream Azure connections concurrently
+    """
+
+    def __init__(self):
+        self._connections: Dict[int, Tuple[WebSocket, AzureRealtimeClient]] = {}
+        self._draining = False
+        self._drain_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_draining(self) -> bool:
+        """Whether new sessions should be refused."""
+        return self._draining
+
+    def register(self, session_id: int, websocket: WebSocket, azure_client: AzureRealtimeClient):
+        """Track a live WebSocket session."""
+        self._connections[session_id] = (websocket, azure_client)
+
+    def unregister(self, session_id: int):
+        """Stop tracking a WebSocket session."""
+        self._connections.pop(session_id, None)
+
+    async def drain(self, grace_seconds: Optional[float] = None):
+        """Run the drain sequence once; later callers wait for the same run."""
+        if self._drain_task is None:
+            self._draining = True
+            if grace_seconds is None:
+                grace_seconds = settings.shutdown_grace_seconds
+            self._drain_task = asyncio.create_task(self._drain(grace_seconds))
+        await asyncio.shield(self._drain_task)
+
+    async def _drain(self, grace_seconds: float):
+        connections = list(self._connections.items())
+        logger.info(f"Draining {len(connections)} live session(s), grace {grace_seconds}s")
+
+        await asyncio.gather(
+            *(
+                websocket.send_json({
+                    "type": "status",
+                    "status": "draining",
+                    "grace_seconds": grace_seconds
+                })
+                for _, (websocket, _) in connections
+            ),
+            return_exceptions=True
+        )
+
+        await self._wait_for_turns(grace_seconds)
+
+        states = session_manager.all_sessions()
+        try:
+            with get_db_context() as db:
+                flushed = flush_sessions(db, session_manager, states)
+            logger.info(f"Flushed {flushed} session(s) to the database")
+        except Exception as e:
+            logger.error(f"Failed to flush sessions on shutdown: {e}")
+
+        connections = list(self._connections.items())
+        await asyncio.gather(
+            *(
+                websocket.close(code=SERVICE_RESTART, reason="Server restarting")
+                for _, (websocket, _) in connections
+            ),
+            *(azure_client.disconnect() for _, (_, azure_client) in connections),
+            return_exceptions=True
+        )
+
+    async def _wait_for_turns(self, grace_seconds: float):
+        """Wait until no connected session has a turn awaiting a reply."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + grace_seconds
+        while loop.time() < deadline:
+            pending = [
+                session_id for session_id in self._connections
+                if (state := session_manager.get_session(session_id)) and state.turn_in_progress
+            ]
+            if not pending:
+                return
+            await asyncio.sleep(0.1)
+        logger.warning("Shutdown grace period expired with turns still in flight")
+
+    def install_signal_handler(self):
+        """
+        Drain before the server's own SIGTERM handling runs.
+
+        Uvicorn closes every WebSocket as soon as it sees SIGTERM, before the
+        application shutdown hook. Chaining the handler lets the drain finish
+        first and then hands the signal back to the server.
+        """
+        loop = asyncio.get_running_loop()
+        previous = signal.getsignal(signal.SIGTERM)
+        if not callable(previous):
+            return
+
+        async def drain_then_exit(sig, frame):
+            try:
+                await self.drain()
+            finally:
+                previous(sig, frame)
+
+        def handler(sig, frame):
+            if self._drain_task is not None:
+                previous(sig, frame)
+                return
+            loop.call_soon_threadsafe(loop.create_task, drain_then_exit(sig, frame))
+
+        signal.signal(signal.SIGTERM, handler)
+
+
+# Global shutdown coordinator instance
+shutdown_coordinator = ShutdownCoordinator()
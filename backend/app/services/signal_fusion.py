@@ -0,0 +1,231 @@
+"""
+Vectorized multi-signal fusion.
+
+Every scored topic of a session is one row of a signal matrix whose
+columns are SIGNALS. A signal a topic has no data for is NaN and its
+weight is redistributed over the signals that are present, so a topic with
+only a judged answer is scored on that alone while one with pacing and
+verbal-cue data gets all four. Fused scores, confidences and statuses for
+every topic, domain and session of a batch come out of a handful of array
+operations. Because a topic's pull on its domain is proportional to its
+coverage, domain scores are ratios of expressions linear in the weights,
+so a calibration sweep reduces each domain to weighted signal sums once and
+scores every candidate weighting with a small matrix product.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SIGNALS = ("semantic", "follow_up", "verbal_cues", "latency")
+
+# Status codes returned by SignalFusion, in SkillStatus value order
+STATUSES = ("unknown", "weak", "improving", "strong")
+UNKNOWN, WEAK, IMPROVING, STRONG = range(len(STATUSES))
+
+# Score of a domain with no signals at all
+NEUTRAL_SCORE = 0.5
+
+# Verbal cues: score lost per cue per 100 words (confidence markers give some back)
+CUE_PENALTY_PER_100_WORDS = {"filler": 0.08, "hedge": 0.05, "confidence": -0.03}
+# Fewer words than this say too little about verbal habits
+MIN_CUE_WORDS = 30
+
+# Time to first word: full marks up to the first, none from the second (ms)
+LATENCY_SCORE_RANGE_MS = (1500.0, 8000.0)
+
+# Upper bound on (domains x weight sets) elements a sweep materializes at once
+_SWEEP_CHUNK_ELEMENTS = 4_000_000
+
+TopicKey = Tuple[str, str, Optional[str]]  # (domain, topic, subtopic)
+
+
+def verbal_cue_scores(words, filler, hedge, confidence) -> np.ndarray:
+    """Score in [0, 1] from cue counts; NaN where there are too few words."""
+    words = np.asarray(words, dtype=np.float64)
+    per_100 = 100.0 / np.maximum(words, 1.0)
+    penalty = (
+        CUE_PENALTY_PER_100_WORDS["filler"] * np.asarray(filler) +
+        CUE_PENALTY_PER_100_WORDS["hedge"] * np.asarray(hedge) +
+        CUE_PENALTY_PER_100_WORDS["confidence"] * np.asarray(confidence)
+    ) * per_100
+    return np.where(words >= MIN_CUE_WORDS, np.clip(1.0 - penalty, 0.0, 1.0), np.nan)
+
+
+def latency_scores(first_word_ms) -> np.ndarray:
+    """Score in [0, 1] falling linearly over LATENCY_SCORE_RANGE_MS; NaN where unknown."""
+    ms = np.asarray(first_word_ms, dtype=np.float64)
+    low, high = LATENCY_SCORE_RANGE_MS
+    return np.where(ms >= 0, np.interp(ms, [low, high], [1.0, 0.0]), np.nan)
+
+
+def _group_sums(values: np.ndarray, groups: np.ndarray, count: int) -> np.ndarray:
+    """Sum rows of values per group id; groups must be non-decreasing."""
+    out = np.zeros((count,) + values.shape[1:])
+    if len(groups):
+        starts = np.flatnonzero(np.concatenate(([True], groups[1:] != groups[:-1])))
+        out[groups[starts]] = np.add.reduceat(values, starts, axis=0)
+    return out
+
+
+@dataclass
+class SessionSignals:
+    """Signal rows of one session, ready for fusion."""
+    domains: List[str]
+    keys: List[TopicKey]  # one per row
+    domain_of: np.ndarray  # (rows,) index into domains
+    values: np.ndarray  # (rows, len(SIGNALS)); NaN where a signal is missing
+    evidence: np.ndarray  # (rows,) confidence in each topic's evidence
+    fallback: np.ndarray  # (domains, len(SIGNALS)) domain-wide signals for domains without rows
+
+
+@dataclass
+class FusedSession:
+    topic_scores: np.ndarray  # (rows,)
+    topic_confidence: np.ndarray  # (rows,)
+    topic_status: np.ndarray  # (rows,) index into STATUSES
+    domain_scores: np.ndarray  # (domains,)
+    overall: float
+
+
+class SignalFusion:
+    """Fuses signal rows with fixed weights and status thresholds."""
+
+    def __init__(
+        self,
+        weights: Dict[str, float],
+        weak_threshold: float,
+        strong_threshold: float,
+        min_confidence: float = 0.2
+    ):
+        self.weights = np.array([weights[name] for name in SIGNALS], dtype=np.float64)
+        self.weak_threshold = weak_threshold
+        self.strong_threshold = strong_threshold
+        self.min_confidence = min_confidence
+
+    @staticmethod
+    def _combine(values: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Weighted mean over present signals, for one or many weight vectors.
+
+        Args:
+            values: (rows, signals) with NaN for missing signals
+            weights: (signals,) or (weight sets, signals)
+
+        Returns:
+            (scores, coverage), each (rows,) or (rows, weight sets); coverage is
+            the share of total weight the present signals carry, and scores are
+            NaN for rows with no signal at all
+        """
+        present = ~np.isnan(values)
+        weights_t = weights.T
+        weighted = np.where(present, values, 0.0) @ weights_t
+        available = present.astype(np.float64) @ weights_t
+        scores = np.divide(weighted, available, out=np.full_like(weighted, np.nan), where=available > 0)
+        return scores, available / weights.sum(axis=-1)
+
+    @staticmethod
+    def _stack(batch: Sequence[SessionSignals]):
+        width = len(SIGNALS)
+        rows = np.array([len(s.keys) for s in batch], dtype=np.int64)
+        domains = np.array([len(s.domains) for s in batch], dtype=np.int64)
+        domain_offsets = np.concatenate(([0], np.cumsum(domains)[:-1])) if len(batch) else np.zeros(0, np.int64)
+        values = np.concatenate([s.values for s in batch]) if rows.sum() else np.zeros((0, width))
+        evidence = np.concatenate([s.evidence for s in batch]) if rows.sum() else np.zeros(0)
+        domain_of = (
+            np.concatenate([s.domain_of for s in batch]) + np.repeat(domain_offsets, rows)
+            if rows.sum() else np.zeros(0, dtype=np.int64)
+        )
+        fallback = np.concatenate([s.fallback for s in batch]) if domains.sum() else np.zeros((0, width))
+        session_of_domain = np.repeat(np.arange(len(batch)), domains)
+        return rows, domains, values, evidence, domain_of, fallback, session_of_domain
+
+    def fuse(self, batch: Sequence[SessionSignals]) -> List[FusedSession]:
+        """
+        Fuse every topic, domain and session of a batch in one pass.
+
+        A domain's score is the confidence-weighted mean of its topics, or
+        its fused domain-wide signals when it has no topic rows. A session's
+        score is the mean over its domains.
+        """
+        if not batch:
+            return []
+        rows, domains, values, evidence, domain_of, fallback, session_of_domain = self._stack(batch)
+
+        scores, coverage = self._combine(values, self.weights)
+        confidence = evidence * coverage
+        status = np.select(
+            [confidence < self.min_confidence, scores < self.weak_threshold, scores >= self.strong_threshold],
+            [UNKNOWN, WEAK, STRONG],
+            default=IMPROVING
+        )
+
+        total_domains = int(domains.sum())
+        weight = np.where(np.isnan(scores), 0.0, confidence)
+        numerator = np.bincount(domain_of, weights=np.nan_to_num(scores) * weight, minlength=total_domains)
+        denominator = np.bincount(domain_of, weights=weight, minlength=total_domains)
+        fallback_scores, _ = self._combine(fallback, self.weights)
+        domain_scores = np.where(
+            denominator > 0,
+            numerator / np.where(denominator > 0, denominator, 1.0),
+            np.nan_to_num(fallback_scores, nan=NEUTRAL_SCORE)
+        )
+
+        overall = np.bincount(session_of_domain, weights=domain_scores, minlength=len(batch))
+        overall = np.divide(overall, domains, out=np.zeros(len(batch)), where=domains > 0)
+
+        results = []
+        row_start = domain_start = 0
+        for index, signals in enumerate(batch):
+            row_end, domain_end = row_start + rows[index], domain_start + domains[index]
+            results.append(FusedSession(
+                topic_scores=scores[row_start:row_end],
+                topic_confidence=confidence[row_start:row_end],
+                topic_status=status[row_start:row_end],
+                domain_scores=domain_scores[domain_start:domain_end],
+                overall=float(overall[index])
+            ))
+            row_start, domain_start = row_end, domain_end
+        return results
+
+    def sweep(self, batch: Sequence[SessionSignals], weight_sets: np.ndarray) -> np.ndarray:
+        """
+        Session scores under many candidate weightings, for calibration.
+
+        Args:
+            batch: Sessions to score
+            weight_sets: (weight sets, len(SIGNALS)) candidate weights
+
+        Returns:
+            (sessions, weight sets) overall scores
+        """
+        weight_sets = np.atleast_2d(np.asarray(weight_sets, dtype=np.float64))
+        if not batch:
+            return np.zeros((0, weight_sets.shape[0]))
+        rows, domains, values, evidence, domain_of, fallback, session_of_domain = self._stack(batch)
+
+        # A topic's weight in its domain is evidence x coverage, so its contribution
+        # evidence * (values . w) / total(w) is linear in w: reduce every domain to
+        # evidence-weighted signal sums once, then each weighting is a matrix product
+        order = np.argsort(domain_of, kind="stable")
+        present = ~np.isnan(values[order])
+        weighted = evidence[order, None] * np.where(present, values[order], 0.0)
+        total_domains = int(domains.sum())
+        value_sums = _group_sums(weighted, domain_of[order], total_domains)
+        weight_sums = _group_sums(evidence[order, None] * present, domain_of[order], total_domains)
+
+        chunk = max(1, _SWEEP_CHUNK_ELEMENTS // max(total_domains, 1))
+        overall = []
+        for first in range(0, weight_sets.shape[0], chunk):
+            weights_t = weight_sets[first:first + chunk].T
+            numerator = value_sums @ weights_t
+            denominator = weight_sums @ weights_t
+            fallback_scores, _ = self._combine(fallback, weights_t.T)
+            domain_scores = np.where(
+                denominator > 0,
+                numerator / np.where(denominator > 0, denominator, 1.0),
+                np.nan_to_num(fallback_scores, nan=NEUTRAL_SCORE)
+            )
+            totals = _group_sums(domain_scores, session_of_domain, len(batch))
+            overall.append(totals / np.maximum(domains, 1)[:, None])
+        return np.concatenate(overall, axis=1)
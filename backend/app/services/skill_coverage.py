@@ -0,0 +1,212 @@
+"""
+Sparse coverage matrix from skill-tree nodes to question bank questions.
+
+A question covers its subtopic node and, through it, the topic and domain
+above it. A skill leaf is covered by the questions in its subtopic whose
+text mentions it. Rows are stored CSR-style and each row is sorted by
+difficulty with per-difficulty offsets, so "questions for this skill at
+this difficulty" is an array slice.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+import random
+import threading
+
+import numpy as np
+
+from app.services.question_bank import QuestionBank, QuestionBankSnapshot, question_bank
+from app.services.text_index import tokenize
+from app.skill_trees import SKILL_INDEX
+from app.skill_trees.index import SkillNode, SkillTreeIndex
+
+logger = logging.getLogger(__name__)
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+# Share of a skill name's terms a question must mention to cover the skill leaf
+SKILL_MENTION_OVERLAP = 0.5
+
+_SAMPLE_ATTEMPTS = 16
+
+
+class CoverageMatrix:
+    """
+    Skill node -> question IDs for one question bank version.
+
+    Attributes:
+        question_ids: Question IDs by column
+        unmapped: IDs of questions whose topic/subtopic is not in the skill trees
+    """
+
+    def __init__(self, snapshot: QuestionBankSnapshot, index: SkillTreeIndex = SKILL_INDEX):
+        self.version = snapshot.version
+        self.index = index
+        positions = {node.id: pos for pos, node in enumerate(index.nodes)}
+        skill_terms = {
+            node.id: set(tokenize(node.name))
+            for node in index.nodes if node.kind == "skill"
+        }
+
+        question_ids: List[str] = []
+        difficulties: List[int] = []
+        rows: List[List[int]] = [[] for _ in index.nodes]
+        unmapped: List[str] = []
+
+        for domain in snapshot.domains:
+            for q in snapshot.find(domain):
+                column = len(question_ids)
+                question_ids.append(q["id"])
+                difficulties.append(DIFFICULTIES.index(q["difficulty"]) if q.get("difficulty") in DIFFICULTIES else 1)
+
+                node_id = index.id_for(domain, q.get("topic"), q.get("subtopic"))
+                if node_id is None:
+                    node_id = index.id_for(domain, q.get("topic"))
+                if node_id is None:
+                    unmapped.append(q["id"])
+                    continue
+
+                node = index.get(node_id)
+                for covered in [node] + index.ancestors(node_id):
+                    rows[positions[covered.id]].append(column)
+
+                if node.kind == "subtopic":
+                    terms = set(tokenize(q.get("question", "")))
+                    for leaf in index.children_of(node_id):
+                        wanted = skill_terms[leaf.id]
+                        if wanted and len(wanted & terms) / len(wanted) >= SKILL_MENTION_OVERLAP:
+                            rows[positions[leaf.id]].append(column)
+
+        difficulty_codes = np.array(difficulties, dtype=np.uint8)
+        indptr = np.zeros((len(rows), len(DIFFICULTIES) + 1), dtype=np.int64)
+        indices = []
+        offset = 0
+        for pos, row in enumerate(rows):
+            columns = np.array(row, dtype=np.int32)
+            columns = columns[np.argsort(difficulty_codes[columns], kind="stable")]
+            counts = np.bincount(difficulty_codes[columns], minlength=len(DIFFICULTIES))
+            indptr[pos] = offset + np.concatenate(([0], np.cumsum(counts)))
+            indices.append(columns)
+            offset += len(columns)
+
+        names: Dict[str, List[SkillNode]] = {}
+        for node in index.nodes:
+            for label in {node.name, (node.skill or node.subtopic or node.topic or node.domain)}:
+                names.setdefault(" ".join(tokenize(label)), []).append(node)
+
+        self.question_ids: Tuple[str, ...] = tuple(question_ids)
+        self.unmapped: Tuple[str, ...] = tuple(unmapped)
+        self._positions = positions
+        self._names = names
+        self._indptr = indptr
+        self._indices = np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32)
+
+    def resolve(self, text: str, domains: Optional[Sequence[str]] = None) -> Optional[SkillNode]:
+        """
+        Skill node whose name matches a free-text area such as "Dynamic Programming".
+
+        Returns:
+            The best-covered matching node in the given domains, or None
+        """
+        candidates = [
+            node for node in self._names.get(" ".join(tokenize(text)), ())
+            if domains is None or node.domain in domains
+        ]
+        return max(candidates, key=lambda node: self.count(node.id), default=None)
+
+    def _columns(self, node_id: int, difficulty: Optional[str] = None) -> np.ndarray:
+        pos = self._positions.get(node_id)
+        if pos is None:
+            return self._indices[:0]
+        bounds = self._indptr[pos]
+        if difficulty is None:
+            return self._indices[bounds[0]:bounds[-1]]
+        level = DIFFICULTIES.index(difficulty)
+        return self._indices[bounds[level]:bounds[level + 1]]
+
+    def count(self, node_id: int, difficulty: Optional[str] = None) -> int:
+        """Number of questions covering a node, optionally at one difficulty."""
+        pos = self._positions.get(node_id)
+        if pos is None:
+            return 0
+        bounds = self._indptr[pos]
+        if difficulty is None:
+            return int(bounds[-1] - bounds[0])
+        level = DIFFICULTIES.index(difficulty)
+        return int(bounds[level + 1] - bounds[level])
+
+    def counts_by_difficulty(self, node_id: int) -> Dict[str, int]:
+        return {difficulty: self.count(node_id, difficulty) for difficulty in DIFFICULTIES}
+
+    def question_ids_for(self, node_id: int, difficulty: Optional[str] = None) -> List[str]:
+        """IDs of the questions covering a node."""
+        return [self.question_ids[column] for column in self._columns(node_id, difficulty)]
+
+    def pick(self, node_id: int, difficulty: Optional[str] = None, exclude_ids=None) -> Optional[str]:
+        """Random covering question ID that is not excluded."""
+        columns = self._columns(node_id, difficulty)
+        if not len(columns):
+            return None
+        excluded = exclude_ids or ()
+        for _ in range(_SAMPLE_ATTEMPTS):
+            question_id = self.question_ids[columns[random.randrange(len(columns))]]
+            if question_id not in excluded:
+                return question_id
+        remaining = [self.question_ids[c] for c in columns if self.question_ids[c] not in excluded]
+        return random.choice(remaining) if remaining else None
+
+    def gaps(self, min_questions: int = 3, kinds: Sequence[str] = ("subtopic", "skill")) -> List[dict]:
+        """
+        Skill nodes with too few questions.
+
+        Returns:
+            One dict per uncovered or undercovered node, with per-difficulty counts
+        """
+        report = []
+        for node in self.index.nodes:
+            if node.kind not in kinds:
+                continue
+            total = self.count(node.id)
+            by_difficulty = self.counts_by_difficulty(node.id)
+            missing = [d for d, n in by_difficulty.items() if n == 0]
+            if total < min_questions or (node.kind == "subtopic" and missing):
+                report.append({
+                    "skill_id": node.id,
+                    "path": node.path,
+                    "kind": node.kind,
+                    "name": node.name,
+                    "questions": total,
+                    "by_difficulty": by_difficulty,
+                    "missing_difficulties": missing,
+                    "status": "uncovered" if total == 0 else "undercovered",
+                })
+        return report
+
+
+class CoverageCache:
+    """Keeps one CoverageMatrix in step with a hot-reloadable question bank."""
+
+    def __init__(self, bank: QuestionBank):
+        self.bank = bank
+        self._matrix: Optional[CoverageMatrix] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> CoverageMatrix:
+        """The matrix for the bank's current snapshot, rebuilding it after a reload."""
+        snapshot = self.bank.snapshot
+        matrix = self._matrix
+        if matrix is not None and matrix.version == snapshot.version:
+            return matrix
+
+        with self._lock:
+            if self._matrix is None or self._matrix.version != snapshot.version:
+                self._matrix = CoverageMatrix(snapshot)
+                if self._matrix.unmapped:
+                    logger.warning(
+                        f"{len(self._matrix.unmapped)} questions map to no skill-tree node: "
+                        f"{', '.join(self._matrix.unmapped[:10])}"
+                    )
+            return self._matrix
+
+
+# Global skill coverage over the global question bank
+skill_coverage = CoverageCache(question_bank)
@@ -0,0 +1,229 @@
+"""
+Cross-session skill model behind UserSkill.
+
+Each skill's level is a Beta posterior over the chance of answering well
+on it. A session's fused topic score s with confidence c adds
+c * EVIDENCE_PER_SESSION pseudo-answers, a share s of them good, so a
+confident verdict moves the posterior more than a thin one. Before each
+update the evidence already held is scaled by RETENTION, letting recent
+sessions outweigh old ones so a candidate who improves is seen to improve.
+
+The posterior is stored in the existing columns: its mean as `score` and
+the evidence behind it as `confidence` = evidence / (evidence +
+CONFIDENCE_HALF_EVIDENCE), which inverts exactly. Every skill a session
+touches is written in one batched INSERT ... ON CONFLICT DO UPDATE against
+the unique (user, skill) index.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.models.skill import SKILL_KEY, UserSkill
+from app.services.evaluation import EvaluationService, SkillStatus
+
+# Pseudo-answers a fully confident session score counts as
+EVIDENCE_PER_SESSION = 4.0
+
+# Share of earlier evidence kept each time a skill is assessed again
+RETENTION = 0.85
+
+# Evidence at which confidence reaches 0.5
+CONFIDENCE_HALF_EVIDENCE = 4.0
+
+# Beta(1, 1) prior: no opinion on a skill never assessed
+PRIOR_ALPHA = 1.0
+PRIOR_BETA = 1.0
+
+# Skills held with less confidence than this are reported as unknown
+MIN_CONFIDENCE = 0.2
+
+SkillKey = Tuple[str, str, Optional[str]]  # (domain, topic, subtopic)
+
+
+@dataclass
+class SkillPosterior:
+    """Beta posterior over one skill; alpha and beta include the prior."""
+    alpha: float = PRIOR_ALPHA
+    beta: float = PRIOR_BETA
+    times_assessed: int = 0
+
+    @classmethod
+    def from_stored(cls, score: Optional[float], confidence: Optional[float], times_assessed: int) -> "SkillPosterior":
+        """Recover the posterior from a UserSkill's score and confidence."""
+        if score is None or not confidence:
+            return cls(times_assessed=times_assessed or 0)
+        confidence = min(confidence, 0.999)
+        evidence = CONFIDENCE_HALF_EVIDENCE * confidence / (1 - confidence)
+        total = evidence + PRIOR_ALPHA + PRIOR_BETA
+        return cls(score * total, (1 - score) * total, times_assessed or 0)
+
+    @property
+    def evidence(self) -> float:
+        return self.alpha + self.beta - PRIOR_ALPHA - PRIOR_BETA
+
+    @property
+    def mean(self) -> float:
+        return self.alpha / (self.alpha + self.beta)
+
+    @property
+    def confidence(self) -> float:
+        return self.evidence / (self.evidence + CONFIDENCE_HALF_EVIDENCE)
+
+    def update(self, score: float, weight: float):
+        """
+        Fold in one session's score for this skill.
+
+        Args:
+            score: Fused topic score from 0.0 to 1.0
+            weight: Confidence in that score from 0.0 to 1.0
+        """
+        self.alpha = PRIOR_ALPHA + (self.alpha - PRIOR_ALPHA) * RETENTION
+        self.beta = PRIOR_BETA + (self.beta - PRIOR_BETA) * RETENTION
+        pseudo_answers = EVIDENCE_PER_SESSION * min(max(weight, 0.0), 1.0)
+        score = min(max(score, 0.0), 1.0)
+        self.alpha += pseudo_answers * score
+        self.beta += pseudo_answers * (1 - score)
+        self.times_assessed += 1
+
+
+def session_observations(scores: Optional[dict]) -> Dict[SkillKey, Tuple[float, float]]:
+    """(score, confidence) per skill from a session's stored scores column."""
+    observations = {}
+    for domain, stored in ((scores or {}).get("domains") or {}).items():
+        for topic in stored.get("topics", []):
+            observations[(domain, topic["topic"], topic.get("subtopic"))] = (topic["score"], topic["confidence"])
+    return observations
+
+
+class SkillModel:
+    """Merges session topic scores into each user's UserSkill posteriors."""
+
+    def __init__(
+        self,
+        weak_threshold: float = EvaluationService.WEAK_THRESHOLD,
+        strong_threshold: float = EvaluationService.STRONG_THRESHOLD,
+        min_confidence: float = MIN_CONFIDENCE
+    ):
+        self.weak_threshold = weak_threshold
+        self.strong_threshold = strong_threshold
+        self.min_confidence = min_confidence
+
+    def status(self, posterior: SkillPosterior) -> SkillStatus:
+        if posterior.confidence < self.min_confidence:
+            return SkillStatus.UNKNOWN
+        if posterior.mean < self.weak_threshold:
+            return SkillStatus.WEAK
+        if posterior.mean >= self.strong_threshold:
+            return SkillStatus.STRONG
+        return SkillStatus.IMPROVING
+
+    def merge_session(self, db: Session, user_id: int, session_id: int, scores: Optional[dict]) -> int:
+        """
+        Update a user's skills with one session's topic scores; the caller commits.
+
+        Args:
+            db: Database session
+            user_id: Owner of the session
+            session_id: Session the scores come from
+            scores: The session's stored scores column
+
+        Returns:
+            Number of skills written
+        """
+        observations = session_observations(scores)
+        if not observations:
+            return 0
+
+        rows = db.execute(
+            select(
+                UserSkill.domain, UserSkill.topic, UserSkill.subtopic,
+                UserSkill.score, UserSkill.confidence, UserSkill.times_assessed, UserSkill.last_session_id
+            ).where(
+                UserSkill.user_id == user_id,
+                UserSkill.domain.in_({key[0] for key in observations})
+            )
+        ).all()
+        posteriors: Dict[SkillKey, SkillPosterior] = {}
+        for row in rows:
+            key = (row.domain, row.topic, row.subtopic)
+            if key not in observations:
+                continue
+            if row.last_session_id == session_id:
+                # Already merged (e.g. by a report job that ran twice)
+                observations.pop(key)
+                continue
+            posteriors[key] = SkillPosterior.from_stored(row.score, row.confidence, row.times_assessed)
+
+        for key, (score, confidence) in observations.items():
+            posteriors.setdefault(key, SkillPosterior()).update(score, confidence)
+
+        self._write(db, user_id, posteriors, {key: session_id for key in posteriors})
+        return len(posteriors)
+
+    def rebuild_user(self, db: Session, user_id: int, sessions: Iterable[Tuple[int, Optional[dict]]]) -> int:
+        """
+        Replace a user's skills with ones replayed from their sessions; the caller commits.
+
+        Args:
+            db: Database session
+            user_id: User to rebuild
+            sessions: (session_id, stored scores) in the order the sessions happened
+
+        Returns:
+            Number of skills written
+        """
+        posteriors: Dict[SkillKey, SkillPosterior] = {}
+        last_session: Dict[SkillKey, int] = {}
+        for session_id, scores in sessions:
+            for key, (score, confidence) in session_observations(scores).items():
+                posteriors.setdefault(key, SkillPosterior()).update(score, confidence)
+                last_session[key] = session_id
+
+        db.execute(delete(UserSkill).where(UserSkill.user_id == user_id))
+        self._write(db, user_id, posteriors, last_session)
+        return len(posteriors)
+
+    def _write(
+        self,
+        db: Session,
+        user_id: int,
+        posteriors: Dict[SkillKey, SkillPosterior],
+        last_session: Dict[SkillKey, int]
+    ):
+        """Upsert posteriors in one executemany INSERT ... ON CONFLICT DO UPDATE."""
+        if not posteriors:
+            return
+        now = datetime.utcnow()
+        rows: List[dict] = []
+        for key, posterior in posteriors.items():
+            domain, topic, subtopic = key
+            rows.append({
+                "user_id": user_id,
+                "domain": domain,
+                "topic": topic,
+                "subtopic": subtopic,
+                "score": posterior.mean,
+                "confidence": posterior.confidence,
+                "status": self.status(posterior).value,
+                "times_assessed": posterior.times_assessed,
+                "last_session_id": last_session[key],
+                "created_at": now,
+                "updated_at": now
+            })
+        statement = insert(UserSkill)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(SKILL_KEY),
+            set_={
+                column: statement.excluded[column]
+                for column in ("score", "confidence", "status", "times_assessed", "last_session_id", "updated_at")
+            }
+        )
+        db.execute(statement, rows)
+
+
+# Global skill model
+skill_model = SkillModel()
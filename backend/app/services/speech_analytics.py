@@ -0,0 +1,293 @@
+"""
+Speech-rate and pause analytics for the live relay.
+
+Two inputs feed the per-utterance TurnTiming records on the SessionState:
+
+- Relay timestamps: when the interviewer's audio finished playing (its
+  start plus the duration of the PCM sent to the client), server VAD
+  speech_started/speech_stopped, and the transcription of each utterance.
+- Frame energies of the candidate's inbound PCM, computed in NumPy over
+  20 ms frames as chunks arrive. Only the energies of the utterance being
+  spoken (plus a short look-back) are buffered, never the audio itself.
+
+When an utterance ends its frames are classified voiced/silent against the
+utterance's own noise floor in one vectorized pass, giving voiced time,
+pause count and pause lengths; the first voiced frame refines the VAD
+onset into a time-to-first-word. Words arrive with the transcription.
+"""
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+
+import numpy as np
+
+from app.services.session_manager import SessionManager, SessionState, TranscriptEntry, TurnTiming, session_manager
+
+logger = logging.getLogger(__name__)
+
+# The relay configures 24 kHz mono PCM16 in both directions
+SAMPLE_RATE = 24000
+FRAME_MS = 20
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+_FRAME_BYTES = FRAME_SAMPLES * 2
+
+# Frames this far above the utterance's noise floor (10th percentile) are voiced
+NOISE_MARGIN_DB = 12.0
+# ... and never below this level, so a silent room doesn't turn breath into speech
+MIN_VOICED_DBFS = -50.0
+
+# Silent gaps shorter than this are part of articulation, not pauses
+PAUSE_MIN_MS = 250
+
+# Audio kept from before VAD reports speech, covering its prefix padding
+ONSET_LOOKBACK_MS = 1000
+_LOOKBACK_FRAMES = ONSET_LOOKBACK_MS // FRAME_MS
+
+
+def frame_energies(samples: np.ndarray) -> np.ndarray:
+    """RMS level in dBFS of each whole 20 ms frame of PCM16 samples."""
+    count = len(samples) // FRAME_SAMPLES
+    frames = samples[:count * FRAME_SAMPLES].reshape(count, FRAME_SAMPLES).astype(np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1.0) / 32768.0)
+
+
+def pause_profile(energies: np.ndarray) -> Tuple[int, int, int, int, int]:
+    """
+    Voiced time and pauses of one utterance's frame energies.
+
+    Returns:
+        (first voiced frame or -1, voiced_ms, pauses, pause_ms, longest_pause_ms);
+        pauses are only counted between the first and last voiced frames
+    """
+    if not energies.size:
+        return -1, 0, 0, 0, 0
+    threshold = max(float(np.percentile(energies, 10)) + NOISE_MARGIN_DB, MIN_VOICED_DBFS)
+    voiced = energies > threshold
+    voiced_at = np.flatnonzero(voiced)
+    if not voiced_at.size:
+        return -1, 0, 0, 0, 0
+
+    inner = voiced[voiced_at[0]:voiced_at[-1] + 1].astype(np.int8)
+    edges = np.diff(np.concatenate(([1], inner, [1])))
+    gaps = (np.flatnonzero(edges == 1) - np.flatnonzero(edges == -1)) * FRAME_MS
+    gaps = gaps[gaps >= PAUSE_MIN_MS]
+    return (
+        int(voiced_at[0]),
+        int(voiced_at.size * FRAME_MS),
+        int(gaps.size),
+        int(gaps.sum()),
+        int(gaps.max()) if gaps.size else 0
+    )
+
+
+def pcm_duration_ms(audio_b64: str) -> int:
+    """Playback length of a base64 PCM16 chunk, without decoding it."""
+    if not audio_b64:
+        return 0
+    size = len(audio_b64) * 3 // 4 - audio_b64[-2:].count("=")
+    return size * 1000 // (2 * SAMPLE_RATE)
+
+
+@dataclass
+class SpeechSummary:
+    """Pacing over a set of utterances."""
+    utterances: int
+    words_per_minute: Optional[float]
+    median_latency_ms: Optional[float]
+    median_first_word_ms: Optional[float]
+    pauses_per_minute: Optional[float]
+    mean_pause_ms: Optional[float]
+    longest_pause_ms: int
+    talk_ratio: Optional[float]  # candidate share of speaking time
+
+
+def summarize(timings: List[TurnTiming]) -> Optional[SpeechSummary]:
+    """Aggregate utterance timings; None when there are none."""
+    if not timings:
+        return None
+    (latency, first_word, speech, _, pauses, pause_ms, longest, words, reply) = np.array(
+        [
+            (t.latency_ms, t.first_word_ms, t.speech_ms, t.voiced_ms, t.pauses,
+             t.pause_ms, t.longest_pause_ms, t.words, t.reply_ms)
+            for t in timings
+        ],
+        dtype=np.float64
+    ).T
+
+    def median(values: np.ndarray) -> Optional[float]:
+        known = values[values >= 0]
+        return float(np.median(known)) if known.size else None
+
+    transcribed = words > 0
+    speech_minutes = speech.sum() / 60000
+    talk = speech.sum() + reply.sum()
+    return SpeechSummary(
+        utterances=len(timings),
+        words_per_minute=(
+            float(words[transcribed].sum() * 60000 / speech[transcribed].sum())
+            if speech[transcribed].sum() else None
+        ),
+        median_latency_ms=median(latency),
+        median_first_word_ms=median(first_word),
+        pauses_per_minute=float(pauses.sum() / speech_minutes) if speech_minutes else None,
+        mean_pause_ms=float(pause_ms.sum() / pauses.sum()) if pauses.sum() else None,
+        longest_pause_ms=int(longest.max()),
+        talk_ratio=float(speech.sum() / talk) if talk else None
+    )
+
+
+def summarize_by_topic(timings: List[TurnTiming]) -> Dict[str, SpeechSummary]:
+    """SpeechSummary per topic the utterances were given under."""
+    by_topic: Dict[str, List[TurnTiming]] = {}
+    for timing in timings:
+        if timing.topic:
+            by_topic.setdefault(timing.topic, []).append(timing)
+    return {topic: summarize(group) for topic, group in by_topic.items()}
+
+
+class _SpeechSession:
+    """Relay-side tracking for one session; all times are time.monotonic() seconds."""
+
+    def __init__(self):
+        self.carry = b""  # bytes short of a whole frame
+        self.lookback: Deque[np.ndarray] = deque()
+        self.lookback_frames = 0
+        self.frames: List[np.ndarray] = []  # energies of the utterance in progress
+        self.in_speech = False
+        self.speech_started_at = 0.0
+        self.audio_start_ms: Optional[int] = None
+        self.onset_frames = 0  # frames buffered when VAD reported speech
+        self.timing: Optional[TurnTiming] = None
+        self.reply_started_at: Optional[float] = None
+        self.reply_ms = 0
+        self.reply_played_until: Optional[float] = None
+        self.untranscribed: Deque[TurnTiming] = deque()
+        self.lock = threading.Lock()
+
+
+class SpeechAnalytics:
+    """Turns relay events and inbound PCM into per-utterance TurnTiming records."""
+
+    def __init__(self, manager: SessionManager = session_manager):
+        self.manager = manager
+        self._sessions: Dict[int, _SpeechSession] = {}
+        self._lock = threading.Lock()
+        manager.add_transcript_listener(self.on_transcript_entry)
+
+    def _session(self, session_id: int) -> _SpeechSession:
+        with self._lock:
+            return self._sessions.setdefault(session_id, _SpeechSession())
+
+    def on_input_audio(self, session_id: int, pcm: bytes):
+        """Candidate audio chunk (PCM16) on its way to the realtime API."""
+        tracker = self._session(session_id)
+        with tracker.lock:
+            data = tracker.carry + pcm if tracker.carry else pcm
+            whole = len(data) - len(data) % _FRAME_BYTES
+            tracker.carry = bytes(data[whole:])
+            if not whole:
+                return
+            energies = frame_energies(np.frombuffer(data, dtype="<i2", count=whole // 2))
+            if tracker.in_speech:
+                tracker.frames.append(energies)
+                return
+            tracker.lookback.append(energies)
+            tracker.lookback_frames += energies.size
+            while tracker.lookback_frames - tracker.lookback[0].size >= _LOOKBACK_FRAMES:
+                tracker.lookback_frames -= tracker.lookback.popleft().size
+
+    def on_output_audio(self, session_id: int, audio_b64: str):
+        """Interviewer audio chunk on its way to the client."""
+        tracker = self._session(session_id)
+        now = time.monotonic()
+        with tracker.lock:
+            if tracker.reply_started_at is None:
+                tracker.reply_started_at = now
+            tracker.reply_ms += pcm_duration_ms(audio_b64)
+            # Generation runs ahead of playback; the client finishes playing at start + duration
+            tracker.reply_played_until = tracker.reply_started_at + tracker.reply_ms / 1000
+
+    def on_speech_started(self, session_id: int, audio_start_ms: Optional[int] = None):
+        """Server VAD detected candidate speech."""
+        state = self.manager.get_session(session_id)
+        tracker = self._session(session_id)
+        now = time.monotonic()
+        latency = None
+        with tracker.lock:
+            if tracker.in_speech:
+                return
+            timing = TurnTiming(reply_ms=tracker.reply_ms)
+            if tracker.reply_played_until is not None:
+                # Speaking over the interviewer counts as an immediate response
+                latency = max(0, int((now - tracker.reply_played_until) * 1000))
+                timing.latency_ms = latency
+            tracker.reply_started_at = tracker.reply_played_until = None
+            tracker.reply_ms = 0
+
+            tracker.in_speech = True
+            tracker.speech_started_at = now
+            tracker.audio_start_ms = audio_start_ms
+            tracker.frames = list(tracker.lookback)
+            tracker.onset_frames = tracker.lookback_frames
+            tracker.lookback.clear()
+            tracker.lookback_frames = 0
+            tracker.timing = timing
+        if state:
+            with state.lock:
+                timing.topic = state.current_topic
+        if latency is not None:
+            self.manager.record_response_latency(session_id, latency)
+
+    def on_speech_stopped(self, session_id: int, audio_end_ms: Optional[int] = None):
+        """Server VAD detected the end of candidate speech; close the utterance."""
+        state = self.manager.get_session(session_id)
+        tracker = self._session(session_id)
+        now = time.monotonic()
+        with tracker.lock:
+            if not tracker.in_speech:
+                return
+            timing = tracker.timing
+            if tracker.audio_start_ms is not None and audio_end_ms is not None:
+                timing.speech_ms = max(0, audio_end_ms - tracker.audio_start_ms)
+            else:
+                timing.speech_ms = int((now - tracker.speech_started_at) * 1000)
+
+            energies = np.concatenate(tracker.frames) if tracker.frames else np.zeros(0, dtype=np.float32)
+            first, timing.voiced_ms, timing.pauses, timing.pause_ms, timing.longest_pause_ms = pause_profile(energies)
+            if first >= 0 and timing.latency_ms >= 0:
+                # Voice began this long before VAD reported it
+                early_ms = max(0, tracker.onset_frames - first) * FRAME_MS
+                timing.first_word_ms = max(0, timing.latency_ms - early_ms)
+
+            tracker.in_speech = False
+            tracker.frames = []
+            tracker.timing = None
+            tracker.untranscribed.append(timing)
+
+        if state:
+            with state.lock:
+                state.turn_timings.append(timing)
+
+    def on_transcript_entry(self, state: SessionState, entry: TranscriptEntry):
+        """Transcript listener: give each candidate transcription's word count to its utterance."""
+        if entry.role != "user":
+            return
+        tracker = self._session(state.session_id)
+        with tracker.lock:
+            timing = tracker.untranscribed.popleft() if tracker.untranscribed else None
+        if timing is not None:
+            with state.lock:
+                timing.words = len(entry.content.split())
+
+    def discard(self, session_id: int):
+        """Forget relay state for a session that ended."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+# Global speech analytics, subscribed to the global session manager
+speech_analytics = SpeechAnalytics()
@@ -0,0 +1,157 @@
+import math
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+STOP_WORDS = frozenset("""
+a about an and are as at be but by can do does for from how i in into is it
+its me my of on or so stuff that the their them these things this to too use
+using vs very want was what when where which while who why will with would
+you your
+""".split())
+
+# Shorthand candidates use when declaring weak areas
+QUERY_EXPANSIONS: Dict[str, Tuple[str, ...]] = {
+    "dp": ("dynamic", "programming"),
+    "bfs": ("breadth", "first", "search"),
+    "dfs": ("depth", "first", "search"),
+    "bst": ("binary", "search", "tree"),
+    "nn": ("neural", "network"),
+    "cnn": ("convolutional", "neural", "network"),
+    "llm": ("language", "model"),
+    "rag": ("retrieval", "augmented", "generation"),
+    "db": ("database",),
+    "sql": ("sql", "database"),
+    "ml": ("machine", "learning"),
+    "api": ("api", "interface"),
+    "cap": ("cap", "consistency", "availability"),
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(token: str) -> str:
+    """Fold simple English plurals so 'graphs' and 'graph' share a term."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split on non-alphanumerics (including '_') and drop stop words."""
+    return [
+        normalize(token) for token in _TOKEN_RE.findall(text.lower())
+        if token not in STOP_WORDS
+    ]
+
+
+def tokenize_query(text: str) -> List[str]:
+    """Tokenize a free-text query, expanding known abbreviations."""
+    tokens = []
+    for token in tokenize(text):
+        tokens.extend(QUERY_EXPANSIONS.get(token, (token,)))
+    return tokens
+
+
+def top_documents(
+    doc_ids: List[np.ndarray],
+    impacts: List[np.ndarray],
+    doc_count: int,
+    k: int
+) -> List[Tuple[int, float]]:
+    """
+    Sum matching postings' impacts per document and keep the best k.
+
+    Returns:
+        (doc_id, score) pairs, best first, lower doc ID breaking ties
+    """
+    if not doc_ids or k <= 0:
+        return []
+
+    scores = np.bincount(np.concatenate(doc_ids), np.concatenate(impacts), doc_count)
+    touched = np.flatnonzero(scores)
+    if len(touched) > k:
+        touched = touched[np.argpartition(-scores[touched], k - 1)[:k]]
+    ranked = touched[np.lexsort((touched, -scores[touched]))]
+    return [(int(doc_id), float(scores[doc_id])) for doc_id in ranked]
+
+
+class InvertedIndex:
+    """
+    BM25 inverted index over pre-tokenized documents.
+
+    Each document belongs to a group (e.g. a domain), and postings are
+    partitioned by group so filtered queries only touch matching documents.
+    Document-length normalization is folded into precomputed per-posting
+    impacts at build time, so a query is a vectorized scatter-add of its
+    terms' postings followed by a partial sort of the touched documents.
+    """
+
+    def __init__(
+        self,
+        documents: Sequence[Sequence[str]],
+        groups: Sequence[str],
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        doc_count = len(documents)
+        avg_length = (sum(len(doc) for doc in documents) / doc_count) if doc_count else 0.0
+
+        term_freqs: Dict[str, Dict[int, int]] = {}
+        for doc_id, tokens in enumerate(documents):
+            for token in tokens:
+                freqs = term_freqs.setdefault(token, {})
+                freqs[doc_id] = freqs.get(doc_id, 0) + 1
+
+        self.groups = tuple(sorted(set(groups)))
+        self._postings: Dict[str, Dict[str, Tuple[np.ndarray, np.ndarray]]] = {}
+        for term, freqs in term_freqs.items():
+            idf = math.log(1 + (doc_count - len(freqs) + 0.5) / (len(freqs) + 0.5))
+            by_group: Dict[str, Tuple[List[int], List[float]]] = {}
+            for doc_id, tf in freqs.items():
+                norm = k1 * (1 - b + b * len(documents[doc_id]) / avg_length)
+                doc_ids, impacts = by_group.setdefault(groups[doc_id], ([], []))
+                doc_ids.append(doc_id)
+                impacts.append(idf * tf * (k1 + 1) / (tf + norm))
+            self._postings[term] = {
+                group: (np.array(doc_ids, dtype=np.int32), np.array(impacts, dtype=np.float64))
+                for group, (doc_ids, impacts) in by_group.items()
+            }
+
+        self.doc_count = doc_count
+
+    def search(
+        self,
+        query_tokens: Iterable[str],
+        k: int = 10,
+        groups: Optional[Iterable[str]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k documents by BM25 score.
+
+        Returns:
+            (doc_id, score) pairs, best first
+        """
+        wanted = self.groups if groups is None else tuple(groups)
+        doc_ids, impacts = [], []
+        for term in dict.fromkeys(query_tokens):
+            by_group = self._postings.get(term)
+            if not by_group:
+                continue
+            for group in wanted:
+                postings = by_group.get(group)
+                if postings is not None:
+                    doc_ids.append(postings[0])
+                    impacts.append(postings[1])
+
+        return top_documents(doc_ids, impacts, self.doc_count, k)
+
+    def postings(self) -> Iterator[Tuple[str, str, np.ndarray, np.ndarray]]:
+        """Every (term, group, doc_ids, impacts) posting list, e.g. to persist the index."""
+        for term, by_group in self._postings.items():
+            for group, (doc_ids, impacts) in by_group.items():
+                yield term, group, doc_ids, impacts
@@ -0,0 +1,335 @@
+"""
+Single-pass segmentation of a session transcript into Q/A exchanges.
+
+Consecutive utterances by the same speaker are merged into turns. Each
+interviewer turn that asks something is classified as a new main question
+or as a follow-up within the current question thread, and each main
+question is aligned to a skill-tree node: through the session plan when it
+matches a planned question, else through the question bank's keyword
+index, else by matching skill names. The candidate turns that follow make
+up the answer.
+
+Every turn costs a bounded amount of work (a plan lookahead and at most
+one top-k index lookup), so segmentation is linear in transcript length.
+The result is shared by evaluation, feedback and analytics.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import re
+
+from app.services.question_bank import QuestionBank, question_bank
+from app.services.session_manager import SessionPlan, TranscriptEntry
+from app.services.session_planner import asked_offset
+from app.services.text_index import tokenize
+from app.skill_trees import SKILL_INDEX, get_skill_id
+
+# Share of a bank question's terms an interviewer turn must contain to count as asking it
+QUESTION_MATCH_OVERLAP = 0.5
+
+# Share of a skill name's terms a turn must mention to align to that skill
+SKILL_NAME_OVERLAP = 0.6
+
+# Bank candidates checked per interviewer turn
+_SEARCH_K = 3
+
+_INTERROGATIVE = re.compile(
+    r"\b(how|what|why|when|which|where|who|can you|could you|would you|walk me|tell me|"
+    r"explain|describe|design|implement|write|compare|suppose|imagine|what if)\b",
+    re.IGNORECASE
+)
+
+
+@dataclass(frozen=True)
+class Turn:
+    role: str  # "user" or "assistant"
+    text: str
+    first_entry: int  # index of the first transcript entry merged into this turn
+    entries: int
+    started_at: Optional[datetime] = None
+    ended_at: Optional[datetime] = None
+
+
+@dataclass(frozen=True)
+class Exchange:
+    """One interviewer question (main or follow-up) and the candidate's answer."""
+    question: str
+    answer: str
+    depth: int  # 0 for a main question, n for its n-th follow-up
+    thread: int  # index of the main question this exchange belongs to
+    question_turn: int  # index into SegmentedTranscript.turns
+    domain: Optional[str] = None
+    topic: Optional[str] = None
+    subtopic: Optional[str] = None
+    node_id: Optional[int] = None  # skill-tree node the thread is aligned to
+    question_id: Optional[str] = None  # bank question, when the main question matched one
+
+    @property
+    def is_follow_up(self) -> bool:
+        return self.depth > 0
+
+    @property
+    def answered(self) -> bool:
+        return bool(self.answer)
+
+
+@dataclass
+class SegmentedTranscript:
+    turns: List[Turn] = field(default_factory=list)
+    exchanges: List[Exchange] = field(default_factory=list)
+
+    @property
+    def threads(self) -> List[List[Exchange]]:
+        """Exchanges grouped by main question, in order."""
+        groups: List[List[Exchange]] = []
+        for exchange in self.exchanges:
+            if exchange.thread == len(groups):
+                groups.append([])
+            groups[exchange.thread].append(exchange)
+        return groups
+
+    def thread_depths(self) -> List[int]:
+        """Deepest follow-up reached under each main question."""
+        depths: List[int] = []
+        for exchange in self.exchanges:
+            if exchange.thread == len(depths):
+                depths.append(0)
+            depths[exchange.thread] = max(depths[exchange.thread], exchange.depth)
+        return depths
+
+    def depth_by_topic(self) -> Dict[Tuple[str, str], float]:
+        """Mean follow-up depth reached per (domain, topic)."""
+        totals: Dict[Tuple[str, str], List[int]] = {}
+        depths = self.thread_depths()
+        for exchange in self.exchanges:
+            if exchange.depth == 0 and exchange.domain and exchange.topic:
+                totals.setdefault((exchange.domain, exchange.topic), []).append(depths[exchange.thread])
+        return {key: sum(values) / len(values) for key, values in totals.items()}
+
+    def mean_depth(self) -> float:
+        depths = self.thread_depths()
+        return sum(depths) / len(depths) if depths else 0.0
+
+    def for_domain(self, domain: str) -> List[Exchange]:
+        return [exchange for exchange in self.exchanges if exchange.domain == domain]
+
+
+TranscriptItem = Union[TranscriptEntry, dict]
+
+
+def _fields(entry: TranscriptItem) -> Tuple[str, str, Optional[datetime]]:
+    if isinstance(entry, dict):
+        timestamp = entry.get("timestamp")
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        return entry.get("role", ""), entry.get("content", ""), timestamp
+    return entry.role, entry.content, entry.timestamp
+
+
+def merge_turns(transcript: Iterable[TranscriptItem]) -> List[Turn]:
+    """Merge consecutive same-speaker entries into turns."""
+    turns: List[Turn] = []
+    parts: List[str] = []
+    role, first, count, started, ended = None, 0, 0, None, None
+    for index, entry in enumerate(transcript):
+        entry_role, text, timestamp = _fields(entry)
+        if entry_role != role:
+            if role is not None:
+                turns.append(Turn(role, " ".join(parts), first, count, started, ended))
+            role, first, count, started, parts = entry_role, index, 0, timestamp, []
+        if text:
+            parts.append(text.strip())
+        count += 1
+        ended = timestamp or ended
+    if role is not None:
+        turns.append(Turn(role, " ".join(parts), first, count, started, ended))
+    return turns
+
+
+def is_question(text: str) -> bool:
+    """Whether an interviewer turn asks something (rather than only commenting)."""
+    return "?" in text or bool(_INTERROGATIVE.search(text))
+
+
+class _SkillNameMatcher:
+    """Inverted index from name terms to subtopic and skill nodes."""
+
+    def __init__(self):
+        self._terms: Dict[str, List[int]] = {}
+        self._sizes: Dict[int, int] = {}
+        for node in SKILL_INDEX.nodes:
+            if node.kind not in ("topic", "subtopic", "skill"):
+                continue
+            terms = set(tokenize(node.name))
+            if not terms:
+                continue
+            self._sizes[node.id] = len(terms)
+            for term in terms:
+                self._terms.setdefault(term, []).append(node.id)
+
+    def match(self, terms: Iterable[str], domains: Optional[Sequence[str]] = None) -> Optional[int]:
+        hits: Dict[int, int] = {}
+        for term in set(terms):
+            for node_id in self._terms.get(term, ()):
+                hits[node_id] = hits.get(node_id, 0) + 1
+        best, best_key = None, None
+        for node_id, count in hits.items():
+            score = count / self._sizes[node_id]
+            if score < SKILL_NAME_OVERLAP or (domains and SKILL_INDEX.get(node_id).domain not in domains):
+                continue
+            # Prefer fuller matches, then matches on more terms
+            if best_key is None or (score, count) > best_key:
+                best, best_key = node_id, (score, count)
+        return best
+
+
+class TranscriptSegmenter:
+    """Turns flat transcripts into SegmentedTranscripts."""
+
+    def __init__(self, bank: QuestionBank = question_bank):
+        self.bank = bank
+        self._names: Optional[_SkillNameMatcher] = None
+
+    def segment(
+        self,
+        transcript: Sequence[TranscriptItem],
+        plan: Optional[SessionPlan] = None,
+        domains: Optional[Sequence[str]] = None
+    ) -> SegmentedTranscript:
+        """
+        Segment a transcript in one pass.
+
+        Args:
+            transcript: TranscriptEntry objects or {"role", "content"[, "timestamp"]} dicts
+            plan: Session plan, used to align questions the interviewer asked from it
+            domains: Session domains, to restrict bank and skill matching
+
+        Returns:
+            SegmentedTranscript with turns and exchanges in order
+        """
+        turns = merge_turns(transcript)
+        result = SegmentedTranscript(turns=turns)
+        cursor = 0
+        thread = -1
+        depth = 0
+        current: Dict[str, Optional[object]] = {}
+        open_exchange: Optional[dict] = None
+
+        def close():
+            if open_exchange is not None:
+                result.exchanges.append(Exchange(**open_exchange))
+
+        for index, turn in enumerate(turns):
+            if turn.role == "user":
+                if open_exchange is not None:
+                    joined = f"{open_exchange['answer']} {turn.text}".strip()
+                    open_exchange["answer"] = joined
+                continue
+            if not is_question(turn.text):
+                # Greetings, commentary and transitions; an open exchange stays open
+                continue
+
+            alignment = self._align(turn.text, plan, cursor, domains, thread, current)
+            if alignment is not None and alignment[4] is not None:
+                cursor = alignment[4]
+            new_question = thread < 0 or (
+                alignment is not None
+                and alignment[:4] != (
+                    current.get("domain"), current.get("topic"), current.get("subtopic"),
+                    current.get("question_id")
+                )
+            )
+
+            close()
+            if new_question:
+                thread += 1
+                depth = 0
+                domain, topic, subtopic, question_id = alignment[:4] if alignment else (None, None, None, None)
+                node_id = None
+                if domain and topic:
+                    node_id = get_skill_id(domain, topic, subtopic) or get_skill_id(domain, topic)
+                current = {
+                    "domain": domain, "topic": topic, "subtopic": subtopic,
+                    "node_id": node_id, "question_id": question_id
+                }
+            else:
+                depth += 1
+            open_exchange = {
+                "question": turn.text,
+                "answer": "",
+                "depth": depth,
+                "thread": thread,
+                "question_turn": index,
+                **current
+            }
+        close()
+        return result
+
+    def _align(
+        self,
+        text: str,
+        plan: Optional[SessionPlan],
+        cursor: int,
+        domains: Optional[Sequence[str]],
+        thread: int,
+        current: dict
+    ) -> Optional[tuple]:
+        """
+        Where an interviewer question belongs.
+
+        Returns:
+            (domain, topic, subtopic, question_id, new plan cursor or None), or
+            None when the turn names nothing new
+        """
+        if plan is not None:
+            offset = asked_offset(plan, text, cursor)
+            if offset is not None:
+                item = plan.items[cursor + offset]
+                return item.domain, item.topic, item.subtopic, item.question_id, cursor + offset + 1
+
+        matched = self.match_bank(text, domains)
+        if matched:
+            return matched + (None,)
+
+        if self._asks_follow_up(text, current.get("question_id")):
+            # One of the current question's own follow-ups, whatever else it mentions
+            return None
+
+        # Off-plan question: only a different topic named outright starts a new thread
+        named = self._match_skill_name(text, domains)
+        if named and (thread < 0 or named[:2] != (current.get("domain"), current.get("topic"))):
+            return named + (None,)
+        return None
+
+    def _asks_follow_up(self, text: str, question_id: Optional[str]) -> bool:
+        """Whether a turn asks one of the bank follow-ups of the current question."""
+        if not question_id:
+            return False
+        terms = set(tokenize(text))
+        for follow_up in self.bank.follow_ups(question_id):
+            wanted = set(tokenize(follow_up))
+            if wanted and len(wanted & terms) / len(wanted) >= QUESTION_MATCH_OVERLAP:
+                return True
+        return False
+
+    def match_bank(self, text: str, domains: Optional[Sequence[str]]) -> Optional[tuple]:
+        """(domain, topic, subtopic, question_id) of the bank question a turn asks, if any."""
+        terms = set(tokenize(text))
+        for question, _ in self.bank.search(text, domains, k=_SEARCH_K):
+            wanted = set(tokenize(question["question"]))
+            if wanted and len(wanted & terms) / len(wanted) >= QUESTION_MATCH_OVERLAP:
+                return question.get("domain"), question.get("topic"), question.get("subtopic"), question["id"]
+        return None
+
+    def _match_skill_name(self, text: str, domains: Optional[Sequence[str]]) -> Optional[tuple]:
+        if self._names is None:
+            self._names = _SkillNameMatcher()
+        node_id = self._names.match(tokenize(text), domains)
+        if node_id is None:
+            return None
+        node = SKILL_INDEX.get(node_id)
+        return node.domain, node.topic, node.subtopic, None
+
+
+# Global segmenter over the global question bank
+transcript_segmenter = TranscriptSegmenter()
@@ -0,0 +1,269 @@
+"""
+Streaming verbal-cue detection over candidate speech.
+
+Filler words ("um", "you know"), hedges ("I think maybe", "not sure") and
+confidence markers ("definitely", "in my experience") are counted with a
+word-level Aho-Corasick automaton compiled from configurable lexicons. Each
+candidate transcript entry is scanned once, in time linear in its length
+and independent of lexicon size; the automaton state carries across the
+fragments of one candidate turn, so a phrase split between two realtime
+transcript events still matches. Counts go into per-turn and per-topic
+counters on the SessionState as entries arrive, so the full transcript is
+never rescanned.
+
+Where cues overlap, the longest one wins: "kind of like" counts as one
+filler, not a hedge plus a filler.
+"""
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import logging
+import re
+import threading
+
+from app.config import get_settings
+from app.services.session_manager import CueCounts, SessionManager, SessionState, TranscriptEntry, TurnCues, session_manager
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CUE_CATEGORIES = ("filler", "hedge", "confidence")
+
+# "like" is left out on purpose: in technical answers it is mostly
+# comparative ("like a hash map"), not a filler
+DEFAULT_LEXICONS: Dict[str, List[str]] = {
+    "filler": [
+        "um", "umm", "uh", "uhh", "uhm", "erm", "er", "hmm", "ah",
+        "you know", "i mean", "basically", "literally", "so yeah",
+        "kind of like", "sort of like", "or whatever", "and stuff", "stuff like that"
+    ],
+    "hedge": [
+        "i think", "i think maybe", "i guess", "i believe", "i suppose", "i would say",
+        "maybe", "probably", "perhaps", "possibly", "might be", "could be",
+        "kind of", "sort of", "more or less", "not sure", "i'm not sure", "not really sure",
+        "i'm not certain", "i don't know", "i don't really know", "if i remember correctly",
+        "if i'm not mistaken", "roughly speaking"
+    ],
+    "confidence": [
+        "definitely", "certainly", "clearly", "absolutely", "for sure", "without a doubt",
+        "i'm confident", "i am confident", "i'm certain", "i know", "i'm sure",
+        "in my experience", "i have implemented", "i've implemented", "i've built", "i built",
+        "the answer is", "guaranteed"
+    ]
+}
+
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words, keeping contractions ("i'm", "don't") whole."""
+    return _WORD.findall(text.casefold().replace("’", "'"))
+
+
+def load_lexicons(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Lexicons from a JSON file of {category: [phrases]}.
+
+    Categories the file does not list keep their built-in phrases.
+
+    Args:
+        path: JSON file; empty or None uses the built-in lexicons only
+
+    Returns:
+        Phrases per cue category
+    """
+    lexicons = {category: list(phrases) for category, phrases in DEFAULT_LEXICONS.items()}
+    if not path:
+        return lexicons
+    with open(path, encoding="utf-8") as f:
+        custom = json.load(f)
+    for category, phrases in custom.items():
+        if category not in CUE_CATEGORIES:
+            raise ValueError(f"Unknown verbal cue category '{category}' in {path}")
+        lexicons[category] = list(phrases)
+    return lexicons
+
+
+class CueAutomaton:
+    """
+    Aho-Corasick automaton over words.
+
+    Matching on words rather than characters keeps cues from firing inside
+    longer words ("um" in "umbrella") without a separate boundary check.
+    """
+
+    def __init__(self, lexicons: Dict[str, Iterable[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[Optional[Tuple[int, str]]] = [None]  # (phrase length, category)
+        self.max_length = 0
+        self.phrases = 0
+        duplicates = 0
+
+        for category, phrases in lexicons.items():
+            if category not in CUE_CATEGORIES:
+                raise ValueError(f"Unknown verbal cue category '{category}'")
+            for phrase in phrases:
+                words = tokenize(phrase)
+                if not words:
+                    continue
+                state = 0
+                for word in words:
+                    next_state = self._goto[state].get(word)
+                    if next_state is None:
+                        next_state = len(self._goto)
+                        self._goto.append({})
+                        self._output.append(None)
+                        self._goto[state][word] = next_state
+                    state = next_state
+                if self._output[state] is None:
+                    self._output[state] = (len(words), category)
+                    self.phrases += 1
+                    self.max_length = max(self.max_length, len(words))
+                elif self._output[state][1] != category:
+                    duplicates += 1
+        if duplicates:
+            logger.warning(f"{duplicates} verbal cues listed under two categories; each keeps its first")
+
+        self._fail = [0] * len(self._goto)
+        self._dict_link = [0] * len(self._goto)  # nearest proper suffix state that ends a phrase
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                if state:
+                    self._fail[child] = self._goto[fallback].get(word, 0)
+                suffix = self._fail[child]
+                self._dict_link[child] = suffix if self._output[suffix] else self._dict_link[suffix]
+                queue.append(child)
+
+    @property
+    def states(self) -> int:
+        return len(self._goto)
+
+    def step(self, state: int, word: str) -> int:
+        """State after reading one more word."""
+        goto = self._goto
+        while state and word not in goto[state]:
+            state = self._fail[state]
+        return goto[state].get(word, 0)
+
+    def matches(self, state: int) -> Iterator[Tuple[int, str]]:
+        """(length, category) of every phrase ending at this state, longest first."""
+        if self._output[state]:
+            yield self._output[state]
+        state = self._dict_link[state]
+        while state:
+            yield self._output[state]
+            state = self._dict_link[state]
+
+
+class CueScanner:
+    """Incremental matcher over one candidate turn; feed it the turn's fragments in order."""
+
+    def __init__(self, automaton: CueAutomaton):
+        self.automaton = automaton
+        self.state = 0
+        self.position = 0  # words read so far in this turn
+        # Counted cues that a longer, later match could still replace: (start, end, category)
+        self._recent: List[Tuple[int, int, str]] = []
+
+    def feed(self, text: str) -> CueCounts:
+        """
+        Scan the next fragment of the turn.
+
+        Returns:
+            Change in counts. A cue counted in an earlier fragment that turns out
+            to be part of a longer one is taken back, so a category can go down.
+        """
+        delta = CueCounts()
+        automaton = self.automaton
+        recent = self._recent
+        for word in tokenize(text):
+            self.state = automaton.step(self.state, word)
+            self.position += 1
+            delta.words += 1
+            for length, category in automaton.matches(self.state):
+                if self._accept(self.position - length, self.position, category, delta):
+                    break
+            # Later matches start at most max_length words back; older cues are settled
+            horizon = self.position + 1 - automaton.max_length
+            while recent and recent[0][1] <= horizon:
+                recent.pop(0)
+        return delta
+
+    def _accept(self, start: int, end: int, category: str, delta: CueCounts) -> bool:
+        """Count a match unless it partly overlaps a counted cue; drop the cues it contains."""
+        recent = self._recent
+        keep = len(recent)
+        while keep and recent[keep - 1][1] > start:
+            if recent[keep - 1][0] < start:
+                return False
+            keep -= 1
+        for _, _, replaced in recent[keep:]:
+            setattr(delta, replaced, getattr(delta, replaced) - 1)
+        del recent[keep:]
+        recent.append((start, end, category))
+        setattr(delta, category, getattr(delta, category) + 1)
+        return True
+
+
+class VerbalCueAnalyzer:
+    """Counts verbal cues in candidate transcript entries as the session manager records them."""
+
+    def __init__(self, manager: SessionManager = session_manager, automaton: Optional[CueAutomaton] = None):
+        self.manager = manager
+        self.automaton = automaton or CueAutomaton(load_lexicons(settings.verbal_cue_lexicon_path))
+        self._scanners: Dict[int, CueScanner] = {}  # session_id -> scanner for the open candidate turn
+        self._lock = threading.Lock()
+        manager.add_transcript_listener(self.on_transcript_entry)
+
+    def count(self, text: str) -> CueCounts:
+        """Cue counts for a standalone text."""
+        return CueScanner(self.automaton).feed(text)
+
+    def on_transcript_entry(self, state: SessionState, entry: TranscriptEntry):
+        """Transcript listener: scan candidate entries, close the turn on interviewer entries."""
+        if entry.role != "user":
+            with self._lock:
+                self._scanners.pop(state.session_id, None)
+            return
+        try:
+            self._scan(state, entry)
+        except Exception:
+            # Never let analytics break the live session
+            logger.exception(f"Verbal cue analysis failed for session {state.session_id}")
+
+    def _scan(self, state: SessionState, entry: TranscriptEntry):
+        with self._lock:
+            scanner = self._scanners.get(state.session_id)
+            new_scanner = scanner is None
+            if new_scanner:
+                scanner = self._scanners[state.session_id] = CueScanner(self.automaton)
+
+        delta = scanner.feed(entry.content)
+
+        with state.lock:
+            # A session restored mid-turn from a snapshot continues its last turn
+            continues = (
+                not new_scanner
+                or (state.cue_turns and len(state.transcript) >= 2 and state.transcript[-2].role == "user")
+            )
+            if not continues:
+                state.cue_turns.append(TurnCues(first_entry=len(state.transcript) - 1, topic=state.current_topic))
+            turn = state.cue_turns[-1]
+            turn.counts.add(delta)
+            if turn.topic:
+                state.topic_cues.setdefault(turn.topic, CueCounts()).add(delta)
+            state.filler_word_count += delta.filler
+
+    def discard(self, session_id: int):
+        """Forget the open turn of a session that ended."""
+        with self._lock:
+            self._scanners.pop(session_id, None)
+
+
+# Global analyzer, subscribed to the global session manager
+verbal_cue_analyzer = VerbalCueAnalyzer()
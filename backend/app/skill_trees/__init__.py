@@ -1,6 +1,9 @@
+from typing import Optional
+
 from app.skill_trees.coding import CODING_SKILL_TREE
 from app.skill_trees.system_design import SYSTEM_DESIGN_SKILL_TREE
 from app.skill_trees.ml import ML_SKILL_TREE
+from app.skill_trees.index import SkillNode, SkillTreeIndex
 
 
 SKILL_TREES = {
@@ -9,6 +12,9 @@ SKILL_TREES = {
     "ml": ML_SKILL_TREE
 }
 
+# Compiled once at import; SKILL_TREES must not be mutated afterwards
+SKILL_INDEX = SkillTreeIndex(SKILL_TREES)
+
 
 def get_skill_tree(domain: str) -> dict:
     """Get the skill tree for a given domain."""
@@ -17,33 +23,35 @@ def get_skill_tree(domain: str) -> dict:
 
 def get_all_skills(domain: str) -> list:
     """Get a flat list of all skills in a domain."""
-    tree = get_skill_tree(domain)
-    skills = []
-
-    def traverse(node, path=""):
-        if isinstance(node, dict):
-            for key, value in node.items():
-                new_path = f"{path}/{key}" if path else key
-                if isinstance(value, dict) and "skills" in value:
-                    # Leaf node with skills
-                    for skill in value["skills"]:
-                        skills.append({
-                            "domain": domain,
-                            "topic": path.split("/")[0] if "/" in path else key,
-                            "subtopic": key if "/" in new_path else None,
-                            "skill": skill
-                        })
-                else:
-                    traverse(value, new_path)
-
-    traverse(tree)
-    return skills
+    return [
+        {
+            "domain": node.domain,
+            "topic": node.topic,
+            "subtopic": node.subtopic,
+            "skill": node.skill,
+            "skill_id": node.id
+        }
+        for node in SKILL_INDEX.domain_nodes(domain, "skill")
+    ]
+
+
+def get_skill_id(
+    domain: str,
+    topic: Optional[str] = None,
+    subtopic: Optional[str] = None,
+    skill: Optional[str] = None
+) -> Optional[int]:
+    """Stable integer id of a skill-tree node, or None if it does not exist."""
+    return SKILL_INDEX.id_for(domain, topic, subtopic, skill)
 
 
 __all__ = [
     "SKILL_TREES",
     "get_skill_tree",
     "get_all_skills",
+    "get_skill_id",
+    "SKILL_INDEX",
+    "SkillNode",
     "CODING_SKILL_TREE",
     "SYSTEM_DESIGN_SKILL_TREE",
     "ML_SKILL_TREE"
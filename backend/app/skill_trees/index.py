@@ -0,0 +1,147 @@
+"""
+Flat, immutable index over the nested skill trees.
+
+Every domain, topic, subtopic and skill becomes a SkillNode with a stable
+integer id derived from its path, so ids survive restarts and unrelated
+edits to the trees and are safe to persist. Nodes are stored in
+depth-first order with parent and children arrays, and looked up by id,
+path or (domain, topic, subtopic, skill) key in O(1).
+"""
+from array import array
+from types import MappingProxyType
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+import hashlib
+
+SkillKey = Tuple[str, Optional[str], Optional[str], Optional[str]]
+
+KINDS = ("domain", "topic", "subtopic", "skill")
+
+
+class SkillNode(NamedTuple):
+    id: int
+    kind: str  # domain, topic, subtopic or skill
+    domain: str
+    topic: Optional[str]
+    subtopic: Optional[str]
+    skill: Optional[str]
+    name: str  # display name
+    path: str  # e.g. "coding/arrays_strings/two_pointers/fixed_window"
+
+    @property
+    def key(self) -> SkillKey:
+        return (self.domain, self.topic, self.subtopic, self.skill)
+
+
+def skill_id(path: str) -> int:
+    """Stable 31-bit id for a node path (fits a signed 32-bit column)."""
+    digest = hashlib.blake2b(path.encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "little") & 0x7FFFFFFF
+
+
+class SkillTreeIndex:
+    """
+    Compiled view of a {domain: tree} mapping.
+
+    Arrays are indexed by a node's position in depth-first order; public
+    methods take and return stable node ids.
+    """
+
+    def __init__(self, trees: Dict[str, dict]):
+        nodes: List[SkillNode] = []
+        parents = array("i")
+
+        def add(kind, domain, topic, subtopic, skill, name, parent) -> int:
+            path = "/".join(part for part in (domain, topic, subtopic, skill) if part)
+            nodes.append(SkillNode(skill_id(path), kind, domain, topic, subtopic, skill, name, path))
+            parents.append(parent)
+            return len(nodes) - 1
+
+        for domain, tree in trees.items():
+            domain_pos = add("domain", domain, None, None, None, domain.replace("_", " ").title(), -1)
+            for topic, topic_node in tree.items():
+                topic_pos = add("topic", domain, topic, None, None, topic_node.get("name", topic), domain_pos)
+                for subtopic, sub_node in topic_node.get("topics", {}).items():
+                    sub_pos = add(
+                        "subtopic", domain, topic, subtopic, None, sub_node.get("name", subtopic), topic_pos
+                    )
+                    for skill in sub_node.get("skills", []):
+                        add("skill", domain, topic, subtopic, skill, skill.replace("_", " ").capitalize(), sub_pos)
+
+        children: List[List[int]] = [[] for _ in nodes]
+        for pos, parent in enumerate(parents):
+            if parent >= 0:
+                children[parent].append(pos)
+
+        positions: Dict[int, int] = {}
+        for pos, node in enumerate(nodes):
+            if node.id in positions:
+                other = nodes[positions[node.id]]
+                raise ValueError(f"Skill id collision between {other.path!r} and {node.path!r}")
+            positions[node.id] = pos
+
+        self.nodes: Tuple[SkillNode, ...] = tuple(nodes)
+        self.parents = parents
+        self.children: Tuple[Tuple[int, ...], ...] = tuple(tuple(c) for c in children)
+        self._positions = MappingProxyType(positions)
+        self._by_key = MappingProxyType({node.key: pos for pos, node in enumerate(nodes)})
+        self._by_path = MappingProxyType({node.path: pos for pos, node in enumerate(nodes)})
+        self._domains = MappingProxyType({
+            node.domain: pos for pos, node in enumerate(nodes) if node.kind == "domain"
+        })
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, node_id: int) -> bool:
+        return node_id in self._positions
+
+    def get(self, node_id: int) -> Optional[SkillNode]:
+        """Node by id."""
+        pos = self._positions.get(node_id)
+        return self.nodes[pos] if pos is not None else None
+
+    def id_for(
+        self,
+        domain: str,
+        topic: Optional[str] = None,
+        subtopic: Optional[str] = None,
+        skill: Optional[str] = None
+    ) -> Optional[int]:
+        """Id of the node at a (domain, topic, subtopic, skill) key; trailing parts may be None."""
+        pos = self._by_key.get((domain, topic, subtopic, skill))
+        return self.nodes[pos].id if pos is not None else None
+
+    def by_path(self, path: str) -> Optional[SkillNode]:
+        """Node by its slash-separated path."""
+        pos = self._by_path.get(path)
+        return self.nodes[pos] if pos is not None else None
+
+    def parent(self, node_id: int) -> Optional[SkillNode]:
+        pos = self._positions.get(node_id)
+        if pos is None or self.parents[pos] < 0:
+            return None
+        return self.nodes[self.parents[pos]]
+
+    def children_of(self, node_id: int) -> List[SkillNode]:
+        pos = self._positions.get(node_id)
+        return [self.nodes[child] for child in self.children[pos]] if pos is not None else []
+
+    def ancestors(self, node_id: int) -> List[SkillNode]:
+        """Parent, grandparent, ... up to the domain node."""
+        result = []
+        pos = self._positions.get(node_id)
+        while pos is not None and self.parents[pos] >= 0:
+            pos = self.parents[pos]
+            result.append(self.nodes[pos])
+        return result
+
+    def domain_nodes(self, domain: str, kind: Optional[str] = None) -> Iterator[SkillNode]:
+        """Every node under a domain in depth-first order, optionally of one kind."""
+        start = self._domains.get(domain)
+        if start is None:
+            return
+        for node in self.nodes[start + 1:]:
+            if node.domain != domain:
+                break
+            if kind is None or node.kind == kind:
+                yield node
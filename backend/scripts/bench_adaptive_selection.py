@@ -0,0 +1,100 @@
+"""
+Simulate candidates to compare adaptive and random difficulty selection.
+
+Each simulated candidate has a true ability; answers are drawn from the
+Rasch model with per-question difficulty noise. Reports how many questions
+each strategy needs to reach a target standard error, the estimation error
+after a fixed number of questions, and next_question latency on a large
+synthetic bank.
+
+Usage (from the backend directory):
+    python -m scripts.bench_adaptive_selection --candidates 2000
+"""
+from pathlib import Path
+import argparse
+import math
+import random
+import statistics
+import tempfile
+import time
+
+from app.services.adaptive_selector import (
+    DIFFICULTY_LOGITS,
+    AbilityEstimate,
+    AdaptiveSelector,
+    rank_difficulties,
+)
+from app.services.question_bank import QuestionBank
+from app.services.question_history import QuestionHistoryService
+from scripts.synthetic_bank import write_bank
+
+LABELS = list(DIFFICULTY_LOGITS)
+
+
+def choose_adaptive(estimate: AbilityEstimate, rng: random.Random) -> str:
+    return rank_difficulties(estimate)[0][0]
+
+
+def choose_random(estimate: AbilityEstimate, rng: random.Random) -> str:
+    return rng.choice(LABELS)
+
+
+def simulate(strategy, candidates: int, max_questions: int, target_se: float, seed: int):
+    """
+    Returns:
+        (questions needed to reach target_se per candidate, abs error after each question)
+    """
+    rng = random.Random(seed)
+    needed, errors = [], [[] for _ in range(max_questions)]
+    for _ in range(candidates):
+        ability = rng.gauss(0.0, 1.2)
+        estimate = AbilityEstimate()
+        reached = None
+        for n in range(max_questions):
+            label = strategy(estimate, rng)
+            true_difficulty = DIFFICULTY_LOGITS[label] + rng.gauss(0.0, 0.3)
+            correct = rng.random() < 1 / (1 + math.exp(-(ability - true_difficulty)))
+            estimate.update(DIFFICULTY_LOGITS[label], 1.0 if correct else 0.0)
+            errors[n].append(abs(estimate.mean - ability))
+            if reached is None and estimate.standard_error <= target_se:
+                reached = n + 1
+        needed.append(reached or max_questions + 1)
+    return needed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--max-questions", type=int, default=20)
+    parser.add_argument("--target-se", type=float, default=0.6)
+    parser.add_argument("--questions", type=int, default=50000, help="Synthetic bank size for latency")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    print(f"{args.candidates} simulated candidates, target standard error {args.target_se}\n")
+    print(f"{'strategy':<10} {'questions to target':>20} {'reached':>8} "
+          + " ".join(f"{'err@' + str(n):>7}" for n in (3, 6, 10)))
+    for name, strategy in (("adaptive", choose_adaptive), ("random", choose_random)):
+        needed, errors = simulate(strategy, args.candidates, args.max_questions, args.target_se, args.seed)
+        reached = sum(n <= args.max_questions for n in needed) / len(needed)
+        print(f"{name:<10} {statistics.mean(needed):>20.2f} {reached:>7.0%} "
+              + " ".join(f"{statistics.mean(errors[n - 1]):>7.3f}" for n in (3, 6, 10)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bank = QuestionBank(write_bank(Path(tmp), args.questions))
+        bank.load()
+        selector = AdaptiveSelector(bank, QuestionHistoryService(bank))
+        bucket = len(bank.find("coding", "dynamic_programming"))
+        asked = [q["id"] for q in bank.find("coding", "dynamic_programming")[:50]]
+
+        iterations = 5000
+        start = time.perf_counter()
+        for i in range(iterations):
+            question = selector.next_question(1, 1, "coding", "dynamic_programming", exclude_ids=asked)
+            selector.record_outcome(1, "coding", "dynamic_programming", question["difficulty"], i % 2)
+        elapsed = (time.perf_counter() - start) / iterations * 1000
+        print(f"\nnext_question + record_outcome over {bucket} candidates: {elapsed:.3f} ms/call")
+
+
+if __name__ == "__main__":
+    main()
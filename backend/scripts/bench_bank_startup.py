@@ -0,0 +1,45 @@
+"""
+Cold-start cost of the JSON and compiled question bank formats.
+
+Usage (from the backend directory):
+    python -m scripts.bench_bank_startup --questions 10000 50000 200000
+"""
+from pathlib import Path
+import argparse
+import tempfile
+import time
+
+from app.services.question_bank import COMPILED_FILE, QuestionBankSnapshot
+from app.services.question_bank_compiled import CompiledQuestionBank, compile_bank
+from scripts.synthetic_bank import write_bank
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, nargs="+", default=[10000, 50000, 200000])
+    args = parser.parse_args()
+
+    print(f"{'questions':>10} {'json load':>12} {'compiled open':>14} {'first lookup':>13}")
+    for count in args.questions:
+        with tempfile.TemporaryDirectory() as tmp:
+            questions_dir = write_bank(Path(tmp), count)
+            compiled_path = questions_dir / COMPILED_FILE
+            compile_bank(questions_dir, compiled_path)
+
+            start = time.perf_counter()
+            QuestionBankSnapshot.build(questions_dir)
+            json_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            bank = CompiledQuestionBank(compiled_path)
+            open_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            bank.get_question("coding", "dynamic_programming", difficulty="hard")
+            lookup_ms = (time.perf_counter() - start) * 1000
+
+            print(f"{count:>10} {json_ms:>10.1f}ms {open_ms:>12.2f}ms {lookup_ms:>11.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Time end-of-session answer scoring against the local stand-in judge.
+
+Starts scripts.judge_stub_server in a subprocess and scores a session's
+Q/A pairs (real bank questions, synthetic answers) sequentially, then
+concurrently, then concurrently with batching, and finally re-scores the
+same answers through a cold, a disk-only and a warm judge cache.
+
+Usage (from the backend directory):
+    python -m scripts.bench_llm_judge [--answers 20] [--latency-ms 800] [--error-rate 0.05]
+"""
+import argparse
+import asyncio
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from app.services.judge_cache import JudgeCache
+from app.services.llm_judge import JudgeItem, LLMJudge
+from app.services.question_bank import QUESTIONS_DIR, QuestionBankSnapshot
+
+MODES = [
+    ("sequential", 1, 1),
+    ("concurrent", 8, 1),
+    ("concurrent+batched", 8, 4),
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(port: int, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/stats", timeout=1)
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("Judge stand-in did not start")
+
+
+def session_items(count: int) -> list:
+    bank = QuestionBankSnapshot.build(QUESTIONS_DIR)
+    questions = [q for domain in bank.domains for q in bank.find(domain)]
+    rng = random.Random(0)
+    items = []
+    for i, q in enumerate(rng.sample(questions, min(count, len(questions)))):
+        rubric = bank.rubric(q["id"]) or {}
+        # Answers that mention part of the rubric, so scores spread out
+        words = " ".join(rubric.values()).split()
+        answer = " ".join(rng.sample(words, k=min(12, len(words))))
+        items.append(JudgeItem(f"{q['id']}#{i}", q["question"], f"I would approach it like this: {answer}", rubric))
+    return items
+
+
+async def run_mode(endpoint: str, items: list, concurrency: int, batch_size: int, cache=None) -> tuple:
+    judge = LLMJudge(endpoint=endpoint, max_concurrency=concurrency, batch_size=batch_size, cache=cache)
+    start = time.perf_counter()
+    scores = await judge.evaluate_answers(items)
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for score in scores if score.error)
+    return elapsed, failed, sum(score.overall_score for score in scores) / len(scores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LLM judge scoring")
+    parser.add_argument("--answers", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    port = _free_port()
+    server = subprocess.Popen([
+        sys.executable, "-m", "scripts.judge_stub_server", "--port", str(port),
+        "--latency-ms", str(args.latency_ms), "--error-rate", str(args.error_rate)
+    ])
+    try:
+        _wait_ready(port)
+        items = session_items(args.answers)
+        endpoint = f"http://127.0.0.1:{port}/v1"
+        print(f"{len(items)} answers, {args.latency_ms:.0f} ms per call, {args.error_rate:.0%} errors\n")
+        print(f"{'mode':<20} {'seconds':>8} {'failed':>7} {'mean score':>11}")
+        for name, concurrency, batch_size in MODES:
+            elapsed, failed, mean = asyncio.run(run_mode(endpoint, items, concurrency, batch_size))
+            print(f"{name:<20} {elapsed:>8.3f} {failed:>7} {mean:>11.2f}")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/judge_cache.sqlite"
+            cache = JudgeCache(path)
+            runs = [("cold cache", cache), ("disk cache", JudgeCache(path)), ("memory cache", cache)]
+            for name, run_cache in runs:
+                elapsed, failed, mean = asyncio.run(run_mode(endpoint, items, 8, 4, run_cache))
+                print(f"{name:<20} {elapsed:>8.3f} {failed:>7} {mean:>11.2f}")
+            print(f"\ncache stats: {cache.stats()}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark the indexed QuestionBank against per-call JSON parsing.
+
+Usage (from the backend directory):
+    python -m scripts.bench_question_bank --questions 50000
+"""
+from pathlib import Path
+import argparse
+import random
+import tempfile
+import time
+
+from app.services.question_bank import QuestionBank, load_questions
+from scripts.synthetic_bank import write_bank
+
+DOMAINS = ["coding", "system_design", "ml"]
+
+
+def legacy_get_question(questions_dir, domain, topic=None, difficulty=None):
+    """Previous behaviour: parse the domain file and scan it on every call."""
+    candidates = [
+        q for q in load_questions(domain, questions_dir)
+        if (not topic or q.get("topic") == topic)
+        and (not difficulty or q.get("difficulty") == difficulty)
+    ]
+    return random.choice(candidates) if candidates else None
+
+
+def legacy_get_rubric(questions_dir, question_id):
+    """Previous behaviour: parse every domain to find one ID."""
+    for domain in DOMAINS:
+        for q in load_questions(domain, questions_dir):
+            if q.get("id") == question_id:
+                return q.get("rubric")
+    return None
+
+
+def timed(label, fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed / iterations * 1000:10.3f} ms/call")
+    return elapsed / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=50000)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        questions_dir = write_bank(Path(tmp), args.questions)
+        bank = QuestionBank(questions_dir)
+
+        start = time.perf_counter()
+        bank.load()
+        print(f"Loaded {args.questions} questions in {(time.perf_counter() - start) * 1000:.1f} ms\n")
+
+        some_id = bank.find("ml")[-1]["id"]
+        legacy_iterations = max(1, args.iterations // 200)
+
+        old = timed("legacy get_question(topic, difficulty)",
+                    lambda: legacy_get_question(questions_dir, "coding", "dynamic_programming", "hard"),
+                    legacy_iterations)
+        new = timed("QuestionBank.get_question",
+                    lambda: bank.get_question("coding", "dynamic_programming", difficulty="hard"),
+                    args.iterations)
+        print(f"{'speedup':<40} {old / new:10.0f}x\n")
+
+        old = timed("legacy get_rubric", lambda: legacy_get_rubric(questions_dir, some_id), legacy_iterations)
+        new = timed("QuestionBank.rubric", lambda: bank.rubric(some_id), args.iterations)
+        print(f"{'speedup':<40} {old / new:10.0f}x")
+
+
+if __name__ == "__main__":
+    main()
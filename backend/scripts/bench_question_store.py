@@ -0,0 +1,112 @@
+"""
+Compare the in-memory and SQLite question bank backends for latency and RSS.
+
+Each backend is measured in its own worker process so resident memory
+reflects only that backend.
+
+Usage (from the backend directory):
+    python -m scripts.bench_question_store --questions 50000
+"""
+from pathlib import Path
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.services.question_bank import SQLITE_FILE, QuestionBank
+from app.services.question_bank_sqlite import build_sqlite_bank
+from scripts.synthetic_bank import write_bank
+
+QUERIES = ["dynamic programming", "graph traversal", "transformer attention", "load balancing", "caching"]
+
+
+def _rss_mb() -> float:
+    """Current resident set size, falling back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _timed(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def run_worker(backend: str, questions_dir: Path, iterations: int) -> dict:
+    """Load one backend and time the public lookups."""
+    baseline = _rss_mb()
+    start = time.perf_counter()
+    bank = QuestionBank(questions_dir, backend=backend)
+    bank.load()
+    load_ms = (time.perf_counter() - start) * 1000
+    loaded = _rss_mb()
+
+    rng = random.Random(0)
+    ids = [q["id"] for q in bank.find("coding")]
+    asked = rng.sample(ids, min(20, len(ids)))
+
+    results = {
+        "load_ms": load_ms,
+        "get_by_id": _timed(lambda: bank.get_by_id(rng.choice(ids)), iterations),
+        "get_question": _timed(
+            lambda: bank.get_question("coding", "dynamic_programming", difficulty="hard"), iterations
+        ),
+        "get_question(exclude 20)": _timed(
+            lambda: bank.get_question("coding", exclude_ids=asked), iterations
+        ),
+        "search": _timed(lambda: bank.search(rng.choice(QUERIES), k=10), iterations),
+        "rss_mb": _rss_mb() - baseline,
+        "load_rss_mb": loaded - baseline,
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=50000)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--worker", choices=["memory", "sqlite"], help=argparse.SUPPRESS)
+    parser.add_argument("--questions-dir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.questions_dir, args.iterations)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        questions_dir = write_bank(Path(tmp), args.questions)
+        # Build the store up front so the worker measures serving, not building
+        build_sqlite_bank(questions_dir, questions_dir / SQLITE_FILE)
+        size_mb = (questions_dir / SQLITE_FILE).stat().st_size / (1024 * 1024)
+
+        results = {}
+        for backend in ("memory", "sqlite"):
+            out = subprocess.run(
+                [sys.executable, "-m", "scripts.bench_question_store", "--worker", backend,
+                 "--questions-dir", str(questions_dir), "--iterations", str(args.iterations)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results[backend] = json.loads(out.strip().splitlines()[-1])
+
+    print(f"{args.questions} questions, SQLite file {size_mb:.1f} MB\n")
+    print(f"{'':<28} {'memory':>12} {'sqlite':>12}")
+    for key in ("load_ms", "get_by_id", "get_question", "get_question(exclude 20)", "search"):
+        unit = "ms" if key == "load_ms" else "ms/call"
+        print(f"{key:<28} {results['memory'][key]:>12.3f} {results['sqlite'][key]:>12.3f}  {unit}")
+    for key in ("load_rss_mb", "rss_mb"):
+        print(f"{key:<28} {results['memory'][key]:>12.1f} {results['sqlite'][key]:>12.1f}  MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Measure event-loop stalls while a burst of session reports is generated.
+
+A stand-in relay coroutine ticks every 20 ms, the cadence of the audio
+frames the WebSocket relay forwards, and records how late each tick runs.
+Meanwhile a burst of synthetic ended sessions (as at the top of the hour)
+is evaluated and rendered either inline on the event loop, as the end
+session handler used to, or through the report job process pool.
+
+Usage (from the backend directory):
+    python -m scripts.bench_report_jobs [--sessions 50] [--minutes 30] [--workers 2]
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import multiprocessing
+import random
+import time
+
+import numpy as np
+
+from app.services.evaluation import TopicScore
+from app.services.question_bank import question_bank
+from app.services.report_jobs import _init_worker, build_report
+from app.services.session_manager import SessionManager
+from app.services.session_snapshot import dumps
+from app.services.transcript_segmentation import transcript_segmenter
+from scripts.bench_transcript_segmentation import synthetic_session
+
+TICK_MS = 20
+DOMAINS = ["coding", "ml", "system_design"]
+
+
+def synthetic_payloads(count: int, minutes: int, rng: random.Random):
+    manager = SessionManager()
+    payloads = []
+    for session_id in range(1, count + 1):
+        transcript, _ = synthetic_session(question_bank, minutes, rng)
+        state = manager.create_session(session_id, 1)
+        for entry in transcript:
+            manager.add_transcript_entry(session_id, entry["role"], entry["content"])
+        segments = transcript_segmenter.segment(transcript, domains=DOMAINS)
+        topic_scores = {}
+        for key in {(e.domain, e.topic, e.subtopic) for e in segments.exchanges if e.domain and e.topic}:
+            score = TopicScore(key[1], key[2], rng.uniform(0.3, 0.95), 0.67, ["clear structure"])
+            topic_scores.setdefault(key[0], []).append(asdict(score))
+        payloads.append({
+            "state": dumps([state]),
+            "topic_scores": topic_scores,
+            "persona": "neutral",
+            "depth_mode": "interview_ready",
+            "domains": DOMAINS,
+            "declared_weak_areas": ["caching", "gradient descent"],
+            "transcript_summary": manager.get_transcript_summary(session_id),
+            "resume_provided": False,
+            "started_at": datetime.utcnow() - timedelta(minutes=minutes),
+            "ended_at": datetime.utcnow()
+        })
+        manager.end_session(session_id)
+    return payloads
+
+
+async def relay(stop: asyncio.Event, lateness: list):
+    interval = TICK_MS / 1000
+    expected = time.perf_counter() + interval
+    while not stop.is_set():
+        await asyncio.sleep(max(0.0, expected - time.perf_counter()))
+        now = time.perf_counter()
+        lateness.append((now - expected) * 1000)
+        expected = max(expected + interval, now)
+
+
+async def run_burst(payloads, pool, workers: int):
+    stop = asyncio.Event()
+    lateness = []
+    ticker = asyncio.create_task(relay(stop, lateness))
+    await asyncio.sleep(0.2)
+    start = time.perf_counter()
+
+    if pool is None:
+        for payload in payloads:
+            build_report(payload)
+            await asyncio.sleep(0)  # one request handler after another
+    else:
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(workers)
+
+        async def job(payload):
+            async with slots:
+                await loop.run_in_executor(pool, build_report, payload)
+
+        await asyncio.gather(*(job(p) for p in payloads))
+
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    return elapsed, np.array(lateness)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark event-loop stalls during report bursts")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--minutes", type=int, default=30, help="Length of each synthetic session")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    question_bank.load()
+    payloads = synthetic_payloads(args.sessions, args.minutes, random.Random(0))
+    print(f"{args.sessions} sessions of {args.minutes} min; relay tick every {TICK_MS} ms\n")
+    print(f"{'mode':<14} {'burst s':>8} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} {'late>40ms':>10}")
+
+    with ProcessPoolExecutor(
+        max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker
+    ) as pool:
+        # Warm the workers so process start-up is not part of the burst
+        list(pool.map(build_report, payloads[:args.workers]))
+        for mode, executor in (("inline", None), (f"pool x{args.workers}", pool)):
+            elapsed, lateness = asyncio.run(run_burst(payloads, executor, args.workers))
+            print(f"{mode:<14} {elapsed:>8.2f} {np.percentile(lateness, 50):>7.1f} "
+                  f"{np.percentile(lateness, 99):>7.1f} {lateness.max():>7.1f} {(lateness > 2 * TICK_MS).sum():>10}")
+
+
+if __name__ == "__main__":
+    main()
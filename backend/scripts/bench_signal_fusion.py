@@ -0,0 +1,125 @@
+"""
+Time signal fusion over batches of synthetic sessions and a weight sweep.
+
+Each synthetic session covers three domains with 2-8 judged topics each;
+every non-semantic signal is missing for a share of topics, as happens when
+a session has no live audio or no follow-ups. Compares a per-topic Python
+loop (the arithmetic the evaluator used to do per domain) with one
+SignalFusion.fuse call, checks they agree, then scores every session under
+all weightings on a 0.05 grid, as a calibration sweep would.
+
+Usage (from the backend directory):
+    python -m scripts.bench_signal_fusion [--sessions 1000 10000 50000] [--step 0.05]
+"""
+import argparse
+import itertools
+import math
+import time
+
+import numpy as np
+
+from app.services.evaluation import EvaluationService
+from app.services.signal_fusion import NEUTRAL_SCORE, SIGNALS, SessionSignals, SignalFusion
+
+DOMAINS = ["coding", "ml", "system_design"]
+MISSING_RATE = 0.3
+
+
+def synthetic_sessions(count: int, rng: np.random.Generator):
+    sessions = []
+    for _ in range(count):
+        rows = rng.integers(2, 9, size=len(DOMAINS))
+        total = int(rows.sum())
+        values = rng.uniform(0.2, 1.0, size=(total, len(SIGNALS)))
+        values[:, 1:][rng.random((total, len(SIGNALS) - 1)) < MISSING_RATE] = np.nan
+        fallback = rng.uniform(0.2, 1.0, size=(len(DOMAINS), len(SIGNALS)))
+        fallback[:, 0] = np.nan
+        sessions.append(SessionSignals(
+            domains=list(DOMAINS),
+            keys=[("d", f"t{i}", None) for i in range(total)],
+            domain_of=np.repeat(np.arange(len(DOMAINS)), rows),
+            values=values,
+            evidence=rng.uniform(0.5, 0.9, size=total),
+            fallback=fallback
+        ))
+    return sessions
+
+
+def fuse_in_python(session: SessionSignals, weights: dict) -> float:
+    """Reference: the same fusion, one topic and one signal at a time."""
+    total_weight = sum(weights.values())
+    domain_scores = []
+    for index in range(len(session.domains)):
+        numerator = denominator = 0.0
+        for row in range(len(session.keys)):
+            if session.domain_of[row] != index:
+                continue
+            weighted = available = 0.0
+            for column, name in enumerate(SIGNALS):
+                value = session.values[row, column]
+                if not math.isnan(value):
+                    weighted += weights[name] * value
+                    available += weights[name]
+            if available:
+                confidence = session.evidence[row] * available / total_weight
+                numerator += weighted / available * confidence
+                denominator += confidence
+        if denominator:
+            domain_scores.append(numerator / denominator)
+        else:
+            present = [(weights[n], v) for n, v in zip(SIGNALS, session.fallback[index]) if not math.isnan(v)]
+            weight = sum(w for w, _ in present)
+            domain_scores.append(sum(w * v for w, v in present) / weight if weight else NEUTRAL_SCORE)
+    return sum(domain_scores) / len(domain_scores)
+
+
+def weight_grid(step: float) -> np.ndarray:
+    units = round(1 / step)
+    grid = [
+        (a, b, c, units - a - b - c)
+        for a, b, c in itertools.product(range(units + 1), repeat=3)
+        if a + b + c <= units
+    ]
+    return np.array(grid, dtype=np.float64) / units
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized signal fusion")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--step", type=float, default=0.05, help="Weight grid step for the sweep")
+    args = parser.parse_args()
+
+    service = EvaluationService()
+    fusion = SignalFusion(service.WEIGHTS, service.WEAK_THRESHOLD, service.STRONG_THRESHOLD)
+    grid = weight_grid(args.step)
+    rng = np.random.default_rng(0)
+
+    print(f"{'sessions':>9} {'topics':>8} {'python ms':>10} {'fused ms':>9} {'speedup':>8} {'max diff':>9}"
+          f" {'sweep':>7} {'sweep s':>8}")
+    for count in args.sessions:
+        sessions = synthetic_sessions(count, rng)
+        topics = sum(len(s.keys) for s in sessions)
+
+        start = time.perf_counter()
+        reference = [fuse_in_python(s, service.WEIGHTS) for s in sessions]
+        python_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fused = fusion.fuse(sessions)
+        fused_s = time.perf_counter() - start
+        diff = max(abs(r - f.overall) for r, f in zip(reference, fused))
+
+        start = time.perf_counter()
+        swept = fusion.sweep(sessions, grid)
+        sweep_s = time.perf_counter() - start
+        # The sweep column for the configured weights must match fuse
+        configured = np.array([service.WEIGHTS[name] for name in SIGNALS])
+        column = int(np.argmin(np.abs(grid - configured).sum(axis=1)))
+        diff = max(diff, float(np.abs(swept[:, column] - [f.overall for f in fused]).max()))
+
+        print(f"{count:>9} {topics:>8} {python_s * 1000:>10.1f} {fused_s * 1000:>9.1f} "
+              f"{python_s / fused_s:>7.1f}x {diff:>9.1e} {len(grid):>7} {sweep_s:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Time transcript segmentation on synthetic sessions of increasing length.
+
+Each synthetic session strings together bank questions, each followed by
+its follow-ups, with candidate answers split into several transcript
+fragments the way the realtime API delivers them. Roughly 150 spoken words
+per minute. Alignment accuracy is checked against the generating questions.
+
+Usage (from the backend directory):
+    python -m scripts.bench_transcript_segmentation [--minutes 15 30 60 120] [--repeat 5]
+"""
+import argparse
+import random
+import time
+
+from app.services.question_bank import QUESTIONS_DIR, QuestionBank
+from app.services.transcript_segmentation import TranscriptSegmenter
+
+WORDS_PER_MINUTE = 150
+FILLER = ("so basically I would start by thinking about the constraints and then "
+          "pick a data structure that keeps the operations cheap while handling edge cases").split()
+
+
+def synthetic_session(bank: QuestionBank, minutes: int, rng: random.Random):
+    """Transcript dicts plus {entry index: question id} for each main question."""
+    questions = [q for domain in ("coding", "ml", "system_design") for q in bank.find(domain)]
+    transcript, truth = [], {}
+    words, last = 0, None
+    while words < minutes * WORDS_PER_MINUTE:
+        # Interviewers don't ask the same question twice in a row
+        q = rng.choice([c for c in questions if c["id"] != last])
+        last = truth[len(transcript)] = q["id"]
+        transcript.append({"role": "assistant", "content": f"Great, let's move on. {q['question']}"})
+        for follow_up in [None] + q.get("follow_ups", [])[:rng.randint(1, 3)]:
+            if follow_up:
+                transcript.append({"role": "assistant", "content": f"Okay. {follow_up}"})
+            # An answer of 60-200 words arrives as several fragments
+            answer_words = rng.randint(60, 200)
+            words += answer_words
+            for start in range(0, answer_words, 40):
+                fragment = [rng.choice(FILLER) for _ in range(min(40, answer_words - start))]
+                transcript.append({"role": "user", "content": " ".join(fragment)})
+        transcript.append({"role": "assistant", "content": "Thanks, that makes sense."})
+    return transcript, truth
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcript segmentation")
+    parser.add_argument("--minutes", type=int, nargs="+", default=[15, 30, 60, 120])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bank = QuestionBank(QUESTIONS_DIR)
+    bank.load()
+    segmenter = TranscriptSegmenter(bank)
+    rng = random.Random(0)
+
+    print(f"{'minutes':>8} {'entries':>8} {'turns':>6} {'ms':>8} {'us/entry':>9} {'threads':>8} {'aligned':>8}")
+    for minutes in args.minutes:
+        transcript, truth = synthetic_session(bank, minutes, rng)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            segments = segmenter.segment(transcript)
+        elapsed = (time.perf_counter() - start) / args.repeat
+
+        mains = [e for e in segments.exchanges if e.depth == 0]
+        aligned = 0
+        for e in mains:
+            turn = segments.turns[e.question_turn]
+            asked = [truth[i] for i in range(turn.first_entry, turn.first_entry + turn.entries) if i in truth]
+            aligned += asked == [e.question_id]
+        print(
+            f"{minutes:>8} {len(transcript):>8} {len(segments.turns):>6} {elapsed * 1000:>8.2f} "
+            f"{elapsed / len(transcript) * 1e6:>9.1f} {len(mains):>4}/{len(truth):<3} {aligned / len(truth):>8.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Time verbal-cue scanning against lexicon size.
+
+Builds the built-in lexicons plus synthetic lexicons of growing size (one-
+to four-word phrases over a vocabulary that overlaps the answer text), then
+streams a synthetic candidate transcript through CueScanner fragment by
+fragment, the way live transcript entries arrive. For comparison it runs
+the obvious alternative, one regex alternation of all phrases over each
+fragment, up to the size where that stays practical.
+
+Usage (from the backend directory):
+    python -m scripts.bench_verbal_cues [--sizes 1000 10000 100000] [--minutes 60] [--regex-limit 10000]
+"""
+import argparse
+import random
+import re
+import time
+
+from app.services.verbal_cues import DEFAULT_LEXICONS, CUE_CATEGORIES, CueAutomaton, CueScanner
+
+WORDS_PER_MINUTE = 150
+FRAGMENT_WORDS = 40
+VOCABULARY = (
+    "so basically i think we would use a hash map to keep the lookups cheap and then maybe "
+    "shard the data by user id you know because the write path is kind of heavy um and the "
+    "cache sits in front of the database so reads stay fast i guess latency would be roughly "
+    "ten milliseconds definitely under fifty for the tail"
+).split()
+
+
+def synthetic_lexicons(size: int, rng: random.Random) -> dict:
+    lexicons = {category: list(phrases) for category, phrases in DEFAULT_LEXICONS.items()}
+    seen = {phrase for phrases in lexicons.values() for phrase in phrases}
+    i = 0
+    while i < size:
+        # Half the phrases can occur in the text, half share its prefixes but never complete
+        phrase = " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(1, 4)))
+        if i % 2:
+            phrase = f"{phrase} x{i}"
+        if phrase in seen:
+            continue
+        seen.add(phrase)
+        lexicons[CUE_CATEGORIES[i % len(CUE_CATEGORIES)]].append(phrase)
+        i += 1
+    return lexicons
+
+
+def fragments(minutes: int, rng: random.Random):
+    words = [rng.choice(VOCABULARY) for _ in range(minutes * WORDS_PER_MINUTE)]
+    return [" ".join(words[i:i + FRAGMENT_WORDS]) for i in range(0, len(words), FRAGMENT_WORDS)]
+
+
+def time_automaton(lexicons: dict, texts):
+    start = time.perf_counter()
+    automaton = CueAutomaton(lexicons)
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scanner = CueScanner(automaton)
+    found = 0
+    for text in texts:
+        delta = scanner.feed(text)
+        found += delta.filler + delta.hedge + delta.confidence
+    return automaton, built, time.perf_counter() - start, found
+
+
+def time_regex(lexicons: dict, texts):
+    phrases = sorted({p for ps in lexicons.values() for p in ps}, key=len, reverse=True)
+    start = time.perf_counter()
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(p) for p in phrases) + r")\b")
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    found = sum(len(pattern.findall(text.casefold())) for text in texts)
+    return built, time.perf_counter() - start, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark verbal-cue scanning")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1000, 10000, 100000])
+    parser.add_argument("--minutes", type=int, default=60)
+    parser.add_argument("--regex-limit", type=int, default=10000, help="Largest lexicon to time the regex on")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts = fragments(args.minutes, rng)
+    words = sum(len(t.split()) for t in texts)
+    print(f"{words} words in {len(texts)} fragments ({args.minutes} min of speech)\n")
+    print(f"{'phrases':>8} {'states':>8} {'build ms':>9} {'scan ms':>8} {'words/s':>10} {'cues':>6}"
+          f" {'regex ms':>9} {'regex cues':>10}")
+    for size in args.sizes:
+        lexicons = synthetic_lexicons(size, rng)
+        automaton, built, scanned, found = time_automaton(lexicons, texts)
+        regex = ""
+        if size <= args.regex_limit:
+            _, regex_scan, regex_found = time_regex(lexicons, texts)
+            regex = f"{regex_scan * 1000:>9.1f} {regex_found:>10}"
+        print(f"{automaton.phrases:>8} {automaton.states:>8} {built * 1000:>9.1f} {scanned * 1000:>8.1f} "
+              f"{words / scanned:>10.0f} {found:>6} {regex}")
+
+
+if __name__ == "__main__":
+    main()
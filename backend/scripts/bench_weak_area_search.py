@@ -0,0 +1,85 @@
+"""
+Relevance and latency benchmark for weak-area question search.
+
+Relevance is measured on the real bank against data/relevance/weak_areas.json,
+whose queries are weak areas candidates have declared. Latency is measured
+on a synthetic bank.
+
+Usage (from the backend directory):
+    python -m scripts.bench_weak_area_search --questions 50000
+"""
+from pathlib import Path
+import argparse
+import json
+import random
+import tempfile
+import time
+
+from app.services.question_bank import QUESTIONS_DIR, QuestionBankSnapshot
+from scripts.synthetic_bank import write_bank
+
+RELEVANCE_SET = QUESTIONS_DIR.parent / "relevance" / "weak_areas.json"
+
+
+def legacy_weak_area(snapshot, domain, weak_area, count):
+    """Previous behaviour: substring match on every word, then shuffle."""
+    words = weak_area.lower().split()
+    relevant = []
+    for q in snapshot.find(domain):
+        text = f"{q.get('topic', '')} {q.get('subtopic', '')} {q.get('question', '')}".lower()
+        if any(word in text for word in words):
+            relevant.append(q)
+    random.shuffle(relevant)
+    return relevant[:count]
+
+
+def evaluate(label, search, cases, k):
+    """Mean precision@k, recall@k and MRR over the relevance set."""
+    precision = recall = mrr = 0.0
+    for case in cases:
+        ids = [q["id"] for q in search(case["domain"], case["weak_area"], k)]
+        relevant = set(case["relevant"])
+        hits = [i for i, qid in enumerate(ids) if qid in relevant]
+        precision += len(hits) / k
+        recall += len(hits) / len(relevant)
+        mrr += 1 / (hits[0] + 1) if hits else 0.0
+    n = len(cases)
+    print(f"{label:<10} P@{k} {precision / n:.3f}   R@{k} {recall / n:.3f}   MRR {mrr / n:.3f}")
+
+
+def latency(label, search, queries, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        domain, weak_area = queries[i % len(queries)]
+        search(domain, weak_area, 5)
+    per_call = (time.perf_counter() - start) / iterations
+    print(f"{label:<10} {per_call * 1000:8.3f} ms/query")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=50000)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("-k", type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(0)
+    cases = json.loads(RELEVANCE_SET.read_text())
+    real = QuestionBankSnapshot.build(QUESTIONS_DIR)
+    print(f"Relevance on {len(real)} real questions, {len(cases)} declared weak areas")
+    evaluate("substring", lambda d, w, k: legacy_weak_area(real, d, w, k), cases, args.k)
+    evaluate("bm25", real.questions_for_weak_area, cases, args.k)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic = QuestionBankSnapshot.build(write_bank(Path(tmp), args.questions))
+    queries = [(case["domain"], case["weak_area"]) for case in cases]
+    print(f"\nLatency on {len(synthetic)} synthetic questions")
+    old = latency("substring", lambda d, w, k: legacy_weak_area(synthetic, d, w, k), queries,
+                  max(1, args.iterations // 20))
+    new = latency("bm25", synthetic.questions_for_weak_area, queries, args.iterations)
+    print(f"{'speedup':<10} {old / new:8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Compile data/questions/*.json into the memory-mappable bank artifact.
+
+Run after editing question files and as part of every deploy; the server
+falls back to parsing JSON whenever the artifact is missing or stale. The
+near-duplicate cluster map is rebuilt alongside it, so workers only load it.
+
+Usage (from the backend directory):
+    python -m scripts.compile_question_bank [--questions-dir DIR] [--out FILE]
+"""
+from pathlib import Path
+import argparse
+import time
+
+from app.services.near_duplicates import CLUSTERS_FILE, build_cluster_map
+from app.services.question_bank import COMPILED_FILE, QUESTIONS_DIR
+from app.services.question_bank_compiled import CompiledQuestionBank, compile_bank
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the question bank")
+    parser.add_argument("--questions-dir", type=Path, default=QUESTIONS_DIR)
+    parser.add_argument("--out", type=Path, help=f"Defaults to <questions-dir>/{COMPILED_FILE}")
+    args = parser.parse_args()
+
+    out = args.out or args.questions_dir / COMPILED_FILE
+    start = time.perf_counter()
+    count = compile_bank(args.questions_dir, out)
+    elapsed = time.perf_counter() - start
+    print(f"Compiled {count} questions into {out} ({out.stat().st_size:,} bytes) in {elapsed:.2f}s")
+
+    clusters_path = args.questions_dir / CLUSTERS_FILE
+    start = time.perf_counter()
+    cluster_map = build_cluster_map(CompiledQuestionBank(out), clusters_path)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {len(cluster_map)} near-duplicate clusters to {clusters_path} in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Report near-duplicate question clusters in the question bank.
+
+Exits non-zero when clusters are found, so it can gate question edits in
+CI. --synthetic times MinHash/LSH on a generated bank instead, and
+--pairwise adds the all-pairs Jaccard baseline for comparison.
+
+Usage (from the backend directory):
+    python -m scripts.find_duplicate_questions [--questions-dir DIR] [--threshold 0.5]
+    python -m scripts.find_duplicate_questions --synthetic 10000 50000 --pairwise
+"""
+from pathlib import Path
+import argparse
+import sys
+import tempfile
+import time
+
+from app.services.near_duplicates import DEFAULT_THRESHOLD, DuplicateIndex, shingles
+from app.services.question_bank import QUESTIONS_DIR, QuestionBankSnapshot
+from scripts.synthetic_bank import write_bank
+
+# All-pairs comparison is skipped above this size; it takes minutes at 10k
+PAIRWISE_LIMIT = 10000
+
+
+def pairwise_matches(texts, threshold) -> int:
+    """Exact Jaccard over all pairs; quadratic, for comparison only."""
+    sets = [set(shingles(text)) for text in texts]
+    pairs = 0
+    for i in range(len(sets)):
+        for j in range(i + 1, len(sets)):
+            union = len(sets[i] | sets[j])
+            if union and len(sets[i] & sets[j]) / union >= threshold:
+                pairs += 1
+    return pairs
+
+
+def report(questions_dir: Path, threshold: float) -> int:
+    snapshot = QuestionBankSnapshot.build(questions_dir)
+    start = time.perf_counter()
+    index = DuplicateIndex.build(snapshot, threshold)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(snapshot)} questions, {len(index.clusters)} near-duplicate clusters ({elapsed * 1000:.0f} ms)")
+    for number, cluster in enumerate(index.clusters, 1):
+        print(f"\nCluster {number}:")
+        for question_id in cluster:
+            print(f"  {question_id}: {snapshot.get_by_id(question_id)['question']}")
+    return len(index.clusters)
+
+
+def bench(sizes, threshold: float, pairwise: bool):
+    print(f"{'questions':>10} {'minhash+lsh':>12} {'clusters':>9} {'pairwise':>10}")
+    for count in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot = QuestionBankSnapshot.build(write_bank(Path(tmp), count))
+        start = time.perf_counter()
+        index = DuplicateIndex.build(snapshot, threshold)
+        lsh_s = time.perf_counter() - start
+
+        pairwise_col = "-"
+        if pairwise and count <= PAIRWISE_LIMIT:
+            texts = [q["question"] for domain in snapshot.domains for q in snapshot.find(domain)]
+            start = time.perf_counter()
+            pairwise_matches(texts, threshold)
+            pairwise_col = f"{time.perf_counter() - start:.2f}s"
+        print(f"{count:>10} {lsh_s:>11.2f}s {len(index.clusters):>9} {pairwise_col:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate questions")
+    parser.add_argument("--questions-dir", type=Path, default=QUESTIONS_DIR)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--synthetic", type=int, nargs="+", help="Benchmark on generated banks of these sizes")
+    parser.add_argument("--pairwise", action="store_true", help="Also time the all-pairs baseline")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        bench(args.synthetic, args.threshold, args.pairwise)
+        return
+
+    if report(args.questions_dir, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
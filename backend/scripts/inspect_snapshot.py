@@ -0,0 +1,40 @@
+"""
+Print session snapshots as JSON for debugging.
+
+Usage (from the backend directory):
+    python -m scripts.inspect_snapshot sessions.snap
+    python -m scripts.inspect_snapshot --checkpoint 42
+"""
+import argparse
+import json
+
+from app.database import get_db_context
+from app.models.checkpoint import SessionCheckpoint
+from app.services.session_snapshot import load_snapshot, loads
+from app.services.session_store import export_state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dump session snapshots as JSON")
+    parser.add_argument("path", nargs="?", help="Snapshot file written by save_snapshot")
+    parser.add_argument("--checkpoint", type=int, help="Session ID of a shutdown checkpoint")
+    args = parser.parse_args()
+
+    if args.checkpoint is not None:
+        with get_db_context() as db:
+            checkpoint = db.query(SessionCheckpoint).filter(
+                SessionCheckpoint.session_id == args.checkpoint
+            ).first()
+            if not checkpoint:
+                parser.error(f"No checkpoint for session {args.checkpoint}")
+            states = loads(checkpoint.payload)
+    elif args.path:
+        states = load_snapshot(args.path)
+    else:
+        parser.error("Provide a snapshot path or --checkpoint")
+
+    print(json.dumps([export_state(state) for state in states], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Local stand-in for the LLM judge: an OpenAI-compatible chat completions
+server that scores answers by their overlap with the rubric text.
+
+It answers both single-answer and batched prompts from LLMJudge, with a
+configurable per-call latency and error rate, so the judge can be tested
+and benchmarked offline. Point the app at it with
+JUDGE_ENDPOINT=http://127.0.0.1:8089/v1.
+
+Usage (from the backend directory):
+    python -m scripts.judge_stub_server [--port 8089] [--latency-ms 800] [--error-rate 0.05]
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+import uvicorn
+
+from app.services.text_index import tokenize
+
+_FIELD = re.compile(r"^(Question|Candidate's Answer): (.*)$", re.MULTILINE)
+
+
+def score_answer(answer: str, rubric: dict) -> dict:
+    """Heuristic judge: each dimension scores by how much of its description the answer mentions."""
+    answer_terms = set(tokenize(answer))
+    scores = {}
+    for dimension, description in (rubric or {"overall": ""}).items():
+        wanted = set(tokenize(description)) or {dimension}
+        coverage = len(wanted & answer_terms) / len(wanted)
+        score = 1 + round(4 * min(1.0, coverage * 1.5), 1)
+        scores[dimension] = {"score": score, "evidence": f"Mentions {len(wanted & answer_terms)} of {len(wanted)} key terms"}
+    overall = sum(s["score"] - 1 for s in scores.values()) / (4 * len(scores))
+    return {
+        "scores": scores,
+        "overall_score": round(overall, 2),
+        "strengths": [d for d, s in scores.items() if s["score"] >= 4],
+        "areas_for_improvement": [d for d, s in scores.items() if s["score"] < 3]
+    }
+
+
+def judge(prompt: str) -> dict:
+    if "ITEMS:" in prompt:
+        items = json.loads(prompt.split("ITEMS:", 1)[1].split("\n\nOutput format:", 1)[0])
+        return {"results": [{"id": item["id"], **score_answer(item["answer"], item["rubric"])} for item in items]}
+
+    fields = dict(_FIELD.findall(prompt))
+    rubric_text = prompt.split("Rubric:", 1)[1].split("Output format:", 1)[0] if "Rubric:" in prompt else ""
+    rubric = {}
+    for line in rubric_text.strip().splitlines():
+        dimension, _, description = line.lstrip("- ").partition(": ")
+        if dimension:
+            rubric[dimension] = description
+    return score_answer(fields.get("Candidate's Answer", ""), rubric)
+
+
+def create_app(latency_ms: float, error_rate: float) -> FastAPI:
+    app = FastAPI(title="Judge stand-in")
+    stats = {"calls": 0, "errors": 0}
+
+    @app.post("/v1/chat/completions")
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def chat_completions(request: Request, deployment: str = ""):
+        body = await request.json()
+        stats["calls"] += 1
+        # Latency grows a little with prompt size, like a real model
+        prompt = body["messages"][-1]["content"]
+        await asyncio.sleep(latency_ms / 1000 * (1 + len(prompt) / 8000))
+        if random.random() < error_rate:
+            stats["errors"] += 1
+            status = random.choice((429, 500, 503))
+            return JSONResponse({"error": {"message": "stand-in failure", "code": status}}, status_code=status)
+
+        content = json.dumps(judge(prompt))
+        return {
+            "id": f"chatcmpl-stub-{stats['calls']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", deployment or "judge-stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                      "total_tokens": (len(prompt) + len(content)) // 4}
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local stand-in judge server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Base latency per call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls answered with 429/5xx")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency_ms, args.error_rate), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+"""
+Re-score ended sessions with the current evaluation pipeline.
+
+Walks ended sessions in id order with keyset pagination, fans chunks of
+rows out to a process pool and writes the new scores back with one batched
+UPDATE per chunk, so a changed weight, threshold or lexicon can be applied
+to the whole history. Each session's stored transcript is re-segmented and
+its verbal cues recounted. Judged answer scores and time to first word come
+from the fusion inputs stored with its scores; sessions scored before those
+were stored use their topic scores as the judged scores. With --rejudge the
+answers go to the judge again instead, each worker taking an equal share of
+the judge rate limits. Follow-up rates come from the transcript, since the
+live counters are not stored.
+
+Progress is checkpointed after every committed chunk, so an interrupted run
+picks up where it stopped; --restart starts over. --dry-run writes nothing
+and reports how overall scores and detected weak areas would change.
+--rebuild-skills then replays every user's sessions through the skill model
+to rebuild their UserSkill rows (with --limit 0 it only does that).
+
+Usage (from the backend directory):
+    python -m scripts.rescore_sessions [--workers 4] [--batch-size 200] [--limit N]
+        [--dry-run [--diff-threshold 0.01] [--diff-out FILE]] [--rejudge] [--reports]
+        [--checkpoint FILE] [--restart] [--rebuild-skills]
+"""
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+from sqlalchemy import func, select, update
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.session import InterviewSession
+from app.services.evaluation import TopicScore, detected_weak_areas, evaluation_scores, evaluation_service
+from app.services.feedback import feedback_generator
+from app.services.live_evaluation import MIN_ANSWER_WORDS, TopicAggregate
+from app.services.llm_judge import JudgeItem, LLMJudge
+from app.services.question_bank import question_bank
+from app.services.session_manager import TurnCues
+from app.services.session_store import parse_transcript_summary
+from app.services.skill_model import skill_model
+from app.services.transcript_segmentation import SegmentedTranscript, transcript_segmenter
+from app.services.verbal_cues import verbal_cue_analyzer
+
+settings = get_settings()
+
+DEFAULT_CHECKPOINT = Path("rescore_checkpoint.json")
+
+# Chunks queued per worker, so the next one is ready when a worker frees up
+_IN_FLIGHT_PER_WORKER = 2
+
+_COLUMNS = (
+    InterviewSession.id,
+    InterviewSession.persona,
+    InterviewSession.depth_mode,
+    InterviewSession.domains,
+    InterviewSession.declared_weak_areas,
+    InterviewSession.transcript_summary,
+    InterviewSession.scores,
+    InterviewSession.detected_weak_areas,
+    InterviewSession.resume_text.isnot(None).label("has_resume")
+)
+
+# Per-process state, set up by _init_worker
+_judge: Optional[LLMJudge] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _init_worker(rejudge: bool, workers: int):
+    global _judge, _loop
+    logging.basicConfig(level=logging.WARNING)
+    question_bank.load()
+    if rejudge:
+        _judge = LLMJudge(
+            max_concurrency=max(1, settings.judge_max_concurrency // workers),
+            requests_per_minute=settings.judge_requests_per_minute / workers,
+            tokens_per_minute=settings.judge_tokens_per_minute / workers
+        )
+        # The judge's client and rate limiters are bound to the loop they were first used on
+        _loop = asyncio.new_event_loop()
+
+
+def stored_inputs(scores: Optional[dict]) -> Tuple[Dict[str, List[TopicScore]], Dict[Optional[str], float]]:
+    """
+    Judged topic scores and times to first word from a stored scores column.
+
+    Returns:
+        (TopicScores per domain, latency in ms per topic with None for the whole session)
+    """
+    topic_scores: Dict[str, List[TopicScore]] = {}
+    latency_ms: Dict[Optional[str], float] = {}
+    for domain, stored in ((scores or {}).get("domains") or {}).items():
+        if "latency_ms" in stored.get("signals", {}):
+            latency_ms[None] = stored["signals"]["latency_ms"]
+        for topic in stored.get("topics", []):
+            signals = topic.get("signals")
+            if signals is not None:
+                if "semantic" not in signals:
+                    continue
+                score = signals["semantic"]
+                confidence = topic.get("judged_confidence", topic["confidence"])
+                if "latency_ms" in signals:
+                    latency_ms[topic["topic"]] = signals["latency_ms"]
+            else:
+                # Scored before fusion inputs were stored: these are the judged scores
+                score, confidence = topic["score"], topic["confidence"]
+            topic_scores.setdefault(domain, []).append(TopicScore(
+                topic=topic["topic"],
+                subtopic=topic.get("subtopic"),
+                score=score,
+                confidence=confidence,
+                evidence=[]
+            ))
+    return topic_scores, latency_ms
+
+
+def cue_turns(segments: SegmentedTranscript) -> List[TurnCues]:
+    """Verbal cue counts of every answer, under the topic of its question."""
+    turns = []
+    for exchange in segments.exchanges:
+        if not exchange.answer:
+            continue
+        question = segments.turns[exchange.question_turn]
+        turns.append(TurnCues(
+            first_entry=question.first_entry + question.entries,
+            topic=exchange.topic,
+            counts=verbal_cue_analyzer.count(exchange.answer)
+        ))
+    return turns
+
+
+async def judge_topic_scores(
+    judge: LLMJudge,
+    sessions: List[Tuple[int, SegmentedTranscript]]
+) -> Dict[int, Dict[str, List[TopicScore]]]:
+    """Judge every answer of several sessions in one batch, aggregated per topic."""
+    items, keys = [], []
+    for session_id, segments in sessions:
+        for index, exchange in enumerate(segments.exchanges):
+            if not exchange.domain or not exchange.topic or len(exchange.answer.split()) < MIN_ANSWER_WORDS:
+                continue
+            rubric = question_bank.rubric(exchange.question_id) if exchange.question_id else None
+            items.append(JudgeItem(f"{session_id}:{index}", exchange.question, exchange.answer, rubric or {}))
+            keys.append((session_id, (exchange.domain, exchange.topic, exchange.subtopic)))
+    scores = await judge.evaluate_answers(items)
+
+    aggregates: Dict[int, Dict[tuple, TopicAggregate]] = {}
+    for (session_id, key), score in zip(keys, scores):
+        if score.error:
+            continue
+        evidence = [
+            f"{dim}: {s['evidence']}" for dim, s in score.scores.items() if s.get("evidence")
+        ][:1] + score.areas_for_improvement[:1]
+        aggregates.setdefault(session_id, {}).setdefault(key, TopicAggregate()).add(score.overall_score, evidence)
+
+    by_session: Dict[int, Dict[str, List[TopicScore]]] = {}
+    for session_id, topics in aggregates.items():
+        for key, aggregate in topics.items():
+            by_session.setdefault(session_id, {}).setdefault(key[0], []).append(aggregate.to_topic_score(key))
+    return by_session
+
+
+def rescore_chunk(rows: List[dict], rejudge: bool, reports: bool) -> List[dict]:
+    """
+    Re-evaluate a chunk of session rows (runs in a worker process).
+
+    Returns:
+        New column values per re-scored session; sessions left with no topic
+        scores are skipped and keep their stored report
+    """
+    prepared = []
+    for row in rows:
+        transcript = parse_transcript_summary(row["transcript_summary"])
+        segments = transcript_segmenter.segment(transcript, domains=row["domains"])
+        prepared.append((row, transcript, segments))
+
+    judged = {}
+    if rejudge:
+        judged = _loop.run_until_complete(
+            judge_topic_scores(_judge, [(row["id"], segments) for row, _, segments in prepared])
+        )
+
+    batch = []
+    for row, transcript, segments in prepared:
+        topic_scores, latency_ms = stored_inputs(row["scores"])
+        batch.append({
+            "session_id": row["id"],
+            "transcript": transcript,
+            "declared_weak_areas": row["declared_weak_areas"] or [],
+            "domains": row["domains"],
+            "depth_mode": row["depth_mode"],
+            "session_state": {},
+            "topic_scores": judged.get(row["id"], {}) if rejudge else topic_scores,
+            "segments": segments,
+            "cue_turns": cue_turns(segments),
+            "latency_ms": latency_ms
+        })
+    evaluations = evaluation_service.evaluate_sessions(batch)
+
+    results = []
+    for (row, _, _), evaluation in zip(prepared, evaluations):
+        if not any(d.topic_scores for d in evaluation.domain_scores):
+            continue
+        result = {
+            "id": row["id"],
+            "scores": evaluation_scores(evaluation),
+            "detected_weak_areas": detected_weak_areas(evaluation)
+        }
+        if reports:
+            result["feedback_report"] = feedback_generator.generate_report(
+                evaluation,
+                row["persona"],
+                row["depth_mode"],
+                row["declared_weak_areas"] or [],
+                row["transcript_summary"],
+                row["has_resume"]
+            )
+        results.append(result)
+    return results
+
+
+def session_pages(db, after_id: int, batch_size: int, limit: Optional[int]):
+    """Rows of ended sessions with a transcript, batch_size at a time in id order."""
+    fetched = 0
+    while limit is None or fetched < limit:
+        size = batch_size if limit is None else min(batch_size, limit - fetched)
+        rows = db.execute(
+            select(*_COLUMNS)
+            .where(
+                InterviewSession.id > after_id,
+                InterviewSession.status != "active",
+                InterviewSession.transcript_summary.isnot(None)
+            )
+            .order_by(InterviewSession.id)
+            .limit(size)
+        ).mappings().all()
+        if not rows:
+            return
+        fetched += len(rows)
+        after_id = rows[-1]["id"]
+        yield [dict(row) for row in rows]
+
+
+def remaining_sessions(db, after_id: int) -> int:
+    return db.execute(
+        select(func.count(InterviewSession.id)).where(
+            InterviewSession.id > after_id,
+            InterviewSession.status != "active",
+            InterviewSession.transcript_summary.isnot(None)
+        )
+    ).scalar()
+
+
+def rebuild_skills(db, users_per_commit: int = 100) -> Tuple[int, int]:
+    """
+    Rebuild every user's skills from their scored sessions, oldest first.
+
+    Returns:
+        (users, skills) written
+    """
+    user_ids = db.execute(
+        select(InterviewSession.user_id).where(
+            InterviewSession.status != "active",
+            InterviewSession.scores.isnot(None)
+        ).distinct().order_by(InterviewSession.user_id)
+    ).scalars().all()
+
+    skills = 0
+    for index, user_id in enumerate(user_ids, 1):
+        sessions = db.execute(
+            select(InterviewSession.id, InterviewSession.scores).where(
+                InterviewSession.user_id == user_id,
+                InterviewSession.status != "active",
+                InterviewSession.scores.isnot(None)
+            ).order_by(InterviewSession.id)
+        ).all()
+        skills += skill_model.rebuild_user(db, user_id, sessions)
+        if index % users_per_commit == 0:
+            db.commit()
+    db.commit()
+    return len(user_ids), skills
+
+
+def load_checkpoint(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: Path, checkpoint: dict):
+    """Write the checkpoint atomically, so a crash mid-write never loses progress."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+def score_diff(row: dict, result: dict) -> dict:
+    """Changes to the overall score, domain scores and weak areas of one session."""
+    old = row["scores"] or {}
+    new = result["scores"]
+    old_domains = old.get("domains") or {}
+    old_weak = set(row["detected_weak_areas"] or [])
+    new_weak = set(result["detected_weak_areas"])
+    return {
+        "id": row["id"],
+        "overall": [old.get("overall"), new["overall"]],
+        "delta": new["overall"] - old["overall"] if old.get("overall") is not None else None,
+        "domains": {
+            domain: new_domain["overall"] - old_domains[domain]["overall"]
+            for domain, new_domain in new["domains"].items()
+            if domain in old_domains
+        },
+        "weak_added": sorted(new_weak - old_weak),
+        "weak_removed": sorted(old_weak - new_weak)
+    }
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{seconds:02d}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score ended sessions with the current evaluation pipeline")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=200, help="Sessions per chunk (and per UPDATE)")
+    parser.add_argument("--limit", type=int, help="Stop after this many sessions")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing them")
+    parser.add_argument("--diff-threshold", type=float, default=0.01,
+                        help="Smallest overall score change listed in a dry run")
+    parser.add_argument("--diff-out", type=Path, help="Write every dry-run diff to this JSON-lines file")
+    parser.add_argument("--rejudge", action="store_true", help="Judge answers again instead of reusing stored scores")
+    parser.add_argument("--reports", action="store_true", help="Regenerate feedback reports too")
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start from the first session")
+    parser.add_argument("--rebuild-skills", action="store_true",
+                        help="Rebuild every user's skills from their sessions afterwards")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    if args.rejudge and not LLMJudge().configured:
+        # Every answer would come back unjudged and the stored scores would be dropped
+        parser.error("--rejudge needs a judge endpoint (JUDGE_ENDPOINT or Azure OpenAI credentials)")
+
+    checkpoint = {} if args.restart or args.dry_run else load_checkpoint(args.checkpoint)
+    last_id = checkpoint.get("last_id", 0)
+    processed = checkpoint.get("processed", 0)
+    updated = checkpoint.get("updated", 0)
+    if last_id:
+        print(f"Resuming after session {last_id} ({processed} processed, {updated} updated)")
+
+    diff_out = open(args.diff_out, "w", encoding="utf-8") if args.diff_out else None
+    deltas: List[float] = []
+    domain_deltas: Dict[str, List[float]] = {}
+    weak_changed = 0
+
+    db = SessionLocal()
+    total = remaining_sessions(db, last_id)
+    if args.limit is not None:
+        total = min(total, args.limit)
+    print(f"{total} sessions to {'compare' if args.dry_run else 're-score'} with {args.workers} workers")
+
+    done = 0
+    started = time.perf_counter()
+    pending: Deque[Tuple[List[dict], Future]] = deque()
+
+    def finish_chunk(rows: List[dict], future: Future):
+        nonlocal last_id, processed, updated, done, weak_changed
+        results = future.result()
+        if args.dry_run:
+            by_id = {row["id"]: row for row in rows}
+            for result in results:
+                diff = score_diff(by_id[result["id"]], result)
+                if diff_out:
+                    diff_out.write(json.dumps(diff) + "\n")
+                if diff["delta"] is not None:
+                    deltas.append(diff["delta"])
+                for domain, delta in diff["domains"].items():
+                    domain_deltas.setdefault(domain, []).append(delta)
+                weak_area_change = diff["weak_added"] or diff["weak_removed"]
+                weak_changed += bool(weak_area_change)
+                if weak_area_change or diff["delta"] is None or abs(diff["delta"]) >= args.diff_threshold:
+                    old, new = diff["overall"]
+                    change = f"{old:.3f} -> {new:.3f} ({diff['delta']:+.3f})" if old is not None else f"new {new:.3f}"
+                    line = f"session {diff['id']}: overall {change}"
+                    if diff["weak_added"]:
+                        line += f"; weak +{diff['weak_added']}"
+                    if diff["weak_removed"]:
+                        line += f"; weak -{diff['weak_removed']}"
+                    print(line)
+        elif results:
+            db.execute(update(InterviewSession), results)
+            db.commit()
+
+        # Chunks finish in submission order, so everything up to here is done
+        last_id = rows[-1]["id"]
+        processed += len(rows)
+        updated += len(results)
+        done += len(rows)
+        if not args.dry_run:
+            save_checkpoint(args.checkpoint, {
+                "last_id": last_id,
+                "processed": processed,
+                "updated": updated,
+                "updated_at": datetime.utcnow().isoformat()
+            })
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed else 0.0
+        eta = format_duration((total - done) / rate) if rate else "?"
+        print(f"[{done:>{len(str(total))}}/{total}] {rate:,.0f} sessions/s, last id {last_id}, eta {eta}", flush=True)
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=args.workers, initializer=_init_worker, initargs=(args.rejudge, args.workers)
+        ) as pool:
+            for rows in session_pages(db, last_id, args.batch_size, args.limit):
+                pending.append((rows, pool.submit(rescore_chunk, rows, args.rejudge, args.reports)))
+                if len(pending) >= args.workers * _IN_FLIGHT_PER_WORKER:
+                    finish_chunk(*pending.popleft())
+            while pending:
+                finish_chunk(*pending.popleft())
+        if args.rebuild_skills and not args.dry_run:
+            start = time.perf_counter()
+            users, skills = rebuild_skills(db)
+            print(f"Rebuilt {skills} skills for {users} users in {time.perf_counter() - start:.1f}s")
+    finally:
+        db.close()
+        if diff_out:
+            diff_out.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"\n{done} sessions in {format_duration(elapsed)} ({done / elapsed if elapsed else 0:,.0f}/s)")
+    if args.dry_run:
+        changed = sum(1 for delta in deltas if abs(delta) >= args.diff_threshold)
+        print(f"{changed} overall scores moved by {args.diff_threshold} or more, "
+              f"{weak_changed} sessions with different weak areas")
+        if deltas:
+            print(f"overall delta: mean {sum(deltas) / len(deltas):+.4f}, "
+                  f"largest {max(deltas, key=abs):+.4f}")
+        for domain, values in sorted(domain_deltas.items()):
+            print(f"  {domain:<14} mean {sum(values) / len(values):+.4f} over {len(values)} sessions")
+    else:
+        print(f"{updated} of {processed} sessions re-scored so far; checkpoint at {args.checkpoint}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Report skill-tree nodes the question bank does not cover well.
+
+Lists subtopics and skills with fewer than --min-questions questions (or a
+subtopic missing a difficulty level) and questions whose topic/subtopic is
+not in the skill trees. Exits non-zero when anything is uncovered, so it can
+gate question edits in CI.
+
+Usage (from the backend directory):
+    python -m scripts.skill_coverage_report [--questions-dir DIR] [--min-questions 3] [--json]
+"""
+from pathlib import Path
+import argparse
+import json
+import sys
+import time
+
+from app.services.question_bank import QUESTIONS_DIR, QuestionBankSnapshot
+from app.services.skill_coverage import DIFFICULTIES, CoverageMatrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report skill coverage gaps in the question bank")
+    parser.add_argument("--questions-dir", type=Path, default=QUESTIONS_DIR)
+    parser.add_argument("--min-questions", type=int, default=3, help="Questions below which a node is undercovered")
+    parser.add_argument("--kind", choices=("topic", "subtopic", "skill"), nargs="+", default=["subtopic", "skill"])
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    snapshot = QuestionBankSnapshot.build(args.questions_dir)
+    start = time.perf_counter()
+    matrix = CoverageMatrix(snapshot)
+    elapsed = time.perf_counter() - start
+    gaps = matrix.gaps(args.min_questions, args.kind)
+    uncovered = [gap for gap in gaps if gap["status"] == "uncovered"]
+
+    if args.json:
+        print(json.dumps({"gaps": gaps, "unmapped_questions": list(matrix.unmapped)}, indent=2))
+    else:
+        nodes = sum(1 for node in matrix.index.nodes if node.kind in args.kind)
+        print(
+            f"{len(snapshot)} questions, {nodes} {'/'.join(args.kind)} nodes, "
+            f"{len(uncovered)} uncovered, {len(gaps) - len(uncovered)} undercovered ({elapsed * 1000:.0f} ms)"
+        )
+        print(f"\n{'status':<13} {'kind':<9} " + " ".join(f"{d:>6}" for d in DIFFICULTIES) + "  path")
+        for gap in gaps:
+            counts = " ".join(f"{gap['by_difficulty'][d]:>6}" for d in DIFFICULTIES)
+            print(f"{gap['status']:<13} {gap['kind']:<9} {counts}  {gap['path']}")
+        if matrix.unmapped:
+            print(f"\nQuestions outside the skill trees: {', '.join(matrix.unmapped)}")
+
+    if uncovered or matrix.unmapped:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
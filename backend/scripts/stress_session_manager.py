@@ -0,0 +1,193 @@
+"""
+Hammer SessionManager from threads and coroutines at once and check its state.
+
+Worker threads (standing in for background evaluation) and asyncio tasks
+(standing in for WebSocket handlers) share a pool of live sessions. Each
+records transcript entries, follow-up results, latencies, weak signals and
+covered topics and skills, while other threads create and end throwaway
+sessions and read transcript summaries. Afterwards every counter must equal
+the number of calls made and every coverage set must hold exactly the
+topics and skills recorded; any lost update or crashed reader is reported.
+
+Usage (from the backend directory):
+    python -m scripts.stress_session_manager [--threads 8] [--tasks 8] [--sessions 50] [--ops 2000]
+"""
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import random
+import sys
+import threading
+import time
+
+from app.services.session_manager import SessionManager
+
+TOPICS = [f"topic_{i}" for i in range(40)]
+SKILL_IDS = list(range(200))
+
+# Session ids above this are created and ended by churn workers
+CHURN_BASE = 1_000_000
+
+
+class Tally:
+    """Calls made per session, so the final state can be checked against them."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = Counter()
+        self.follow_ups = Counter()
+        self.failures = Counter()
+        self.latencies = Counter()
+        self.topics = {}
+        self.skills = {}
+
+    def merge(self, other: "Tally"):
+        with self.lock:
+            self.entries.update(other.entries)
+            self.follow_ups.update(other.follow_ups)
+            self.failures.update(other.failures)
+            self.latencies.update(other.latencies)
+            for session_id, topics in other.topics.items():
+                self.topics.setdefault(session_id, set()).update(topics)
+            for session_id, skills in other.skills.items():
+                self.skills.setdefault(session_id, set()).update(skills)
+
+
+def one_op(manager: SessionManager, session_ids, tally: Tally, rng: random.Random):
+    session_id = rng.choice(session_ids)
+    op = rng.randrange(7)
+    if op == 0:
+        manager.add_transcript_entry(session_id, rng.choice(("user", "assistant")), "answer " * rng.randint(1, 20))
+        tally.entries[session_id] += 1
+    elif op == 1:
+        success = rng.random() < 0.7
+        manager.record_follow_up_result(session_id, success)
+        tally.follow_ups[session_id] += 1
+        tally.failures[session_id] += not success
+    elif op == 2:
+        manager.record_response_latency(session_id, rng.randint(100, 5000))
+        tally.latencies[session_id] += 1
+    elif op == 3:
+        manager.update_weak_signal(session_id, rng.choice(TOPICS), rng.random())
+    elif op == 4:
+        topic = rng.choice(TOPICS)
+        manager.mark_topic_covered(session_id, topic)
+        tally.topics.setdefault(session_id, set()).add(topic)
+    elif op == 5:
+        skill_id = rng.choice(SKILL_IDS)
+        manager.mark_skill_covered(session_id, skill_id)
+        tally.skills.setdefault(session_id, set()).add(skill_id)
+    else:
+        manager.get_transcript_summary(session_id)
+
+
+def thread_worker(manager: SessionManager, session_ids, ops: int, seed: int, tally: Tally):
+    rng = random.Random(seed)
+    local = Tally()
+    for _ in range(ops):
+        one_op(manager, session_ids, local, rng)
+    tally.merge(local)
+
+
+def churn_worker(manager: SessionManager, ops: int, seed: int, stop: threading.Event):
+    """Create and end throwaway sessions so the registry changes under the other workers."""
+    rng = random.Random(seed)
+    for i in range(ops):
+        if stop.is_set():
+            return
+        session_id = CHURN_BASE + seed * ops + i
+        manager.create_session(session_id, CHURN_BASE + session_id)
+        manager.add_transcript_entry(session_id, "user", "hello")
+        manager.get_user_session(CHURN_BASE + session_id)
+        if rng.random() < 0.9:
+            manager.end_session(session_id)
+
+
+async def task_worker(manager: SessionManager, session_ids, ops: int, seed: int, tally: Tally):
+    rng = random.Random(seed)
+    local = Tally()
+    for i in range(ops):
+        one_op(manager, session_ids, local, rng)
+        if i % 16 == 0:
+            await asyncio.sleep(0)  # let the other handlers interleave
+    tally.merge(local)
+
+
+async def run(args) -> int:
+    manager = SessionManager()
+    session_ids = list(range(1, args.sessions + 1))
+    for session_id in session_ids:
+        manager.create_session(session_id, session_id)
+
+    tally = Tally()
+    stop = threading.Event()
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=args.threads + 2) as pool:
+        threads = [
+            loop.run_in_executor(pool, thread_worker, manager, session_ids, args.ops, seed, tally)
+            for seed in range(args.threads)
+        ]
+        churn = [
+            loop.run_in_executor(pool, churn_worker, manager, args.ops, seed, stop)
+            for seed in range(2)
+        ]
+        tasks = [
+            task_worker(manager, session_ids, args.ops, 10_000 + seed, tally)
+            for seed in range(args.tasks)
+        ]
+        await asyncio.gather(*threads, *tasks)
+        stop.set()
+        await asyncio.gather(*churn)
+    elapsed = time.perf_counter() - start
+
+    problems = []
+    for session_id in session_ids:
+        state = manager.get_session(session_id)
+        if state is None:
+            problems.append(f"session {session_id}: missing from the registry")
+            continue
+        checks = (
+            ("transcript entries", len(state.transcript), tally.entries[session_id]),
+            ("follow-ups", state.total_follow_ups, tally.follow_ups[session_id]),
+            ("follow-up failures", state.follow_up_failures, tally.failures[session_id]),
+            ("latencies", len(state.response_latencies), tally.latencies[session_id]),
+            ("topics covered", state.topics_covered, tally.topics.get(session_id, set())),
+            ("skills covered", state.covered_skill_ids, tally.skills.get(session_id, set())),
+        )
+        for name, actual, expected in checks:
+            if actual != expected:
+                problems.append(f"session {session_id}: {name} {actual!r} != {expected!r}")
+        bad_signals = [t for t, v in state.weak_signals.items() if not 0.0 <= v <= 1.0]
+        if bad_signals:
+            problems.append(f"session {session_id}: weak signals out of range for {bad_signals}")
+        if manager.get_user_session(session_id) is not state:
+            problems.append(f"session {session_id}: user index points elsewhere")
+
+    workers = args.threads + args.tasks
+    print(f"{workers} workers ({args.threads} threads, {args.tasks} tasks) x {args.ops} ops "
+          f"on {args.sessions} sessions, plus 2 churn threads: {elapsed:.2f}s")
+    if problems:
+        for problem in problems[:20]:
+            print(f"  {problem}")
+        print(f"FAILED: {len(problems)} inconsistencies")
+        return 1
+    print("OK: counters and coverage sets match every recorded call")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress SessionManager from threads and coroutines")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--tasks", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--ops", type=int, default=2000, help="Operations per worker")
+    args = parser.parse_args()
+    # Switch threads far more often than the default 5 ms so races surface
+    sys.setswitchinterval(1e-5)
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
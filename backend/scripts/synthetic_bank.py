@@ -0,0 +1,69 @@
+"""
+Synthetic question banks shaped like data/questions/*.json, for benchmarks.
+
+Questions are drawn from the real skill trees so topics, subtopics and
+difficulties line up with production data.
+"""
+from pathlib import Path
+from typing import Dict, List
+import json
+import random
+
+from app.skill_trees import SKILL_TREES
+
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+_TEMPLATES = [
+    "Explain how you would apply {skill} when working with {subtopic}.",
+    "Walk me through a problem in {topic} that needs {skill}.",
+    "What are the tradeoffs of {skill} compared to other {subtopic} techniques?",
+    "Design a solution using {subtopic} and describe where {skill} fits in.",
+    "How would you debug a failure related to {skill} in a {topic} system?",
+]
+
+
+def generate_questions(count: int, seed: int = 7) -> Dict[str, List[dict]]:
+    """Generate `count` questions spread across all domains."""
+    rng = random.Random(seed)
+    leaves = []
+    for domain, tree in SKILL_TREES.items():
+        for topic, topic_node in tree.items():
+            for subtopic, sub_node in topic_node.get("topics", {}).items():
+                leaves.append((domain, topic, subtopic, sub_node.get("skills", [])))
+
+    banks: Dict[str, List[dict]] = {domain: [] for domain in SKILL_TREES}
+    for i in range(count):
+        domain, topic, subtopic, skills = rng.choice(leaves)
+        skill = rng.choice(skills).replace("_", " ")
+        text = rng.choice(_TEMPLATES).format(
+            skill=skill,
+            topic=topic.replace("_", " "),
+            subtopic=subtopic.replace("_", " ")
+        )
+        banks[domain].append({
+            "id": f"{domain}_syn_{i:06d}",
+            "domain": domain,
+            "topic": topic,
+            "subtopic": subtopic,
+            "difficulty": rng.choice(DIFFICULTIES),
+            "question": f"{text} (variant {i})",
+            "follow_ups": [
+                f"What is the complexity of using {skill}?",
+                "How would this change at 10x scale?"
+            ],
+            "rubric": {
+                "correctness": f"Applies {skill} correctly",
+                "communication": "Explains reasoning clearly"
+            }
+        })
+    return banks
+
+
+def write_bank(out_dir: Path, count: int, seed: int = 7) -> Path:
+    """Write a synthetic bank as one JSON file per domain."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for domain, questions in generate_questions(count, seed).items():
+        with open(out_dir / f"{domain}.json", "w") as f:
+            json.dump(questions, f)
+    return out_dir
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
 import ReactMarkdown from 'react-markdown'
-import { getSession } from '../services/api'
+import { getSession, getSessionReport } from '../services/api'
 
 interface SessionDetail {
   id: number
@@ -26,6 +26,15 @@ export default function Report() {
 
       try {
         const data = await getSession(parseInt(sessionId))
+        if (data.status !== 'active' && !data.feedback_report) {
+          try {
+            const report = await getSessionReport(parseInt(sessionId))
+            data.feedback_report = report.feedback_report
+          } catch (e: any) {
+            // No report was generated (nothing was said); fall back to the placeholder
+            if (e.response?.status !== 404) throw e
+          }
+        }
         setSession(data)
       } catch (e: any) {
         setError(e.response?.data?.detail || 'Failed to load report')
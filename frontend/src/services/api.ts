@@ -66,6 +66,18 @@ export async function endSession(sessionId: number) {
   return response.data
 }
 
+// The report is generated in the background; the server answers 202 until it is ready
+export async function getSessionReport(sessionId: number, timeoutMs = 120000) {
+  const deadline = Date.now() + timeoutMs
+  for (;;) {
+    const response = await api.get(`/sessions/${sessionId}/report`)
+    if (response.status !== 202) return response.data
+    if (Date.now() > deadline) throw new Error('The report is taking longer than expected')
+    const retryAfterMs = Number(response.headers['retry-after'] || 2) * 1000
+    await new Promise((resolve) => setTimeout(resolve, retryAfterMs))
+  }
+}
+
 // Resume endpoints
 export async function uploadResume(sessionId: number, file: File) {
   const formData = new FormData()